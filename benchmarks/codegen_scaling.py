@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+""" Measures how CodeGenerator.codeGen() scales with the number of fields in a format.
+
+Code generation should be linear in the size of the schema, so the time per field reported for
+each size should stay roughly constant as the number of fields grows. """
+
+import sys
+import time
+import shutil
+import tempfile
+from os.path import dirname, abspath, join
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from instaparse import InstaParseFormatFileParser, InstaParseFormat, generatorClass
+
+FIELDS_PER_CLASS = 10
+FIELD_COUNTS = [ 1000, 2000, 5000, 10000 ]
+LANGUAGES = [ "python", "java", "c++" ]
+
+def synthesizeFormat(numFields):
+    """ Returns the text of a format file with numFields primitive fields spread across classes. """
+    lines = [ "<objects>" ]
+    numClasses = max(1, numFields // FIELDS_PER_CLASS)
+    for classIndex in xrange(numClasses):
+        lines.append("Record%d" % classIndex)
+        for fieldIndex in xrange(FIELDS_PER_CLASS):
+            lines.append("    f%d_%d:int" % ( classIndex, fieldIndex ))
+    lines.append("<body>")
+    for classIndex in xrange(numClasses):
+        lines.append("r%d:Record%d" % ( classIndex, classIndex ))
+    return "\n".join(lines) + "\n"
+
+def timeCodeGen( language, formatFileName, outputDirectory ):
+    parser = InstaParseFormatFileParser(formatFileName)
+    formatObject = InstaParseFormat(parser.objectModel)
+    generator = generatorClass(language)(join(outputDirectory, "Main"), formatObject)
+    start = time.time()
+    generator.codeGen()
+    return time.time() - start
+
+def main():
+    workDirectory = tempfile.mkdtemp()
+    try:
+        print "%-8s %8s %10s %14s" % ( "language", "fields", "total (s)", "per field (us)" )
+        for numFields in FIELD_COUNTS:
+            formatFileName = join(workDirectory, "input%d.format" % numFields)
+            formatFile = open(formatFileName, "w")
+            formatFile.write(synthesizeFormat(numFields))
+            formatFile.close()
+            for language in LANGUAGES:
+                elapsed = timeCodeGen(language, formatFileName, workDirectory)
+                print "%-8s %8d %10.3f %14.2f" % ( language, numFields, elapsed, elapsed / numFields * 1e6 )
+    finally:
+        shutil.rmtree(workDirectory)
+
+if __name__ == "__main__":
+    main()
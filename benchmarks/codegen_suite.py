@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+
+""" Benchmark suite for code generation on synthetic schemas.
+
+Format files are synthesized along several axes: the number of classes, fields per line, nesting
+depth and repetition mode ('*', '+', an integer count, a count variable and '!' separated
+instances). For each one the time taken by InstaParseFormatFileParser, InstaParseFormat and every
+generator's codeGen() is measured along with the memory held by the format and by each generator's
+buffered output. Results are written as JSON, and comparing them with an earlier results file
+reports every measurement that got slower or bigger than the tolerance allows, exiting with status 1
+if there are any. """
+
+import sys
+import json
+import time
+import shutil
+import tempfile
+import platform
+from optparse import OptionParser
+from os.path import dirname, abspath, join
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from instaparse import InstaParseFormatFileParser, InstaParseFormat, generatorClass
+from format_memory import deepSize
+
+LANGUAGES = [ "python", "java", "c++" ]
+FIELD_TYPES = [ "int", "float", "string", "bool" ]
+REPEATS = 3
+
+# Classes with repeated fields in the repetition mode scenarios
+REPETITION_CLASSES = 200
+
+def fieldList( prefix, count ):
+    """ count primitive fields for one line, ending with a list since it can only be the last field. """
+    fields = [ "%s%d:%s" % ( prefix, i, FIELD_TYPES[i % len(FIELD_TYPES)] ) for i in xrange(count - 1) ]
+    fields.append("%s%d:list(int)" % ( prefix, count - 1 ))
+    return " ".join(fields)
+
+def synthesizeClasses(numClasses):
+    """ numClasses classes of a few fields each, all contained by the body. """
+    lines = [ "<objects>" ]
+    for classIndex in xrange(numClasses):
+        lines.append("Record%d" % classIndex)
+        lines.append("    " + fieldList( "a", 3 ))
+        lines.append("    b:string")
+    lines.append("Root")
+    for classIndex in xrange(numClasses):
+        lines.append("    r%d:Record%d" % ( classIndex, classIndex ))
+    lines.append("<body>")
+    lines.append("root:Root")
+    return lines
+
+def synthesizeFieldsPerLine(fieldsPerLine):
+    """ One class of 50 lines with fieldsPerLine fields on each. """
+    lines = [ "<objects>", "Record" ]
+    for lineIndex in xrange(50):
+        lines.append("    " + fieldList( "f%d_" % lineIndex, fieldsPerLine ))
+    lines.append("<body>")
+    lines.append("records:Record:*")
+    return lines
+
+def synthesizeNestingDepth(depth):
+    """ A chain of depth classes, each holding some fields and the next class in the chain. """
+    lines = [ "<objects>" ]
+    for level in xrange(depth - 1, -1, -1):
+        lines.append("Level%d" % level)
+        lines.append("    " + fieldList( "a", 3 ))
+        if level < depth - 1:
+            lines.append("    child:Level%d" % ( level + 1 ))
+    lines.append("<body>")
+    lines.append("top:Level0")
+    return lines
+
+def synthesizeRepetition(mode):
+    """ REPETITION_CLASSES classes which each repeat a small item class using the given mode. """
+    repetition = {
+        "*": "*",
+        "+": "+",
+        "N": "8",
+        "variable": "count",
+        "!": "count!",
+    }[mode]
+    lines = [ "<objects>", "Item", "    " + fieldList( "a", 3 ) ]
+    for classIndex in xrange(REPETITION_CLASSES):
+        lines.append("Record%d" % classIndex)
+        lines.append("    count:int")
+        lines.append("    items:Item:%s" % repetition)
+    lines.append("Root")
+    for classIndex in xrange(REPETITION_CLASSES):
+        lines.append("    r%d:Record%d" % ( classIndex, classIndex ))
+    lines.append("<body>")
+    lines.append("root:Root")
+    return lines
+
+# ( axis, synthesizer, full sizes, quick sizes )
+AXES = [
+    ( "classes", synthesizeClasses, [ 100, 1000, 5000 ], [ 100, 500 ] ),
+    ( "fieldsPerLine", synthesizeFieldsPerLine, [ 1, 10, 100 ], [ 1, 10 ] ),
+    ( "nestingDepth", synthesizeNestingDepth, [ 10, 100, 500 ], [ 10, 50 ] ),
+    ( "repetition", synthesizeRepetition, [ "*", "+", "N", "variable", "!" ], [ "*", "+", "N", "variable", "!" ] ),
+]
+
+def bestTime( function, repeats=REPEATS ):
+    """ Returns the fastest of several runs of function, and its last result. """
+    best = None
+    for _ in xrange(repeats):
+        start = time.time()
+        result = function()
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+def measure( formatText, outputDirectory ):
+    """ Measures parsing, validating and generating every language for one format. """
+    parseSeconds, parser = bestTime(lambda: InstaParseFormatFileParser(formatInput=formatText))
+    assert not parser.parseFailed(), parser.failureString()
+    objectModel = parser.objectModel
+    validateSeconds, formatObject = bestTime(lambda: InstaParseFormat(objectModel))
+    formatSeen = set()
+    result = {
+        "formatTextBytes": len(formatText),
+        "parseSeconds": parseSeconds,
+        "validateSeconds": validateSeconds,
+        "formatBytes": deepSize( formatObject, formatSeen ),
+        "generators": {},
+    }
+    for language in LANGUAGES:
+        outputName = join(outputDirectory, "Main")
+        codeGenSeconds, _ = bestTime(lambda: generatorClass(language)( outputName, formatObject ).codeGen())
+        # The memory held by a generator is measured after generating, excluding the format it shares
+        generator = generatorClass(language)( outputName, formatObject )
+        generator.generateFiles()
+        result["generators"][language] = {
+            "codeGenSeconds": codeGenSeconds,
+            "outputBytes": sum(outputFile.size for outputFile in generator.outputFiles()),
+            "memoryBytes": deepSize( generator, set(formatSeen) ),
+        }
+    return result
+
+def runSuite(quick):
+    results = []
+    outputDirectory = tempfile.mkdtemp()
+    try:
+        for axis, synthesize, sizes, quickSizes in AXES:
+            for size in quickSizes if quick else sizes:
+                formatText = "\n".join(synthesize(size)) + "\n"
+                result = measure( formatText, outputDirectory )
+                result["axis"] = axis
+                result["size"] = size
+                results.append(result)
+                printResult(result)
+    finally:
+        shutil.rmtree(outputDirectory)
+    return results
+
+def printResult(result):
+    timings = " ".join("%8.2f" % ( result["generators"][language]["codeGenSeconds"] * 1000 ) for language in LANGUAGES)
+    print "%-14s %8s %9.2f %9.2f %s %10.1f" % ( result["axis"], result["size"], result["parseSeconds"] * 1000,
+        result["validateSeconds"] * 1000, timings, result["formatBytes"] / 1024.0 )
+
+def measurements(result):
+    """ Yields ( name, value ) for every number of a result that should not grow. """
+    for name in ( "parseSeconds", "validateSeconds", "formatBytes" ):
+        yield name, result[name]
+    for language, measured in sorted(result["generators"].items()):
+        for name, value in sorted(measured.items()):
+            yield "%s.%s" % ( language, name ), value
+
+def compare( results, baseline, tolerance ):
+    """ Prints every measurement that is more than tolerance times its baseline value and returns
+    how many there were. Measurements missing from the baseline are ignored. """
+    baselineResults = dict(( ( result["axis"], str(result["size"]) ), result ) for result in baseline["results"])
+    regressions = 0
+    for result in results:
+        baselineResult = baselineResults.get(( result["axis"], str(result["size"]) ))
+        if baselineResult is None:
+            continue
+        baselineValues = dict(measurements(baselineResult))
+        for name, value in measurements(result):
+            baselineValue = baselineValues.get(name)
+            if baselineValue and value > baselineValue * tolerance:
+                print "REGRESSION %s=%s %s: %.4g -> %.4g (%.2fx)" % ( result["axis"], result["size"], name,
+                    baselineValue, value, value / baselineValue )
+                regressions += 1
+    return regressions
+
+def main():
+    optParser = OptionParser(usage = "usage: %prog [options]")
+    optParser.add_option( "-o", "--output", action = "store", dest = "outputFileName", default = "codegen_suite.json",
+            help = "file the results are written to as JSON" )
+    optParser.add_option( "--baseline", action = "store", dest = "baselineFileName",
+            help = "results of an earlier run to compare against" )
+    optParser.add_option( "--tolerance", action = "store", type = "float", dest = "tolerance", default = 1.25,
+            help = "how many times its baseline value a measurement may be before it is reported" )
+    optParser.add_option( "--quick", action = "store_true", dest = "quick", default = False,
+            help = "only runs the smaller sizes of each axis" )
+    (options, args) = optParser.parse_args()
+
+    print "%-14s %8s %9s %9s %s %10s" % ( "axis", "size", "parse", "validate",
+        " ".join("%8s" % language for language in LANGUAGES), "format KB" )
+    results = runSuite(options.quick)
+    outputFile = open( options.outputFileName, "w" )
+    json.dump({ "python": platform.python_version(), "time": time.time(), "results": results }, outputFile, indent=2)
+    outputFile.close()
+    print "Times are in ms. Results written to %s." % options.outputFileName
+
+    if options.baselineFileName:
+        regressions = compare( results, json.load(open( options.baselineFileName, "r" )), options.tolerance )
+        print "%d regressions." % regressions
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
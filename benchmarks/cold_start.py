@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+""" Measures the cold start cost of the instaparse.py command line tool, i.e. what the web tier
+pays every time it spawns it, for each language. """
+
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+from os.path import dirname, abspath, join
+
+ROOT_DIRECTORY = dirname(dirname(abspath(__file__)))
+RUNS = 20
+LANGUAGES = [ "python", "java", "c++" ]
+FORMAT = """<head>
+  delimiter ","
+<objects>
+Adjacency
+  vertex:int neighbors:list(int)
+Graph
+    name:string
+    adjacencies:Adjacency:+
+<body>
+graphs:Graph:+!
+"""
+
+def runOnce( language, formatFileName, outputName ):
+    """ Runs the tool once, returning the wall time of the process and the import time it reported. """
+    command = [ sys.executable, join(ROOT_DIRECTORY, "instaparse.py"), "--timing", "-l", language,
+        formatFileName, "-o", outputName ]
+    start = time.time()
+    process = subprocess.Popen( command, stderr=subprocess.PIPE )
+    _, timing = process.communicate()
+    elapsed = time.time() - start
+    importTime = 0.0
+    for line in timing.splitlines():
+        if line.startswith("import"):
+            importTime = float(line.split()[1]) / 1000
+    return elapsed, importTime
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+def main():
+    workDirectory = tempfile.mkdtemp()
+    try:
+        formatFileName = join(workDirectory, "input.format")
+        formatFile = open(formatFileName, "w")
+        formatFile.write(FORMAT)
+        formatFile.close()
+        print "%-8s %14s %14s" % ( "language", "process (ms)", "import (ms)" )
+        for language in LANGUAGES:
+            results = [ runOnce( language, formatFileName, join(workDirectory, "Main") ) for _ in xrange(RUNS) ]
+            print "%-8s %14.1f %14.1f" % ( language, median([ r[0] for r in results ]) * 1000,
+                median([ r[1] for r in results ]) * 1000 )
+    finally:
+        shutil.rmtree(workDirectory)
+
+if __name__ == "__main__":
+    main()
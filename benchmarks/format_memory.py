@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+
+""" Reports the memory held per field by a parsed InstaParseFormat, including the object model it
+was built from. """
+
+import gc
+import sys
+from types import ModuleType, ClassType, FunctionType
+from os.path import dirname, abspath
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from instaparse import InstaParseFormatFileParser, InstaParseFormat
+
+FIELD_COUNTS = [ 1000, 10000, 50000 ]
+FIELDS_PER_LINE = 4
+
+def synthesizeFormat(numFields):
+    """ Returns the text of a format file with numFields fields, FIELDS_PER_LINE per line. """
+    lines = [ "<objects>", "Record" ]
+    for lineIndex in xrange(numFields // FIELDS_PER_LINE):
+        lines.append("    " + " ".join("f%d_%d:int" % ( lineIndex, i ) for i in xrange(FIELDS_PER_LINE)))
+    lines.append("<body>")
+    lines.append("records:Record:*")
+    return "\n".join(lines) + "\n"
+
+def deepSize( root, seen=None ):
+    """ Total size in bytes of every object reachable from root, excluding classes and modules which
+    are shared with the rest of the program. Objects whose ids are in seen are not counted, and the
+    ids of all counted objects are added to it. """
+    if seen is None:
+        seen = set()
+    pending = [ root ]
+    total = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance( obj, ( type, ClassType, ModuleType, FunctionType ) ):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        pending.extend(gc.get_referents(obj))
+    return total
+
+def main():
+    print "%8s %12s %16s" % ( "fields", "total (KB)", "bytes per field" )
+    for numFields in FIELD_COUNTS:
+        parser = InstaParseFormatFileParser(formatInput=synthesizeFormat(numFields))
+        formatObject = InstaParseFormat(parser.objectModel)
+        # The parser is dropped so that only the format and the object model it references count.
+        del parser
+        size = deepSize(formatObject)
+        print "%8d %12.1f %16.1f" % ( numFields, size / 1024.0, float(size) / numFields )
+
+if __name__ == "__main__":
+    main()
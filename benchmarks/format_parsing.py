@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+""" Measures InstaParseFormatFileParser throughput on large machine generated format files. """
+
+import sys
+import time
+import shutil
+import tempfile
+from os.path import dirname, abspath, join, getsize
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from instaparse import InstaParseFormatFileParser
+
+CLASS_COUNTS = [ 5000, 20000, 50000 ]
+FIELD_TYPES = [ "int", "float", "string", "bool" ]
+
+def synthesizeFormat(numClasses):
+    """ Returns the text of a format file with numClasses classes, mixing multi-field lines,
+    repeated fields, lists and comments the way generated schemas tend to. """
+    lines = [ "# Generated schema", "<head>", "    delimiter \",\"", "<objects>" ]
+    for classIndex in xrange(numClasses):
+        lines.append("Record%d    # record %d" % ( classIndex, classIndex ))
+        lines.append("    " + " ".join("a%d_%d:%s" % ( classIndex, i, FIELD_TYPES[i % 4] ) for i in xrange(6)))
+        lines.append("    count%d:int" % classIndex)
+        lines.append("    values%d:list(float)" % classIndex)
+        if classIndex > 0:
+            lines.append("    children%d:Record%d:count%d!    # nested" % ( classIndex, classIndex - 1, classIndex ))
+    lines.append("<body>")
+    lines.append("records:Record%d:+" % ( numClasses - 1 ))
+    return "\n".join(lines) + "\n"
+
+def main():
+    workDirectory = tempfile.mkdtemp()
+    try:
+        print "%8s %10s %10s %10s %10s" % ( "classes", "size (MB)", "file (s)", "text (s)", "MB/s" )
+        for numClasses in CLASS_COUNTS:
+            formatText = synthesizeFormat(numClasses)
+            formatFileName = join(workDirectory, "input%d.format" % numClasses)
+            formatFile = open(formatFileName, "w")
+            formatFile.write(formatText)
+            formatFile.close()
+            megabytes = getsize(formatFileName) / 1e6
+
+            start = time.time()
+            parser = InstaParseFormatFileParser(formatFileName)
+            fileTime = time.time() - start
+            assert not parser.parseFailed(), parser.failureString()
+
+            start = time.time()
+            InstaParseFormatFileParser(formatInput=formatText)
+            textTime = time.time() - start
+
+            print "%8d %10.2f %10.3f %10.3f %10.2f" % ( numClasses, megabytes, fileTime, textTime, megabytes / fileTime )
+    finally:
+        shutil.rmtree(workDirectory)
+
+if __name__ == "__main__":
+    main()
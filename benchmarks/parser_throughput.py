@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+
+""" Measures the throughput of the generated Python, Java and C++ parsers on the same inputs.
+
+The parsers for a format are generated in every language, built with the local toolchain and run
+on inputs of increasing size written by inputgen.InputSynthesizer. For each language and input size the wall time, MB/s,
+records (input lines) per second and peak resident memory of the parsing process are reported.
+Languages whose toolchain is not installed are skipped. """
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+from optparse import OptionParser
+from distutils.spawn import find_executable
+from os.path import dirname, abspath, join, getsize
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from instaparse import InstaParseFormatFileParser, InstaParseFormat, generatorClass, LANGUAGE_DIRECTORIES, \
+    CodeGenerator
+from inputgen import InputSynthesizer
+
+LANGUAGES = [ "python", "java", "c++" ]
+DEFAULT_SIZES = "1,10,100"
+FORMAT = """<objects>
+Point
+    x:int y:int label:string
+Record
+    id:int weight:float valid:bool
+    values:list(int)
+    count:int
+    points:Point:count
+<body>
+records:Record:*
+"""
+
+# Drivers that parse the file named by their first argument with the generated parser and exit
+PYTHON_DRIVER = "import sys; sys.path.insert(0, %r); import Main; Main.%s(sys.argv[1])"
+JAVA_DRIVER = """import java.io.RandomAccessFile;
+
+public class Driver
+{
+    public static void main(String[] args) throws Exception
+    {
+        RandomAccessFile f = new RandomAccessFile(args[0], "r");
+        %(util)s.%(parse)s(f);
+        f.close();
+    }
+}
+"""
+CPP_DRIVER = """#include <fstream>
+#include <iostream>
+#include "%(util)s.h"
+
+int main(int argc, char** argv)
+{
+    std::ifstream f(argv[1]);
+    try
+    {
+        %(namespace)s::%(parse)s(f);
+    }
+    catch (std::exception& e)
+    {
+        std::cerr << e.what() << std::endl;
+        return 1;
+    }
+    return 0;
+}
+"""
+
+def countLines(fileName):
+    numLines = 0
+    inputFile = open( fileName, "rb" )
+    for chunk in iter(lambda: inputFile.read(1 << 20), ""):
+        numLines += chunk.count("\n")
+    inputFile.close()
+    return numLines
+
+def build( language, formatObject, directory ):
+    """ Generates and builds the parser for one language in its own subdirectory of directory.
+    Returns the command that parses the input file appended to it, or None if the toolchain of the
+    language is missing. """
+    outputDirectory = join(directory, LANGUAGE_DIRECTORIES[language])
+    os.makedirs(outputDirectory)
+    generator = generatorClass(language)( join(outputDirectory, "Main"), formatObject )
+    generator.codeGen()
+    parseFuncName = generator.typeNameToParseFuncName[formatObject.bodyTypeName()]
+    names = { "util": CodeGenerator.UTIL_FILE_NAME, "namespace": CodeGenerator.PARSER_NAME, "parse": parseFuncName }
+    if language == "python":
+        return [ sys.executable, "-c", PYTHON_DRIVER % ( outputDirectory, CodeGenerator.PARSE_INPUT ) ]
+    if language == "java":
+        if not find_executable("javac") or not find_executable("java"):
+            return None
+        writeFile( join(outputDirectory, "Driver.java"), JAVA_DRIVER % names )
+        subprocess.check_call([ "javac", "-d", outputDirectory ] +
+            [ join(outputDirectory, name) for name in os.listdir(outputDirectory) if name.endswith(".java") ])
+        return [ "java", "-cp", outputDirectory, "Driver" ]
+    if language == "c++":
+        if not find_executable("g++"):
+            return None
+        writeFile( join(outputDirectory, "driver.cpp"), CPP_DRIVER % names )
+        executable = join(outputDirectory, "driver")
+        subprocess.check_call([ "g++", "-O2", "-w", "-o", executable, join(outputDirectory, "driver.cpp") ])
+        return [ executable ]
+
+def writeFile( fileName, contents ):
+    outputFile = open( fileName, "w" )
+    outputFile.write(contents)
+    outputFile.close()
+
+def run( command, inputFileName ):
+    """ Runs a parser on the input, returning its wall time, peak resident memory in bytes and
+    whether it succeeded. """
+    start = time.time()
+    process = subprocess.Popen( command + [ inputFileName ], stdout=open(os.devnull, "w") )
+    # wait4 reports the resource usage of this process alone, unlike getrusage(RUSAGE_CHILDREN).
+    _, status, usage = os.wait4( process.pid, 0 )
+    return time.time() - start, usage.ru_maxrss * 1024, status == 0
+
+def main():
+    optParser = OptionParser(usage = "usage: %prog [options]")
+    optParser.add_option( "--format", action = "store", dest = "formatFileName",
+            help = "format file of the parsers to measure. Defaults to a built in format." )
+    optParser.add_option( "--input", action = "store", dest = "inputFileName",
+            help = "input file to parse instead of synthesized inputs" )
+    optParser.add_option( "--sizes", action = "store", dest = "sizes", default = DEFAULT_SIZES,
+            help = "comma separated sizes in MB of the synthesized inputs" )
+    optParser.add_option( "--seed", action = "store", type = "int", dest = "seed", default = 0,
+            help = "seed of the synthesized inputs" )
+    optParser.add_option( "-l", "--lang", action = "store", dest = "languages", default = ",".join(LANGUAGES),
+            help = "comma separated languages to measure" )
+    optParser.add_option( "-o", "--output", action = "store", dest = "outputFileName",
+            help = "also writes the results to this file as JSON" )
+    (options, args) = optParser.parse_args()
+
+    workDirectory = tempfile.mkdtemp()
+    try:
+        if options.formatFileName:
+            parser = InstaParseFormatFileParser(options.formatFileName)
+        else:
+            parser = InstaParseFormatFileParser(formatInput=FORMAT)
+        if parser.parseFailed():
+            sys.exit(parser.failureString())
+        formatObject = InstaParseFormat(parser.objectModel)
+
+        commands = {}
+        for language in options.languages.split(","):
+            commands[language] = build( language, formatObject, workDirectory )
+            if commands[language] is None:
+                print "Skipping %s, its toolchain is not installed." % language
+
+        if options.inputFileName:
+            inputs = [ ( options.inputFileName, countLines(options.inputFileName) ) ]
+        else:
+            inputs = []
+            for size in options.sizes.split(","):
+                inputFileName = join(workDirectory, "input%sMB.txt" % size)
+                inputFile = open( inputFileName, "w" )
+                synthesizer = InputSynthesizer( formatObject, options.seed )
+                synthesizer.write( inputFile, int(float(size) * 1e6) )
+                inputFile.close()
+                inputs.append(( inputFileName, synthesizer.numLines ))
+
+        results = []
+        print "%-8s %10s %10s %10s %12s %10s" % ( "language", "size (MB)", "time (s)", "MB/s", "records/s", "peak MB" )
+        for inputFileName, numLines in inputs:
+            megabytes = getsize(inputFileName) / 1e6
+            for language in options.languages.split(","):
+                if commands[language] is None:
+                    continue
+                seconds, peakBytes, succeeded = run( commands[language], inputFileName )
+                results.append({ "language": language, "inputBytes": getsize(inputFileName), "records": numLines,
+                    "seconds": seconds, "peakBytes": peakBytes, "succeeded": succeeded })
+                if not succeeded:
+                    print "%-8s %10.1f failed after %.2fs" % ( language, megabytes, seconds )
+                    continue
+                print "%-8s %10.1f %10.3f %10.2f %12.0f %10.1f" % ( language, megabytes, seconds, megabytes / seconds,
+                    numLines / seconds, peakBytes / 1e6 )
+        if options.outputFileName:
+            outputFile = open( options.outputFileName, "w" )
+            json.dump({ "time": time.time(), "results": results }, outputFile, indent=2)
+            outputFile.close()
+    finally:
+        shutil.rmtree(workDirectory)
+
+if __name__ == "__main__":
+    main()
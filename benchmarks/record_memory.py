@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+
+""" Compares the memory held by the objects parsed by generated Python parsers whose data classes
+use __slots__, the default, with that of parsers generated with the dict-classes option, whose
+objects each carry a __dict__.
+
+Both parsers parse the same inputs written by inputgen.InputSynthesizer, each in its own process.
+For each input size the parse time, the size of the parsed objects and the peak resident memory of
+the parsing process are reported. """
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+from optparse import OptionParser
+from os.path import dirname, abspath, join, getsize
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from instaparse import InstaParseFormatFileParser, InstaParseFormat, generatorClass, CodeGenerator
+from inputgen import InputSynthesizer
+
+# Name and generator options of each kind of data class compared
+VARIANTS = [ ( "dict", [ "dict-classes" ] ), ( "slots", [] ) ]
+DEFAULT_SIZES = "10,50"
+FORMAT = """<objects>
+Point
+    x:int y:int
+Record
+    id:int weight:float valid:bool label:string
+    count:int
+    points:Point:count
+<body>
+records:Record:*
+"""
+
+# Parses the file named by its first argument and prints the measurements as JSON. The peak
+# memory is read before the parsed objects are walked to measure their size.
+DRIVER = """import sys, json, time, resource
+sys.path.insert(0, %(parserDirectory)r)
+sys.path.insert(0, %(benchmarkDirectory)r)
+import Main
+from format_memory import deepSize
+start = time.time()
+body = Main.%(parse)s(sys.argv[1])
+seconds = time.time() - start
+peakBytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+print json.dumps({ "seconds": seconds, "peakBytes": peakBytes, "objectBytes": deepSize(body) })
+"""
+
+def build( formatObject, options, directory ):
+    """ Generates the Python parser with the given generator options into directory. Returns the
+    command that parses the input file appended to it. """
+    os.makedirs(directory)
+    generatorClass("python")( join(directory, "Main"), formatObject, options=options ).codeGen()
+    driver = DRIVER % { "parserDirectory": directory, "benchmarkDirectory": dirname(abspath(__file__)),
+        "parse": CodeGenerator.PARSE_INPUT }
+    return [ sys.executable, "-c", driver ]
+
+def main():
+    optParser = OptionParser(usage = "usage: %prog [options]")
+    optParser.add_option( "--format", action = "store", dest = "formatFileName",
+            help = "format file of the parsers to measure. Defaults to a built in format." )
+    optParser.add_option( "--input", action = "store", dest = "inputFileName",
+            help = "input file to parse instead of synthesized inputs" )
+    optParser.add_option( "--sizes", action = "store", dest = "sizes", default = DEFAULT_SIZES,
+            help = "comma separated sizes in MB of the synthesized inputs" )
+    optParser.add_option( "--seed", action = "store", type = "int", dest = "seed", default = 0,
+            help = "seed of the synthesized inputs" )
+    optParser.add_option( "-o", "--output", action = "store", dest = "outputFileName",
+            help = "also writes the results to this file as JSON" )
+    (options, args) = optParser.parse_args()
+
+    workDirectory = tempfile.mkdtemp()
+    try:
+        if options.formatFileName:
+            parser = InstaParseFormatFileParser(options.formatFileName)
+        else:
+            parser = InstaParseFormatFileParser(formatInput=FORMAT)
+        if parser.parseFailed():
+            sys.exit(parser.failureString())
+        formatObject = InstaParseFormat(parser.objectModel)
+
+        commands = [ ( name, build( formatObject, generatorOptions, join(workDirectory, name) ) )
+                     for name, generatorOptions in VARIANTS ]
+
+        if options.inputFileName:
+            inputFileNames = [ options.inputFileName ]
+        else:
+            inputFileNames = []
+            for size in options.sizes.split(","):
+                inputFileName = join(workDirectory, "input%sMB.txt" % size)
+                inputFile = open( inputFileName, "w" )
+                InputSynthesizer( formatObject, options.seed ).write( inputFile, int(float(size) * 1e6) )
+                inputFile.close()
+                inputFileNames.append(inputFileName)
+
+        results = []
+        print "%-8s %10s %10s %12s %10s" % ( "classes", "size (MB)", "time (s)", "objects MB", "peak MB" )
+        for inputFileName in inputFileNames:
+            megabytes = getsize(inputFileName) / 1e6
+            for name, command in commands:
+                process = subprocess.Popen( command + [ inputFileName ], stdout=subprocess.PIPE )
+                output = process.communicate()[0]
+                if process.returncode != 0:
+                    print "%-8s %10.1f failed" % ( name, megabytes )
+                    continue
+                result = json.loads(output)
+                result.update({ "classes": name, "inputBytes": getsize(inputFileName) })
+                results.append(result)
+                print "%-8s %10.1f %10.3f %12.1f %10.1f" % ( name, megabytes, result["seconds"],
+                    result["objectBytes"] / 1e6, result["peakBytes"] / 1e6 )
+        if options.outputFileName:
+            outputFile = open( options.outputFileName, "w" )
+            json.dump({ "time": time.time(), "results": results }, outputFile, indent=2)
+            outputFile.close()
+    finally:
+        shutil.rmtree(workDirectory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+
+""" Compares generated Python parsers with a parser function per class, the default, with those
+generated with the table-driven option, whose classes are parsed by running a table of operations.
+
+For formats with a growing number of classes, the size of the generated util file and the time to
+import it once it is byte compiled are reported. The time to parse an input written by
+inputgen.InputSynthesizer for the largest format is reported as well. """
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+from optparse import OptionParser
+from os.path import dirname, abspath, join, getsize
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from instaparse import InstaParseFormatFileParser, InstaParseFormat, generatorClass, CodeGenerator
+from inputgen import InputSynthesizer
+
+# Name and generator options of each kind of parser compared
+VARIANTS = [ ( "emitted", [] ), ( "table", [ "table-driven" ] ) ]
+CLASS_COUNTS = [ 10, 100, 1000 ]
+DEFAULT_SIZE = "10"
+
+# Imports the generated parser and parses the file named by its first argument, printing the
+# import and parse times as JSON.
+DRIVER = """import sys, json, time
+sys.path.insert(0, %(parserDirectory)r)
+start = time.time()
+import Main
+importSeconds = time.time() - start
+start = time.time()
+Main.%(parse)s(sys.argv[1])
+print json.dumps({ "importSeconds": importSeconds, "parseSeconds": time.time() - start })
+"""
+
+def synthesizeFormat(numClasses):
+    """ Returns the text of a format whose body repeats a record holding one instance of each of
+    numClasses classes, with fields of every primitive type. """
+    lines = [ "<objects>" ]
+    for classIndex in xrange(numClasses):
+        lines.append("Part%d" % classIndex)
+        lines.append("    id:int weight:float valid:bool")
+        lines.append("    label:string")
+    lines.append("Record")
+    for classIndex in xrange(numClasses):
+        lines.append("    part%d:Part%d" % ( classIndex, classIndex ))
+    lines.append("<body>")
+    lines.append("records:Record:*")
+    return "\n".join(lines) + "\n"
+
+def build( formatObject, options, directory ):
+    """ Generates the Python parser with the given generator options into directory and byte
+    compiles it. Returns the command that parses the input file appended to it. """
+    os.makedirs(directory)
+    generatorClass("python")( join(directory, "Main"), formatObject, options=options ).codeGen()
+    subprocess.check_call([ sys.executable, "-m", "compileall", "-q", directory ])
+    driver = DRIVER % { "parserDirectory": directory, "parse": CodeGenerator.PARSE_INPUT }
+    return [ sys.executable, "-c", driver ]
+
+def main():
+    optParser = OptionParser(usage = "usage: %prog [options]")
+    optParser.add_option( "--size", action = "store", dest = "size", default = DEFAULT_SIZE,
+            help = "size in MB of the synthesized input parsed for the largest format" )
+    optParser.add_option( "--seed", action = "store", type = "int", dest = "seed", default = 0,
+            help = "seed of the synthesized input" )
+    optParser.add_option( "-o", "--output", action = "store", dest = "outputFileName",
+            help = "also writes the results to this file as JSON" )
+    (options, args) = optParser.parse_args()
+
+    workDirectory = tempfile.mkdtemp()
+    try:
+        results = []
+        print "%-8s %8s %10s %11s %10s" % ( "parser", "classes", "util KB", "import (s)", "parse (s)" )
+        for numClasses in CLASS_COUNTS:
+            parser = InstaParseFormatFileParser(formatInput=synthesizeFormat(numClasses))
+            if parser.parseFailed():
+                sys.exit(parser.failureString())
+            formatObject = InstaParseFormat(parser.objectModel)
+
+            # Only the input of the largest format is parsed, an empty input is enough to import
+            inputFileName = join(workDirectory, "input%d.txt" % numClasses)
+            inputFile = open( inputFileName, "w" )
+            if numClasses == CLASS_COUNTS[-1]:
+                InputSynthesizer( formatObject, options.seed ).write( inputFile, int(float(options.size) * 1e6) )
+            inputFile.close()
+
+            for name, generatorOptions in VARIANTS:
+                directory = join(workDirectory, "%s%d" % ( name, numClasses ))
+                command = build( formatObject, generatorOptions, directory )
+                process = subprocess.Popen( command + [ inputFileName ], stdout=subprocess.PIPE )
+                output = process.communicate()[0]
+                if process.returncode != 0:
+                    print "%-8s %8d failed" % ( name, numClasses )
+                    continue
+                result = json.loads(output)
+                result.update({ "parser": name, "classes": numClasses,
+                    "utilBytes": getsize(join(directory, CodeGenerator.UTIL_FILE_NAME + ".py")) })
+                results.append(result)
+                parseSeconds = "%10.3f" % result["parseSeconds"] if numClasses == CLASS_COUNTS[-1] else "%10s" % "-"
+                print "%-8s %8d %10.1f %11.3f %s" % ( name, numClasses, result["utilBytes"] / 1e3,
+                    result["importSeconds"], parseSeconds )
+        if options.outputFileName:
+            outputFile = open( options.outputFileName, "w" )
+            json.dump({ "results": results }, outputFile, indent=2)
+            outputFile.close()
+    finally:
+        shutil.rmtree(workDirectory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+var path = require("path");
+var os = require("os");
+var readline = require("readline");
+var childProcess = require("child_process");
+
+//============================================================
+// Pool of warm code generation workers
+//============================================================
+
+// Each worker is a long running "python instaparse.py --server" process. Requests and responses
+// are single lines of JSON, matched up by id, so a worker can have several requests in flight.
+
+var scriptPath = path.join(__dirname, "instaparse.py");
+var poolSize = parseInt(process.env.CODEGEN_WORKERS, 10) || os.cpus().length;
+
+// Every worker keeps its own in-memory cache of generated sources. Setting CODEGEN_CACHE_DIR adds
+// an on-disk cache shared by all workers.
+var workerArgs = [scriptPath, "--server"];
+if (process.env.CODEGEN_CACHE_DIR)
+    workerArgs.push("--cache-dir", process.env.CODEGEN_CACHE_DIR);
+
+// Setting CODEGEN_PROFILE asks the workers for the time spent in each phase of code generation,
+// which is passed to callbacks as a third argument.
+var shouldProfile = !!process.env.CODEGEN_PROFILE;
+
+var workers = [];
+var nextRequestId = 0;
+
+// A worker that keeps failing, e.g. because python cannot be started, is restarted after a delay that
+// doubles each time, up to maxRespawnDelay, and goes back to the initial delay once it answers.
+var initialRespawnDelay = 100;
+var maxRespawnDelay = 30000;
+var respawnDelays = [];
+
+var spawnWorker = function(index) {
+    var worker = {
+        process: childProcess.spawn("python", workerArgs),
+        pending: {},
+        numPending: 0,
+        alive: true
+    };
+
+    readline.createInterface({ input: worker.process.stdout }).on("line", function(line) {
+        var response;
+        try {
+            response = JSON.parse(line);
+        } catch (e) {
+            console.log("Codegen worker sent an invalid response: " + line);
+            return;
+        }
+        respawnDelays[index] = initialRespawnDelay;
+        var callback = worker.pending[response.id];
+        if (!callback)
+            return;
+        delete worker.pending[response.id];
+        worker.numPending -= 1;
+        if ("error" in response) {
+            callback(response.error);
+        } else {
+            callback(null, response.result, response.profile);
+        }
+    });
+
+    worker.process.stderr.on("data", function(data) {
+        console.log("Codegen worker: " + data.toString());
+    });
+
+    // Fail whatever was in flight and replace the worker so the pool stays full. A process that could
+    // not be started emits "error" and may or may not emit "exit" too.
+    var retire = function(reason) {
+        if (!worker.alive)
+            return;
+        worker.alive = false;
+        for (var id in worker.pending)
+            worker.pending[id]("Code generation failed. Try again!");
+        worker.pending = {};
+        worker.numPending = 0;
+        var delay = respawnDelays[index] || initialRespawnDelay;
+        respawnDelays[index] = Math.min(delay * 2, maxRespawnDelay);
+        console.log(reason + ", restarting in " + delay + " ms.");
+        setTimeout(function() {
+            workers[index] = spawnWorker(index);
+        }, delay);
+    };
+    worker.process.on("error", function(err) {
+        retire("Codegen worker failed: " + err.message);
+    });
+    worker.process.on("exit", function(code) {
+        retire("Codegen worker exited with code " + code);
+    });
+    // Writing to a worker that died fails with EPIPE, its requests are failed by retire.
+    worker.process.stdin.on("error", function() {});
+
+    return worker;
+};
+
+// Returns null while every worker is waiting to be restarted.
+var leastBusyWorker = function() {
+    var result = null;
+    workers.forEach(function(worker) {
+        if (worker.alive && (!result || worker.numPending < result.numPending))
+            result = worker;
+    });
+    return result;
+};
+
+// Calls back with (error, bundle, profile) where bundle has the main, util, data and classes entries
+// expected by the editor, and profile is only set if profiling is enabled.
+var generate = function(language, input, callback) {
+    if (workers.length == 0) {
+        for (var i = 0; i < poolSize; i++)
+            workers.push(spawnWorker(i));
+    }
+
+    var worker = leastBusyWorker();
+    if (!worker) {
+        callback("Code generation failed. Try again!");
+        return;
+    }
+    var id = nextRequestId++;
+    worker.pending[id] = callback;
+    worker.numPending += 1;
+    worker.process.stdin.write(JSON.stringify({ id: id, language: language, input: input, mainName: "Main", profile: shouldProfile }) + "\n");
+};
+
+module.exports = { generate: generate };
@@ -0,0 +1,2 @@
+""" Code generators for each language supported by InstaParse. Each module is only imported when
+its language is requested, see `instaparse.generatorClass`. """
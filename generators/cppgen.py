@@ -0,0 +1,1089 @@
+#!/usr/bin/env python
+
+""" Generates InstaParse parsers in C++. """
+
+from instaparse import CodeGenerator, InstaParseFile, WHITESPACE_CHARACTERS
+
+
+def cppgenStaticHelpers():
+    helpers = """
+static const std::string ws = " \\t\\n\\r\\f\\v";
+
+inline std::string rtrim(std::string s, std::string t = ws)
+{
+\ts.erase(s.find_last_not_of(t) + 1);
+\treturn s;
+}
+
+inline std::string ltrim(std::string s, std::string t = ws)
+{
+\ts.erase(0, s.find_first_not_of(t));
+\treturn s;
+}
+
+inline std::string trim(std::string s, std::string t = ws)
+{
+\treturn ltrim(rtrim(s, t), t);
+}
+
+std::vector<std::string> copyRange(std::vector<std::string> v, int begin, int end)
+{
+\tusing namespace std;
+\tvector<string>::const_iterator first = v.begin() + begin;
+\tvector<string>::const_iterator last = v.begin() + end;
+\treturn vector<string>(first, last);
+}
+
+std::vector<std::string> split(std::string s, std::string delim) {
+\tusing namespace std;
+\tvector<string> result;
+
+\tsize_t delimLength = delim.length();
+\tsize_t start = 0, end = 0;
+\twhile ((end = s.find(delim, start)) != string::npos) {
+\t\tresult.push_back(s.substr(start, end - start));
+\t\tstart = end + delimLength;
+\t}
+\tresult.push_back(s.substr(start, s.length() - start));
+
+\treturn result;
+}
+
+std::string lowercase(std::string &s)
+{
+\tusing namespace std;
+\tchar result[s.length() + 1];
+\tfor (unsigned int i = 0; i < s.length(); i++)
+\t{
+\t\tresult[i] = tolower(s[i]);
+\t}
+\tresult[s.length()] = '\0';
+\treturn string(result);
+}
+
+// A parser error on the line holding byte pos of the file. Backtracking discards most errors, so the
+// parsers do not track line numbers and lineNumberAt only counts them for the error that is reported.
+class ParserError : public std::invalid_argument
+{
+public:
+\tstd::streamoff pos;
+
+\tParserError(std::streamoff pos, const std::string &message) : std::invalid_argument(message), pos(pos)
+\t{
+\t}
+};
+
+// Returns the position of the next line of the file, also once its end is reached
+std::streamoff nextLinePos(std::ifstream &f)
+{
+\tusing namespace std;
+\tios_base::iostate state = f.rdstate();
+\tf.clear();
+\tstreamoff pos = f.tellg();
+\tf.clear(state);
+\treturn pos;
+}
+
+// Returns a position on the line last read from the file, the position of the next line if reading it
+// failed at the end of the file
+std::streamoff lastLinePos(std::ifstream &f)
+{
+\tusing namespace std;
+\treturn f.fail() ? nextLinePos(f) : nextLinePos(f) - 1;
+}
+
+// Returns the number of the line holding byte pos of the file named filename. Past the end of a file
+// whose last line has no newline is the line after it.
+int lineNumberAt(const std::string &filename, std::streamoff pos)
+{
+\tusing namespace std;
+\tifstream f(filename.c_str(), ios_base::in | ios_base::binary);
+\tint lineNumber = 1;
+\tint previous = '\\n';
+\tfor (streamoff i = 0; i < pos; i++)
+\t{
+\t\tint c = f.get();
+\t\tif (c == char_traits<char>::eof())
+\t\t\tbreak;
+\t\tif (c == '\\n')
+\t\t\tlineNumber++;
+\t\tprevious = c;
+\t}
+\tif (previous != '\\n' && f.peek() == char_traits<char>::eof())
+\t\tlineNumber++;
+\treturn lineNumber;
+}
+
+int cppgenParseInt(std::string s, std::ifstream &f)
+{
+\tusing namespace std;
+\tstringstream ss(s);
+\tint result;
+\tss >> result;
+\tif (!ss.eof() || ss.fail())
+\t{
+\t\tthrow ParserError(lastLinePos(f), "Could not parse \\"" + s + "\\" as int.");
+\t}
+\treturn result;
+}
+
+bool cppgenParseBool(std::string s, std::ifstream &f)
+{
+\tusing namespace std;
+\tif (s.compare("1") == 0 || lowercase(s).compare("true") == 0)
+\t{
+\t\treturn true;
+\t}
+\telse if (s.compare("0") == 0 || lowercase(s).compare("false") == 0)
+\t{
+\t\treturn false;
+\t}
+
+\tthrow ParserError(lastLinePos(f), "Could not parse \\"" + s + "\\" as bool.");
+}
+
+std::string cppgenParseString(std::string s, std::ifstream &f)
+{
+\treturn s;
+}
+
+float cppgenParseFloat(std::string s, std::ifstream &f)
+{
+\tusing namespace std;
+\tstringstream ss(s);
+\tfloat result;
+\tss >> result;
+\tif (!ss.eof() || ss.fail())
+\t{
+\t\tthrow ParserError(lastLinePos(f), "Could not parse \\"" + s + "\\" as float.");
+\t}
+\treturn result;
+}
+
+// Converts s to an int like cppgenParseInt, without building a stringstream. Returns false instead of
+// throwing when it cannot, for the line to be parsed again field by field to report the error.
+inline bool convertInt(const std::string &s, int &result)
+{
+\tusing namespace std;
+\tconst char *begin = s.c_str();
+\tchar *end;
+\terrno = 0;
+\tlong value = strtol(begin, &end, 10);
+\tif (end == begin || end != begin + s.length() || errno != 0 || value < INT_MIN || value > INT_MAX)
+\t{
+\t\treturn false;
+\t}
+\tresult = (int) value;
+\treturn true;
+}
+
+// Like convertInt for floats. Only plain decimal numbers are converted, the other strings that
+// cppgenParseFloat may accept or reject are left to it.
+inline bool convertFloat(const std::string &s, float &result)
+{
+\tusing namespace std;
+\tif (s.empty() || s.find_first_not_of("0123456789+-.eE") != string::npos)
+\t{
+\t\treturn false;
+\t}
+\tconst char *begin = s.c_str();
+\tchar *end;
+\terrno = 0;
+\tfloat value = strtof(begin, &end);
+\tif (end != begin + s.length() || errno != 0)
+\t{
+\t\treturn false;
+\t}
+\tresult = value;
+\treturn true;
+}
+
+std::vector<int> cppgenParseIntList(std::vector<std::string> strings, std::ifstream &f)
+{
+\tusing namespace std;
+\tif (strings.size() == 0)
+\t{
+\t\tthrow ParserError(lastLinePos(f), "Could not parse empty string as list.");
+\t}
+\tvector<int> resval;
+\tfor (unsigned int i = 0; i < strings.size(); i++)
+\t{
+\t\tresval.push_back(cppgenParseInt(strings[i], f));
+\t}
+\treturn resval;
+}
+
+std::vector<bool> cppgenParseBoolList(std::vector<std::string> strings, std::ifstream &f)
+{
+\tusing namespace std;
+\tif (strings.size() == 0)
+\t{
+\t\tthrow ParserError(lastLinePos(f), "Could not parse empty string as list.");
+\t}
+\tvector<bool> resval;
+\tfor (unsigned int i = 0; i < strings.size(); i++)
+\t{
+\t\tresval.push_back(cppgenParseBool(strings[i], f));
+\t}
+\treturn resval;
+}
+
+std::vector<std::string> cppgenParseStringList(std::vector<std::string> strings, std::ifstream &f)
+{
+\tusing namespace std;
+\tif (strings.size() == 0)
+\t{
+\t\tthrow ParserError(lastLinePos(f), "Could not parse empty string as list.");
+\t}
+\tvector<string> resval;
+\tfor (unsigned int i = 0; i < strings.size(); i++)
+\t{
+\t\tresval.push_back(cppgenParseString(strings[i], f));
+\t}
+\treturn resval;
+}
+
+std::vector<float> cppgenParseFloatList(std::vector<std::string> strings, std::ifstream &f)
+{
+\tusing namespace std;
+\tif (strings.size() == 0)
+\t{
+\t\tthrow ParserError(lastLinePos(f), "Could not parse empty string as list.");
+\t}
+\tvector<float> resval;
+\tfor (unsigned int i = 0; i < strings.size(); i++)
+\t{
+\t\tresval.push_back(cppgenParseFloat(strings[i], f));
+\t}
+\treturn resval;
+}
+
+std::string readLine(std::ifstream &f, std::string className)
+{
+\tusing namespace std;
+\t// Peeking also finds the end once nextLineStartsWith cleared eofbit there, and sets only eofbit so
+\t// that the file can still be seeked
+\tif (f.eof() || f.peek() == char_traits<char>::eof())
+\t{
+\t\tstringstream err;
+\t\terr << "Parser Error: Reached end of file while parsing object \\"" << className << "\\".";
+\t\tthrow runtime_error(err.str());
+\t}
+\tstring result;
+\tgetline(f, result);
+\tif (f.bad())
+\t{
+\t\tthrow runtime_error("IO Error: Unknown problem when reading input file.");
+\t}
+\treturn result;
+}
+
+void seek(std::ifstream &f, std::streampos pos)
+{
+\tusing namespace std;
+\tf.seekg(pos);
+\tif (f.bad())
+\t{
+\t\tthrow runtime_error("IO Error: Unknown problem when reading input file.");
+\t}
+}
+
+bool nextLineStartsWith(std::ifstream &f, const char* characters)
+{
+\tusing namespace std;
+\t// Peeking once eofbit is set would fail and set failbit, which seeking does not clear
+\tint c = f.eof() ? char_traits<char>::eof() : f.peek();
+\tif (c == char_traits<char>::eof())
+\t{
+\t\t// Peeking at the end sets eofbit, which would make the next getFilePointer fail.
+\t\tf.clear(f.rdstate() & ~ios_base::eofbit);
+\t\treturn false;
+\t}
+\treturn characters == NULL || strchr(characters, c) != NULL;
+}
+
+std::streampos getFilePointer(std::ifstream &f)
+{
+\tusing namespace std;
+\t// Reading the last line of a file without a newline at its end sets eofbit, which makes tellg fail
+\tios_base::iostate state = f.rdstate();
+\tf.clear(state & ~ios_base::eofbit);
+\tstreampos pos = f.tellg();
+\tf.clear(state);
+\tif (pos == -1)
+\t{
+\t\tthrow runtime_error("IO Error: Unknown problem when reading input file.");
+\t}
+\treturn pos;
+}
+"""
+
+    helpers = helpers.replace("cppgenParseIntList", CodeGenerator.PARSE_INT_LIST)
+    helpers = helpers.replace("cppgenParseBoolList", CodeGenerator.PARSE_BOOL_LIST)
+    helpers = helpers.replace("cppgenParseStringList", CodeGenerator.PARSE_STRING_LIST)
+    helpers = helpers.replace("cppgenParseFloatList", CodeGenerator.PARSE_FLOAT_LIST)
+    helpers = helpers.replace("cppgenParseInt", CodeGenerator.PARSE_INT)
+    helpers = helpers.replace("cppgenParseBool", CodeGenerator.PARSE_BOOL)
+    helpers = helpers.replace("cppgenParseString", CodeGenerator.PARSE_STRING)
+    helpers = helpers.replace("cppgenParseFloat", CodeGenerator.PARSE_FLOAT)
+
+    # Replace the tabs with the appropriate amount of indent spaces
+    helpers = helpers.replace( "    ", InstaParseFile.indentString )
+
+    return helpers
+
+
+
+# Parses the chunks of a repetition split by empty lines for parallelparse. A chunk starts with an
+# instance and ends just before an empty line, or at the end of the file, so that the threads parsing
+# the chunks stop where parsing the whole repetition sequentially would unless they reach the end.
+cppgenParallelHelpers = """
+template <typename T>
+struct Chunk
+{
+\t// The instances parsed from a chunk of the file, the file position after the last one and whether
+\t// the chunk was parsed to its end
+\tstd::vector<T> instances;
+\tstd::streamoff pos;
+\tbool complete;
+};
+
+// Parses the instances of a repetition split by empty lines from position start of the file, until the
+// chunk ends at position end or the repetition cannot go on
+template <typename T>
+void parseChunk(const std::string &filename, std::streamoff start, std::streamoff end, T (*parse)(std::ifstream&),
+\tChunk<T> &chunk)
+{
+\tusing namespace std;
+\tchunk.pos = start;
+\tchunk.complete = false;
+\tifstream f(filename.c_str(), ios_base::in);
+\tseek(f, start);
+\twhile (true)
+\t{
+\t\ttry
+\t\t{
+\t\t\tchunk.instances.push_back(parse(f));
+\t\t\t// The last instance of a file without a newline at its end leaves eofbit set
+\t\t\tchunk.pos = nextLinePos(f);
+\t\t}
+\t\tcatch (...)
+\t\t{
+\t\t\treturn;
+\t\t}
+\t\tif (chunk.pos >= end)
+\t\t{
+\t\t\tchunk.complete = chunk.pos == end;
+\t\t\treturn;
+\t\t}
+\t\tif (!(trim(readLine(f, "")).compare("") == 0))
+\t\t\treturn;
+\t}
+}
+
+// Returns the position of the first empty line at least chunkSize bytes after position start of the
+// file, or the end of the file
+std::streamoff findChunkEnd(std::ifstream &f, std::streamoff start, std::streamoff chunkSize)
+{
+\tusing namespace std;
+\tchar buffer[1 << 16];
+\tstreamoff pos = start;
+\tint previous = -1;
+\tf.clear();
+\tseek(f, start);
+\twhile (f.read(buffer, sizeof(buffer)) || f.gcount() > 0)
+\t{
+\t\tstreamsize n = f.gcount();
+\t\tfor (streamsize i = 0; i < n; i++, pos++)
+\t\t{
+\t\t\tif (buffer[i] == '\\n' && previous == '\\n' && pos - start >= chunkSize)
+\t\t\t\treturn pos;
+\t\t\tprevious = buffer[i];
+\t\t}
+\t}
+\treturn pos;
+}
+
+// Parses the instances of a repetition split by empty lines from the current position of the file. The
+// rest of the file is split at empty lines into chunks of about chunkSize bytes parsed by numThreads
+// threads. Leaves the file after the last instance.
+template <typename T>
+std::vector<T> parseInChunks(std::ifstream &f, const std::string &filename, int numThreads, std::streamoff chunkSize,
+\tT (*parse)(std::ifstream&))
+{
+\tusing namespace std;
+\tvector<streamoff> starts, ends;
+\tstreamoff pos = getFilePointer(f);
+\tf.seekg(0, ios_base::end);
+\tstreamoff length = getFilePointer(f);
+\tfor (streamoff start = pos; start < length; )
+\t{
+\t\tstreamoff end = findChunkEnd(f, start, chunkSize);
+\t\tstarts.push_back(start);
+\t\tends.push_back(end);
+\t\t// The empty line after the chunk belongs to no chunk
+\t\tstart = end + 1;
+\t}
+\tvector<Chunk<T> > chunks(starts.size());
+\tatomic<size_t> nextChunk(0);
+\t// Chunks from endChunk on are not handed out, the repetition ends before them
+\tatomic<size_t> endChunk(chunks.size());
+\tvector<thread> threads;
+\tfor (int i = 0; i < max(numThreads, 1); i++)
+\t{
+\t\tthreads.push_back(thread([&]()
+\t\t{
+\t\t\tfor (size_t j = nextChunk++; j < endChunk; j = nextChunk++)
+\t\t\t{
+\t\t\t\ttry
+\t\t\t\t{
+\t\t\t\t\tparseChunk(filename, starts[j], ends[j], parse, chunks[j]);
+\t\t\t\t}
+\t\t\t\tcatch (...)
+\t\t\t\t{
+\t\t\t\t}
+\t\t\t\t// An incomplete chunk ends the repetition
+\t\t\t\tsize_t end = endChunk;
+\t\t\t\twhile (!chunks[j].complete && j + 1 < end && !endChunk.compare_exchange_weak(end, j + 1))
+\t\t\t\t{
+\t\t\t\t}
+\t\t\t}
+\t\t}));
+\t}
+\tfor (size_t i = 0; i < threads.size(); i++)
+\t\tthreads[i].join();
+\tvector<T> instances;
+\tfor (size_t i = 0; i < chunks.size(); i++)
+\t{
+\t\t// No instances in a chunk means the repetition ended with the previous one
+\t\tif (chunks[i].instances.empty())
+\t\t\tbreak;
+\t\tinstances.insert(instances.end(), chunks[i].instances.begin(), chunks[i].instances.end());
+\t\tpos = chunks[i].pos;
+\t\tif (!chunks[i].complete)
+\t\t\tbreak;
+\t}
+\tf.clear();
+\tseek(f, pos);
+\treturn instances;
+}
+"""
+
+
+""" Class for generating CPP code. """
+class CPPGenerator(CodeGenerator):
+
+    COMMENT_STRING = "//"
+
+    def initialize(self):
+        """ Perform additional initialization if required. """
+        self.main.setExtension("cpp")
+        self.util.setExtension("h")
+        self.data.setExtension("h")
+
+    ################################################################################
+    # Generate Data File
+    ################################################################################
+
+    def generateDataFile(self):
+        """ Generate classes in a separate data file. """
+        self.currentFile = self.data
+        self.currentFile.writeLine("#ifndef %s_H" % CodeGenerator.DATA_FILE_NAME.upper())
+        self.currentFile.writeLine("#define %s_H" % CodeGenerator.DATA_FILE_NAME.upper())
+        self.currentFile.writeNewline()
+        CodeGenerator.generateDataFile(self);
+        self.currentFile.writeLine("#endif")
+
+    def generateDataFileHeader(self):
+        """ For generating the data file header, such as the import statements. """
+        writeLine = self.currentFile.writeLine
+        writeNewline = self.currentFile.writeNewline
+        writeLine("#include <vector>")
+        writeLine("#include <string>")
+        writeNewline()
+
+    def generateClass( self, className, fields ):
+        """ Helper function for generating the code segement defining a class (or the corresponding
+        data structure). The first argument is the class name and the second argument is a list of
+        fields (in order) of that class. """
+        self.typeNameToParseFuncName[className] = "parse%s" % className
+        self._beginBlock("struct " + className )
+        for field in fields:
+            self.currentFile.writeLine(self._getTypeName(field) + " " + field.name() + ";")
+        self._endBlock(";")
+        self.currentFile.writeNewline()
+
+    def generateColumnsClass( self, className, fields ):
+        """ Helper function for generating the struct storing the instances of a class as one vector
+        per field. """
+        writeLine = self.currentFile.writeLine
+        self._beginBlock("struct " + className + CodeGenerator.COLUMNS_SUFFIX)
+        for field in fields:
+            writeLine("std::vector<" + self._getTypeName(field) + "> " + field.name() + ";")
+        self.currentFile.writeNewline()
+        self._beginBlock("void push_back(const " + className + "& record)")
+        for field in fields:
+            writeLine(field.name() + ".push_back(record." + field.name() + ");")
+        self._endBlock()
+        self.currentFile.writeNewline()
+        self._beginBlock("size_t size() const")
+        writeLine("return " + fields[0].name() + ".size();")
+        self._endBlock()
+        self._endBlock(";")
+        self.currentFile.writeNewline()
+
+    ################################################################################
+    # Generate Util File
+    ################################################################################
+
+    def generateUtilFile(self):
+        self.currentFile = self.util
+        self.currentFile.writeLine("#ifndef %s_H" % CodeGenerator.UTIL_FILE_NAME.upper())
+        self.currentFile.writeLine("#define %s_H" % CodeGenerator.UTIL_FILE_NAME.upper())
+        self.generateUtilFileHeader()
+        self._beginBlock("namespace " + CodeGenerator.PARSER_NAME)
+        self.generateHelperFunctions()
+        self.generateClassParserFunctions()
+        self._endBlock()
+        self.currentFile.writeLine("#endif")
+
+    def generateUtilFileHeader(self):
+        """ For generating the util file header, such as the import statements. """
+        # Import library headers
+        self.currentFile.writeLine("#include <vector>")
+        self.currentFile.writeLine("#include <sstream>")
+        self.currentFile.writeLine("#include <string>")
+        self.currentFile.writeLine("#include <cctype>")
+        self.currentFile.writeLine("#include <cerrno>")
+        self.currentFile.writeLine("#include <climits>")
+        self.currentFile.writeLine("#include <cstdlib>")
+        self.currentFile.writeLine("#include <cstring>")
+        self.currentFile.writeLine("#include <stdexcept>")
+        self.currentFile.writeLine("#include <fstream>")
+        if self.parallelBodyLine() is not None:
+            self._writeParallelGuard()
+            self.currentFile.writeLine("#include <algorithm>")
+            self.currentFile.writeLine("#include <atomic>")
+            self.currentFile.writeLine("#include <thread>")
+            self.currentFile.writeLine("#endif")
+        self.currentFile.writeNewline()
+
+        # Import data header
+        self.currentFile.writeLine("#include \"" + CodeGenerator.DATA_FILE_NAME + ".h" + "\"")
+
+    def generateHelperFunctions(self):
+        """ For generating the helper functions that will be useful when parsing in the util file. """
+        # Static helpers for primitives
+        helpers = cppgenStaticHelpers()
+        map(lambda s: self.currentFile.writeLine(s), helpers.splitlines())
+        self.currentFile.writeNewline()
+        if self.parallelBodyLine() is not None:
+            self._writeParallelGuard()
+            helpers = cppgenParallelHelpers.replace( "\t", InstaParseFile.indentString )
+            map(lambda s: self.currentFile.writeLine(s), helpers.splitlines())
+            self.currentFile.writeLine("#endif")
+            self.currentFile.writeNewline()
+
+    def generateClassParserFunction( self, className, lines, streamedLine=None, parallelLine=None ):
+        """ For generating a helper functions for parsing a user defined class. The first argument
+        is the class name and the second argument is a list of FormatLine's. """
+        writeLine = self.currentFile.writeLine
+        write = self.currentFile.write
+
+        def isSimplePrimitive(field):
+            return field.isInteger() or field.isFloat() or field.isString() or field.isBool()
+
+        def generateSetup():
+            # include std in all parser functions
+            writeLine("using namespace std;")
+
+            # Helper to do some setup in every parser function
+            writeLine(className + " result;")
+            didSplit = False
+            didRepeat = False
+            didRepeatPlus = False
+
+            for line in lines:
+                # The parallel line is parsed by parseInChunks, without these
+                if line is parallelLine:
+                    continue
+                didRepeat = didRepeat or line.isRepeating()
+                didRepeatPlus = didRepeatPlus or  line.isOneOrMoreRepetition()
+                didSplit = didSplit or line.numFields() > 1 or (not line.isEmpty() and line.getField(0).isList())
+
+            if didSplit:
+                writeLine("vector<string> fields;")
+            if didRepeat:
+                writeLine("streampos prevFilePos = getFilePointer(f);")
+            if didRepeatPlus:
+                writeLine("bool didRepeatOnce = false;")
+
+        def handleEmptyLine():
+            # Handle the empty line case
+            self._beginBlock("if (!(trim(readLine(f, \"" + className + "\")).compare(\"\") == 0))")
+            writeLine("throw ParserError(lastLinePos(f), \"Should be an empty line.\");")
+            self._endBlock()
+
+        def handleSimpleLineOneField(field):
+            # Helper for handleSimpleLine
+            if isSimplePrimitive(field):
+                # Field is simple, just parse it
+                writeLine("result." + field.name() + " = "
+                    + self.typeNameToParseFuncName[field.typeName()] + "(readLine(f, \"" + className + "\"), f);")
+            elif field.isPrimitive():
+                # Field is primitive list, split line
+                writeLine("fields = split(readLine(f, \"" + className + "\"), \"" + self.format.lineDelimiter() + "\");")
+                writeLine("result." + field.name() + " = "
+                    + self.typeNameToParseFuncName["list(%s)" % field.listType()] + "(fields, f);")
+            else:
+                # Field is a class, recurse
+                writeLine("result." + field.name() + " = "
+                    + self.typeNameToParseFuncName[field.typeName()] + "(f);")
+
+        def handleSimpleLineMultipleField(index, field):
+            # Helper for handleSimpleLine
+            if isSimplePrimitive(field):
+                writeLine("result." + field.name() + " = "
+                    + self.typeNameToParseFuncName[field.typeName()]
+                    + "(fields[" + str(index) + "], f);")
+            elif field.isPrimitive():
+                # Field is primitive list, use rest of fields)
+                # FIXME WRONG
+                writeLine("result." + field.name() + " = "
+                    + self.typeNameToParseFuncName["list(%s)" % field.listType()]
+                    + "(copyRange(fields, " + str(index) + ", fields.size()), f);")
+            else:
+                # Field is a class? Cannot be!
+                raise Exception("This should never happen.")
+
+        def handleSimpleLine(line):
+            if line.numFields() == 1:
+                # Only one field, no need to split unnecessarily
+                handleSimpleLineOneField(line.getField(0))
+            else:
+                # Multiple fields, split it
+                writeLine("fields = split(readLine(f, \"" + className + "\"), \"" + self.format.lineDelimiter() + "\");")
+                if (line.getField(-1).isList()):
+                    self._beginBlock("if (fields.size() < " + str(line.numFields()) + ")")
+                else:
+                    self._beginBlock("if (fields.size() != " + str(line.numFields()) + ")")
+                writeLine("stringstream err;")
+                writeLine("err << \"Expecting " + str(line.numFields()) + " fields (\" << fields.size() << \" found).\";")
+                writeLine("throw ParserError(lastLinePos(f), err.str());")
+                self._endBlock()
+                # The ints and floats are converted in one go, and only parsed by the helpers reporting
+                # the field that could not be parsed if that fails.
+                numbers = [ ( index, field ) for index, field in enumerate(line) if field.isInteger() or field.isFloat() ]
+                if numbers:
+                    self._beginBlock("if (" + " || ".join( "!" + ("convertInt" if field.isInteger() else "convertFloat")
+                        + "(fields[" + str(index) + "], result." + field.name() + ")" for index, field in numbers ) + ")")
+                    for index, field in enumerate(line):
+                        handleSimpleLineMultipleField(index, field)
+                    self._endBlock()
+                for index, field in enumerate(line):
+                    if field.isString():
+                        writeLine("result." + field.name() + " = fields[" + str(index) + "];")
+                    elif not ( field.isInteger() or field.isFloat() ):
+                        handleSimpleLineMultipleField(index, field)
+
+        def handleRepeatingLineForField(field):
+            # Helper for handleRepeating
+            if field is streamedField:
+                # Only parsed into instance here, the handler is called outside the try catching parse errors
+                add, end = "instance = ", ";"
+            else:
+                add, end = "result." + field.name() + ".push_back(", ");"
+            if isSimplePrimitive(field):
+                # Field is simple, just parse it
+                writeLine(add
+                    + self.typeNameToParseFuncName[field.typeName()] + "(readLine(f, \"" + className + "\"), f)" + end)
+            elif field.isPrimitive():
+                # Field is primitive list, split line
+                writeLine("fields = split(readLine(f, \"" + className + "\"), \"" + self.format.lineDelimiter() + "\");")
+                writeLine(add
+                    + self.typeNameToParseFuncName["list(%s)" % field.listType()] + "(fields, f)" + end)
+            else:
+                # Field is a class, recurse
+                writeLine(add
+                    + self.typeNameToParseFuncName[field.typeName()] + "(f)" + end)
+
+        def handleParallelLine(line):
+            # The instances are parsed from chunks of the file by the threads
+            field = line.getField(0)
+            writeLine("vector<" + field.typeName() + "> instances = parseInChunks(f, filename, numThreads, chunkSize, "
+                + self.typeNameToParseFuncName[field.typeName()] + ");")
+            if line.isOneOrMoreRepetition():
+                self._beginBlock("if (instances.empty())")
+                writeLine("throw ParserError(nextLinePos(f), \"Expecting at least 1 \\\"" + field.typeName()
+                    + "\\\" when parsing \\\"" + className + "." + field.name() + "\\\" (0 found).\");")
+                self._endBlock()
+            if self.isColumnar(field):
+                self._beginBlock("for (size_t i = 0; i < instances.size(); i++)")
+                writeLine("result." + field.name() + ".push_back(instances[i]);")
+                self._endBlock()
+            else:
+                writeLine("result." + field.name() + ".swap(instances);")
+
+        def handleStreamedRepetition(line):
+            # A '*' or '+' repetition of the streamed field. The handler is called between the try parsing
+            # each instance and the one reading past it, so that its exceptions are not taken for the end
+            # of the repetition.
+            field = line.getField(0)
+            if line.isOneOrMoreRepetition():
+                writeLine("didRepeatOnce = false;")
+            writeLine("prevFilePos = getFilePointer(f);")
+            self._beginBlock("while (" + self._lookaheadCondition(self.format.lookahead(field)) + ")")
+            def endOnError():
+                # Reset the file position and end the repetition
+                self._beginBlock("catch (...)")
+                writeLine("seek(f, prevFilePos);")
+                writeLine("break;")
+                self._endBlock()
+            writeLine(self._getStreamedTypeName() + " instance;")
+            self._beginBlock("try")
+            handleRepeatingLineForField(field)
+            self._endBlock()
+            endOnError()
+            writeLine("handler(result, instance);")
+            self._beginBlock("try")
+            writeLine("prevFilePos = getFilePointer(f);")
+            if line.isOneOrMoreRepetition():
+                writeLine("didRepeatOnce = true;")
+            # Check for newline
+            if (line.isSplitByNewline()):
+                self._beginBlock("if (!nextLineStartsWith(f, " + self._stringLiteral(WHITESPACE_CHARACTERS) + "))")
+                writeLine("break;")
+                self._endBlock()
+                handleEmptyLine()
+            self._endBlock()
+            endOnError()
+            self._endBlock()
+            # The separator after the last instance is not part of the repetition
+            if (line.isSplitByNewline()):
+                writeLine("seek(f, prevFilePos);")
+            if line.isOneOrMoreRepetition():
+                self._beginBlock("if (!didRepeatOnce)")
+                writeLine("throw ParserError(prevFilePos, \"Expecting at least 1 \\\"" + field.typeName()
+                    + "\\\" when parsing \\\"" + className + "." + field.name() + "\\\" (0 found).\");")
+                self._endBlock()
+
+        def handleRepeatingLine(line):
+            # Must be a primitive or class repeated
+            if line is parallelLine:
+                handleParallelLine(line)
+            elif line.isIntegerRepetition() or line.isVariableRepetition():
+                # Constant repetition amount
+                field = line.getField(0)
+                # Generate the repetition string
+                repetitionString = ""
+                if line.isIntegerRepetition():
+                    repetitionString = str(line.repetitionAmountString())
+                else:
+                    repetitionString =  "result." + line.repetitionAmountString()
+                # Begin loop
+                self._beginBlock("for (int i = 0; i < " + repetitionString + "; i++)")
+                if field is streamedField:
+                    writeLine(self._getStreamedTypeName() + " instance;")
+                # Wrap handler with try
+                self._beginBlock("try")
+                # Main handler
+                handleRepeatingLineForField(field)
+                # Check for newline
+                if (line.isSplitByNewline()):
+                    self._beginBlock("if (i != " + repetitionString + " - 1)")
+                    handleEmptyLine()
+                    self._endBlock()
+                # End try
+                self._endBlock()
+                # Catch any error to throw appropriate error message, on the line of a parser error or
+                # otherwise the line reading stopped at
+                for catch, pos in [ ( "catch (ParserError &e)", "e.pos" ), ( "catch (...)", "nextLinePos(f)" ) ]:
+                    self._beginBlock(catch)
+                    writeLine("stringstream err;")
+                    writeLine("err << \"Expecting exactly \" << " + repetitionString + " << \" \\\"" + field.typeName()
+                        + "\\\" when parsing \\\"" + className + "." + field.name()
+                        + "\\\" (\" << i << \" found).\";")
+                    writeLine("throw ParserError(" + pos + ", err.str());")
+                    self._endBlock()
+                if field is streamedField:
+                    writeLine("handler(result, instance);")
+                # End loop
+                self._endBlock()
+            elif ( line.isZeroOrMoreRepetition() or line.isOneOrMoreRepetition() ) and line.getField(0) is streamedField:
+                handleStreamedRepetition(line)
+            elif line.isZeroOrMoreRepetition() or line.isOneOrMoreRepetition():
+                field = line.getField(0)
+                if line.isOneOrMoreRepetition():
+                    writeLine("didRepeatOnce = false;")
+                # Wrap with try block
+                self._beginBlock("try")
+                # Save initial position
+                writeLine("prevFilePos = getFilePointer(f);")
+                # Loop while the next line can start an instance, so the loop usually ends without an exception
+                self._beginBlock("while (" + self._lookaheadCondition(self.format.lookahead(field)) + ")")
+                # Main handler
+                handleRepeatingLineForField(field)
+                writeLine("prevFilePos = getFilePointer(f);")
+                if line.isOneOrMoreRepetition():
+                    writeLine("didRepeatOnce = true;")
+                # Check for newline
+                if (line.isSplitByNewline()):
+                    self._beginBlock("if (!nextLineStartsWith(f, " + self._stringLiteral(WHITESPACE_CHARACTERS) + "))")
+                    writeLine("break;")
+                    self._endBlock()
+                    handleEmptyLine()
+                # End loop
+                self._endBlock()
+                # The separator after the last instance is not part of the repetition
+                if (line.isSplitByNewline()):
+                    writeLine("seek(f, prevFilePos);")
+                # End try block
+                self._endBlock()
+                # Catch any errors, reset the file position and continue
+                self._beginBlock("catch (...)")
+                writeLine("seek(f, prevFilePos);")
+                self._endBlock()
+                # Error if did not repeat once
+                if line.isOneOrMoreRepetition():
+                    self._beginBlock("if (!didRepeatOnce)")
+                    writeLine("throw ParserError(prevFilePos, \"Expecting at least 1 \\\"" + field.typeName()
+                        + "\\\" when parsing \\\"" + className + "." + field.name() + "\\\" (0 found).\");")
+                    self._endBlock()
+            else:
+                raise Exception("This should never happen.")
+
+
+        if parallelLine is not None:
+            # The chunks of the parallel line are parsed by numThreads threads reading the file named filename
+            streamedField = None
+            self._writeParallelGuard()
+            self._beginBlock(className + " parallelparse" + className + "(std::ifstream& f, "
+                + "const std::string &filename, int numThreads, std::streamoff chunkSize)")
+        elif streamedLine is None:
+            streamedField = None
+            self._beginBlock(className + " parse" + className + "(std::ifstream& f)")
+        else:
+            # The instances of the streamed field are passed to the handler instead of being stored. The
+            # handler is called as handler(body, instance), and exceptions it throws are taken for parse
+            # errors of the instance, so it should not throw.
+            streamedField = streamedLine.getField(0)
+            writeLine("template <typename Handler>")
+            self._beginBlock(className + " iterparse" + className + "(std::ifstream& f, Handler handler)")
+        generateSetup()
+
+        # Handle the three different cases, helpers are inner functions defined above
+        for line in lines:
+            if line.isEmpty():
+                handleEmptyLine()
+            elif line.isRepeating():
+                handleRepeatingLine(line)
+            else:
+                handleSimpleLine(line)
+
+        writeLine("return result;")
+        self._endBlock()
+        if parallelLine is not None:
+            writeLine("#endif")
+        self.currentFile.writeNewline()
+
+    ################################################################################
+    # Generate Main File
+    ################################################################################
+
+    def generateMainFile(self):
+        """ Generate main file where the main function resides. """
+        self.currentFile = self.main
+        self.generateMainFileHeader()
+        self.generateForwardDeclarations()
+        self.generateMainFunction()
+        self.generateInputParserFunction()
+
+    def generateMainFileHeader(self):
+        """ For generating the main file header, such as the import statements. """
+        # Import library headers
+        self.currentFile.writeLine("#include <vector>")
+        self.currentFile.writeLine("#include <string>")
+        self.currentFile.writeLine("#include <stdexcept>")
+        self.currentFile.writeLine("#include <fstream>")
+        self.currentFile.writeLine("#include <iostream>")
+        self.currentFile.writeLine("#include <cstdlib>")
+        self.currentFile.writeNewline()
+        # Import data and util headers
+        self.currentFile.writeLine("#include \"" + CodeGenerator.DATA_FILE_NAME + ".h" + "\"")
+        self.currentFile.writeLine("#include \"" + CodeGenerator.UTIL_FILE_NAME + ".h" + "\"")
+        self.currentFile.writeNewline()
+
+    def generateForwardDeclarations(self):
+        self.currentFile.writeLine(self.bodyTypeName + " " + CodeGenerator.PARSE_INPUT + "(const std::string &filename);")
+        if self.streamedBodyLine() is not None:
+            self.currentFile.writeLine("template <typename Handler>")
+            self.currentFile.writeLine(self.bodyTypeName + " " + CodeGenerator.ITERPARSE_INPUT
+                + "(const std::string &filename, Handler handler);")
+        if self.parallelBodyLine() is not None:
+            self._writeParallelGuard()
+            self.currentFile.writeLine(self.bodyTypeName + " " + CodeGenerator.PARALLEL_PARSE_INPUT
+                + "(const std::string &filename, int numThreads);")
+            self.currentFile.writeLine("#endif")
+        self.currentFile.writeNewline()
+
+    def generateMainFunction(self):
+        """ For generating the empty main method that the user can fill in. """
+        self._beginBlock("int main(int argc, char** argv)")
+        self.currentFile.comment("Call " + CodeGenerator.PARSE_INPUT + "(filename) to parse the file of that name.")
+        if self.streamedBodyLine() is not None:
+            self.currentFile.comment("Call " + CodeGenerator.ITERPARSE_INPUT + "(filename, handler) to have each \""
+                + self.streamedBodyLine().getField(0).name() + "\" passed to handler(body, instance) as soon as it is parsed.")
+        if self.parallelBodyLine() is not None:
+            self.currentFile.comment("Call " + CodeGenerator.PARALLEL_PARSE_INPUT + "(filename, numThreads) to parse it with the \""
+                + self.parallelBodyLine().getField(0).name() + "\" parsed by a pool of threads (C++11, link with -pthread).")
+        self._endBlock()
+        self.currentFile.writeNewline()
+
+    def generateInputParserFunction(self):
+        """ For generating the function to parse an input file, and the function to stream it if the
+        body has a repeated line. """
+        self._generateInputParserFunction(CodeGenerator.PARSE_INPUT)
+        if self.streamedBodyLine() is not None:
+            self.currentFile.writeNewline()
+            self._generateInputParserFunction(CodeGenerator.ITERPARSE_INPUT)
+        if self.parallelBodyLine() is not None:
+            self.currentFile.writeNewline()
+            self._writeParallelGuard()
+            self._generateInputParserFunction(CodeGenerator.PARALLEL_PARSE_INPUT)
+            self.currentFile.writeLine("#endif")
+
+    def _generateInputParserFunction( self, functionName ):
+        writeLine = self.currentFile.writeLine
+        # Begin function declaration
+        if functionName == CodeGenerator.ITERPARSE_INPUT:
+            writeLine("template <typename Handler>")
+            self._beginBlock(self.bodyTypeName + " " + CodeGenerator.ITERPARSE_INPUT + "(const std::string &filename, Handler handler)")
+        elif functionName == CodeGenerator.PARALLEL_PARSE_INPUT:
+            self._beginBlock(self.bodyTypeName + " " + CodeGenerator.PARALLEL_PARSE_INPUT + "(const std::string &filename, int numThreads)")
+        else:
+            self._beginBlock(self.bodyTypeName + " " + CodeGenerator.PARSE_INPUT + "(const std::string &filename)")
+        writeLine("using namespace std;")
+
+        # Open file
+        writeLine("ifstream f(filename.c_str(), ios_base::in);")
+        self._beginBlock("if (f.fail())")
+        writeLine("cerr << \"Could not open \\\"\" + filename + \"\\\".\" << endl;")
+        writeLine("exit(1);")
+        self._endBlock()
+
+        # Main try block
+        self._beginBlock("try")
+        # Initial setup
+        if functionName == CodeGenerator.ITERPARSE_INPUT:
+            writeLine(self.bodyTypeName + " result = "
+                + CodeGenerator.PARSER_NAME + "::iterparse" + self.bodyTypeName + "(f, handler);")
+        elif functionName == CodeGenerator.PARALLEL_PARSE_INPUT:
+            writeLine(self.bodyTypeName + " result = " + CodeGenerator.PARSER_NAME + "::parallelparse" + self.bodyTypeName
+                + "(f, filename, numThreads, " + str(CodeGenerator.PARALLEL_CHUNK_SIZE) + ");")
+        else:
+            writeLine(self.bodyTypeName + " result = "
+                + CodeGenerator.PARSER_NAME + "::" + self.typeNameToParseFuncName[self.bodyTypeName] + "(f);")
+        # Handle trailing newlines
+        writeLine("string line;")
+        writeLine("streamoff end = " + CodeGenerator.PARSER_NAME + "::nextLinePos(f);")
+        self._beginBlock("while (getline(f, line))")
+        self._beginBlock("if (!(" + CodeGenerator.PARSER_NAME + "::trim(line).compare(\"\") == 0))")
+        writeLine("throw " + CodeGenerator.PARSER_NAME + "::ParserError(end, \"Finished parsing but did not reach end of file.\");")
+        self._endBlock()
+        self._endBlock()
+        writeLine("return result;")
+        self._endBlock()
+
+        # Catch parser errors, only their line number is counted here
+        self._beginBlock("catch (" + CodeGenerator.PARSER_NAME + "::ParserError& pe)")
+        writeLine("cerr << \"Parser Error on line \" << " + CodeGenerator.PARSER_NAME
+            + "::lineNumberAt(filename, pe.pos) << \": \" << pe.what() << endl;")
+        writeLine("exit(1);")
+        self._endBlock()
+        # Catch parser errors
+        self._beginBlock("catch (invalid_argument& ia)")
+        writeLine("cerr << ia.what() << endl;")
+        writeLine("exit(1);")
+        self._endBlock()
+        # Catch parser errors
+        self._beginBlock("catch (runtime_error& re)")
+        writeLine("cerr << re.what() << endl;")
+        writeLine("exit(1);")
+        self._endBlock()
+        # Catch all other errors
+        self._beginBlock("catch (...)")
+        writeLine("cerr << \"Unknown error occurred.\" << endl;")
+        writeLine("exit(1);")
+        self._endBlock()
+
+        # Should never reach this line
+        writeLine("cerr << \"Unknown error occurred.\" << endl;")
+        writeLine("exit(1);")
+
+        # End function declaration
+        self._endBlock()
+
+    ################################################################################
+    # Helper Functions
+    ################################################################################
+
+    def _getBasicTypeName( self, fieldType ):
+        if fieldType.isInteger:
+            return "int"
+        elif fieldType.isString:
+            return "std::string"
+        elif fieldType.isBool:
+            return "bool"
+        elif fieldType.isFloat:
+            return "float"
+        elif fieldType.isList:
+            return "std::vector<" + self._getBasicTypeName(fieldType.elementType) + ">"
+        else:
+            return None
+
+
+    def _getStreamedTypeName(self):
+        # Type of the instances of the streamed line of the body
+        field = self.streamedBodyLine().getField(0)
+        return self._getBasicTypeName(field.fieldType()) or field.typeName()
+
+    def _getTypeName( self, field ):
+        typeName = self._getBasicTypeName(field.fieldType())
+        if typeName == None:
+            typeName = field.typeName()
+
+        if self.isColumnar(field):
+            return typeName + CodeGenerator.COLUMNS_SUFFIX
+        elif field.isRepeating():
+            space = ""
+            if field.isList():
+                space = " "
+            return "std::vector<" + typeName + space + ">"
+        else:
+            return typeName
+
+    def _lookaheadCondition( self, lookahead ):
+        """ Returns a condition that is true if the next line may start a value with the given
+        LineLookahead. Only its first character is looked at, which does not move the file pointer. """
+        if lookahead is None:
+            return "true"
+        if lookahead.firstCharacters is None:
+            return "nextLineStartsWith(f, NULL)"
+        return "nextLineStartsWith(f, " + self._stringLiteral(lookahead.firstCharacters) + ")"
+
+    def _stringLiteral( self, string ):
+        return "\"" + string.replace("\\", "\\\\").replace("\"", "\\\"").replace("\t", "\\t") \
+            .replace("\r", "\\r").replace("\n", "\\n") + "\""
+
+    def _writeParallelGuard(self):
+        # Parsing in parallel uses C++11 threads, the rest of the parser only needs C++98
+        self.currentFile.writeLine("#if __cplusplus >= 201103L")
+
+    def _beginBlock( self, line ):
+        self.currentFile.writeLine(line)
+        self.currentFile.writeLine("{")
+        self.currentFile.indent()
+
+    def _endBlock(self, semicolon = False):
+        self.currentFile.dedent()
+        self.currentFile.writeLine("}" + (";" if semicolon else ""))
@@ -0,0 +1,1003 @@
+#!/usr/bin/env python
+
+""" Generates InstaParse parsers in Java. """
+
+from os.path import basename, join, splitext
+
+from instaparse import CodeGenerator, InstaParseFile, WHITESPACE_CHARACTERS
+
+
+def javagenStaticHelpers():
+    helpers = """
+// A parser error on the line holding byte pos of the file. Backtracking discards most errors, so the
+// parsers do not track line numbers and lineNumberAt only counts them for the error that is reported.
+public static class ParserException extends IllegalArgumentException
+{
+\tpublic final long pos;
+
+\tpublic ParserException(long pos, String message)
+\t{
+\t\tsuper(message);
+\t\tthis.pos = pos;
+\t}
+}
+
+// Returns the position of the next line of the file
+public static long nextLinePos(RandomAccessFile f)
+{
+\treturn getFilePointer(f);
+}
+
+// Returns a position on the line last read from the file
+public static long lastLinePos(RandomAccessFile f)
+{
+\treturn getFilePointer(f) - 1;
+}
+
+// Returns the number of the line holding byte pos of the file named filename. Past the end of a file
+// whose last line has no newline is the line after it.
+public static int lineNumberAt(String filename, long pos)
+{
+\ttry
+\t{
+\t\tRandomAccessFile f = new RandomAccessFile(filename, "r");
+\t\ttry
+\t\t{
+\t\t\tbyte[] buffer = new byte[1 << 16];
+\t\t\tint lineNumber = 1;
+\t\t\tint previous = '\\n';
+\t\t\tlong i = 0;
+\t\t\tint n;
+\t\t\twhile (i < pos && (n = f.read(buffer, 0, (int) Math.min(buffer.length, pos - i))) > 0)
+\t\t\t{
+\t\t\t\tfor (int j = 0; j < n; j++)
+\t\t\t\t{
+\t\t\t\t\tif (buffer[j] == '\\n')
+\t\t\t\t\t\tlineNumber++;
+\t\t\t\t}
+\t\t\t\ti += n;
+\t\t\t\tprevious = buffer[n - 1];
+\t\t\t}
+\t\t\tif (previous != '\\n' && f.getFilePointer() >= f.length())
+\t\t\t\tlineNumber++;
+\t\t\treturn lineNumber;
+\t\t}
+\t\tfinally
+\t\t{
+\t\t\tf.close();
+\t\t}
+\t}
+\tcatch (IOException e)
+\t{
+\t\tthrow new RuntimeException("IO Error: Unknown problem when reading input file.");
+\t}
+}
+
+public static int javagenParseInt(String s, RandomAccessFile f)
+{
+\ttry
+\t{
+\t\treturn Integer.parseInt(s);
+\t}
+\tcatch (NumberFormatException e)
+\t{
+\t\tthrow new ParserException(lastLinePos(f), "Could not parse \\"" + s + "\\" as int.");
+\t}
+}
+
+public static boolean javagenParseBool(String s, RandomAccessFile f)
+{
+\tif (s.equals("1") || s.toLowerCase().equals("true"))
+\t{
+\t\treturn true;
+\t}
+\telse if (s.equals("0") || s.toLowerCase().equals("false"))
+\t{
+\t\treturn false;
+\t}
+\tthrow new ParserException(lastLinePos(f), "Could not parse \\"" + s + "\\" as bool.");
+}
+
+public static String javagenParseString(String s, RandomAccessFile f)
+{
+\treturn s;
+}
+
+public static float javagenParseFloat(String s, RandomAccessFile f)
+{
+\ttry
+\t{
+\t\treturn Float.parseFloat(s);
+\t}
+\tcatch (NumberFormatException e)
+\t{
+\t\tthrow new ParserException(lastLinePos(f), "Could not parse \\"" + s + "\\" as float.");
+\t}
+}
+
+public static ArrayList<Integer> javagenParseIntList(String[] strings, RandomAccessFile f)
+{
+\tif (strings.length == 0)
+\t\tthrow new ParserException(lastLinePos(f), "Could not parse empty string as list.");
+\tArrayList<Integer> resval = new ArrayList<Integer>();
+\tfor (String s : strings)
+\t\tresval.add(javagenParseInt(s, f));
+\treturn resval;
+}
+
+public static ArrayList<Boolean> javagenParseBoolList(String[] strings, RandomAccessFile f)
+{
+\tif (strings.length == 0)
+\t\tthrow new ParserException(lastLinePos(f), "Could not parse empty string as list.");
+\tArrayList<Boolean> resval = new ArrayList<Boolean>();
+\tfor (String s : strings)
+\t\tresval.add(javagenParseBool(s, f));
+\treturn resval;
+}
+
+public static ArrayList<String> javagenParseStringList(String[] strings, RandomAccessFile f)
+{
+\tif (strings.length == 0)
+\t\tthrow new ParserException(lastLinePos(f), "Could not parse empty string as list.");
+\tArrayList<String> resval = new ArrayList<String>();
+\tfor (String s : strings)
+\t\tresval.add(javagenParseString(s, f));
+\treturn resval;
+}
+
+public static ArrayList<Float> javagenParseFloatList(String[] strings, RandomAccessFile f)
+{
+\tif (strings.length == 0)
+\t\tthrow new ParserException(lastLinePos(f), "Could not parse empty string as list.");
+\tArrayList<Float> resval = new ArrayList<Float>();
+\tfor (String s : strings)
+\t\tresval.add(javagenParseFloat(s, f));
+\treturn resval;
+}
+
+public static String readLine(RandomAccessFile f, String className)
+{
+\ttry
+\t{
+\t\tString result = f.readLine();
+\t\tif (result == null) throw new RuntimeException("Parser Error: Reached end of file while parsing object \\"" + className + "\\".");
+\t\treturn result;
+\t}
+\tcatch (IOException e)
+\t{
+\t\tthrow new RuntimeException("IO Error: Unknown problem when reading input file.");
+\t}
+}
+
+public static void seek(RandomAccessFile f, long pos)
+{
+\ttry
+\t{
+\t\tf.seek(pos);
+\t}
+\tcatch (IOException e)
+\t{
+\t\tthrow new RuntimeException("IO Error: Unknown problem when reading input file.");
+\t}
+}
+
+public static boolean nextLineStartsWith(RandomAccessFile f, String characters)
+{
+\ttry
+\t{
+\t\tlong pos = f.getFilePointer();
+\t\tint c = f.read();
+\t\tf.seek(pos);
+\t\treturn c != -1 && (characters == null || characters.indexOf(c) != -1);
+\t}
+\tcatch (IOException e)
+\t{
+\t\tthrow new RuntimeException("IO Error: Unknown problem when reading input file.");
+\t}
+}
+
+public static long getFilePointer(RandomAccessFile f)
+{
+\ttry
+\t{
+\t\treturn f.getFilePointer();
+\t}
+\tcatch (IOException e)
+\t{
+\t\tthrow new RuntimeException("IO Error: Unknown problem when reading input file.");
+\t}
+}
+"""
+
+    helpers = helpers.replace("javagenParseIntList", CodeGenerator.PARSE_INT_LIST)
+    helpers = helpers.replace("javagenParseBoolList", CodeGenerator.PARSE_BOOL_LIST)
+    helpers = helpers.replace("javagenParseStringList", CodeGenerator.PARSE_STRING_LIST)
+    helpers = helpers.replace("javagenParseFloatList", CodeGenerator.PARSE_FLOAT_LIST)
+    helpers = helpers.replace("javagenParseInt", CodeGenerator.PARSE_INT)
+    helpers = helpers.replace("javagenParseBool", CodeGenerator.PARSE_BOOL)
+    helpers = helpers.replace("javagenParseString", CodeGenerator.PARSE_STRING)
+    helpers = helpers.replace("javagenParseFloat", CodeGenerator.PARSE_FLOAT)
+
+    # Replace the tabs with the appropriate amount of indent spaces
+    helpers = helpers.replace( "\t", InstaParseFile.indentString )
+
+    return helpers
+
+
+
+# Parses the chunks of a repetition split by empty lines for parallelparse. A chunk starts with an
+# instance and ends just before an empty line, or at the end of the file, so that the threads parsing
+# the chunks stop where parsing the whole repetition sequentially would unless they reach the end.
+javagenParallelHelpers = """
+// Parses one instance of the repeated class for parallelparse
+public interface InstanceParser<T>
+{
+\tT parse(RandomAccessFile f);
+}
+
+// The instances parsed from a chunk of the file, the file position after the last one and whether the
+// chunk was parsed to its end
+public static class Chunk<T>
+{
+\tpublic ArrayList<T> instances = new ArrayList<T>();
+\tpublic long pos;
+\tpublic boolean complete;
+}
+
+// Parses the instances of a repetition split by empty lines from position start of the file, until the
+// chunk ends at position end or the repetition cannot go on
+public static <T> Chunk<T> parseChunk(String filename, long start, long end, InstanceParser<T> parser) throws IOException
+{
+\tRandomAccessFile f = new RandomAccessFile(filename, "r");
+\ttry
+\t{
+\t\tChunk<T> chunk = new Chunk<T>();
+\t\tchunk.pos = start;
+\t\tf.seek(start);
+\t\twhile (true)
+\t\t{
+\t\t\ttry
+\t\t\t{
+\t\t\t\tchunk.instances.add(parser.parse(f));
+\t\t\t}
+\t\t\tcatch (Exception e)
+\t\t\t{
+\t\t\t\treturn chunk;
+\t\t\t}
+\t\t\tchunk.pos = f.getFilePointer();
+\t\t\tif (chunk.pos >= end)
+\t\t\t{
+\t\t\t\tchunk.complete = chunk.pos == end;
+\t\t\t\treturn chunk;
+\t\t\t}
+\t\t\tif (!f.readLine().trim().equals(""))
+\t\t\t\treturn chunk;
+\t\t}
+\t}
+\tfinally
+\t{
+\t\tf.close();
+\t}
+}
+
+// Returns the position of the first empty line at least chunkSize bytes after position start of the
+// file, or the end of the file
+public static long findChunkEnd(RandomAccessFile f, long start, long chunkSize) throws IOException
+{
+\tbyte[] buffer = new byte[1 << 16];
+\tlong pos = start;
+\tint previous = -1;
+\tint n;
+\tf.seek(start);
+\twhile ((n = f.read(buffer)) > 0)
+\t{
+\t\tfor (int i = 0; i < n; i++, pos++)
+\t\t{
+\t\t\tif (buffer[i] == '\\n' && previous == '\\n' && pos - start >= chunkSize)
+\t\t\t\treturn pos;
+\t\t\tprevious = buffer[i];
+\t\t}
+\t}
+\treturn pos;
+}
+
+// Parses the instances of a repetition split by empty lines from the current position of the file. The
+// rest of the file is split at empty lines into chunks of about chunkSize bytes parsed by the pool.
+// Leaves the file after the last instance.
+public static <T> ArrayList<T> parseInChunks(RandomAccessFile f, final String filename, ExecutorService pool,
+\tlong chunkSize, final InstanceParser<T> parser)
+{
+\tArrayList<Future<Chunk<T>>> chunks = new ArrayList<Future<Chunk<T>>>();
+\t// Chunks from endChunk on are not parsed, the repetition ends before them
+\tfinal AtomicInteger endChunk = new AtomicInteger(Integer.MAX_VALUE);
+\ttry
+\t{
+\t\tlong pos = f.getFilePointer();
+\t\tlong start = pos;
+\t\twhile (start < f.length())
+\t\t{
+\t\t\tfinal long end = findChunkEnd(f, start, chunkSize);
+\t\t\tfinal long chunkStart = start;
+\t\t\tfinal int index = chunks.size();
+\t\t\tchunks.add(pool.submit(new Callable<Chunk<T>>()
+\t\t\t{
+\t\t\t\tpublic Chunk<T> call() throws IOException
+\t\t\t\t{
+\t\t\t\t\tif (index >= endChunk.get())
+\t\t\t\t\t\treturn new Chunk<T>();
+\t\t\t\t\tChunk<T> chunk = parseChunk(filename, chunkStart, end, parser);
+\t\t\t\t\t// An incomplete chunk ends the repetition
+\t\t\t\t\tint last = endChunk.get();
+\t\t\t\t\twhile (!chunk.complete && index + 1 < last && !endChunk.compareAndSet(last, index + 1))
+\t\t\t\t\t\tlast = endChunk.get();
+\t\t\t\t\treturn chunk;
+\t\t\t\t}
+\t\t\t}));
+\t\t\t// The empty line after the chunk belongs to no chunk
+\t\t\tstart = end + 1;
+\t\t}
+\t\tArrayList<T> instances = new ArrayList<T>();
+\t\tfor (Future<Chunk<T>> future : chunks)
+\t\t{
+\t\t\tChunk<T> chunk = future.get();
+\t\t\t// No instances in a chunk means the repetition ended with the previous one
+\t\t\tif (chunk.instances.isEmpty())
+\t\t\t\tbreak;
+\t\t\tinstances.addAll(chunk.instances);
+\t\t\tpos = chunk.pos;
+\t\t\tif (!chunk.complete)
+\t\t\t\tbreak;
+\t\t}
+\t\tf.seek(pos);
+\t\treturn instances;
+\t}
+\tcatch (InterruptedException e)
+\t{
+\t\tthrow new RuntimeException("Parser Error: Interrupted while parsing in parallel.");
+\t}
+\tcatch (Exception e)
+\t{
+\t\tthrow new RuntimeException("IO Error: Unknown problem when reading input file.");
+\t}
+\tfinally
+\t{
+\t\t// Chunks after the end of the repetition may still be parsing
+\t\tfor (Future<Chunk<T>> future : chunks)
+\t\t\tfuture.cancel(true);
+\t}
+}
+"""
+
+
+""" Class for generating Java code. """
+class JavaGenerator(CodeGenerator):
+
+    COMMENT_STRING = "//"
+
+    def initialize(self):
+        """ Perform additional initialization if required. """
+        self.main.setExtension("java")
+        self.util.setExtension("java")
+        self.classFiles = []
+
+    def generateFiles(self):
+        """ Generates the contents of every output file in memory without writing anything to disk. """
+        self.generateClasses()
+        self.generateUtilFile()
+        self.generateMainFile()
+
+    def outputFiles(self):
+        """ Returns the list of InstaParseFile's produced by this generator. """
+        return [ self.main, self.util ] + self.classFiles
+
+    ################################################################################
+    # Generate Data File
+    ################################################################################
+
+    def generateClass( self, className, fields ):
+        """ Helper function for generating the code segement defining a class (or the corresponding
+        data structure). The first argument is the class name and the second argument is a list of
+        fields (in order) of that class. """
+        self.typeNameToParseFuncName[className] = "parse%s" % className
+        classFile = self.newFile(join(self.foldername, className + ".java"))
+        self.classFiles.append(classFile)
+        self.currentFile = classFile
+
+        shouldImportArrayList = False
+
+        self._beginBlock("public class " + className )
+
+        for field in fields:
+            if field.isRepeating() or field.isList():
+                shouldImportArrayList = True
+            classFile.writeLine("public " + self._getTypeName(field) + " " + field.name() + ";")
+
+        if shouldImportArrayList:
+            classFile.writeImportLine("")
+            classFile.writeImportLine("import java.util.ArrayList;")
+
+        self._endBlock()
+
+    def generateColumnsClass( self, className, fields ):
+        """ Helper function for generating the class storing the instances of a class as one column
+        per field. The columns are arrays of primitives that grow as instances are added, of which
+        the first size elements are used. """
+        columnsClassName = className + CodeGenerator.COLUMNS_SUFFIX
+        classFile = self.newFile(join(self.foldername, columnsClassName + ".java"))
+        self.classFiles.append(classFile)
+        self.currentFile = classFile
+        classFile.writeImportLine("")
+        classFile.writeImportLine("import java.util.Arrays;")
+
+        self._beginBlock("public class " + columnsClassName)
+        classFile.writeLine("public int size;")
+        for field in fields:
+            typeName = self._getPrimitiveTypeName(field.fieldType())
+            classFile.writeLine("public " + typeName + "[] " + field.name() + " = new " + typeName + "[16];")
+        classFile.writeNewline()
+
+        self._beginBlock("public void add(" + className + " record)")
+        self._beginBlock("if (size == " + fields[0].name() + ".length)")
+        for field in fields:
+            classFile.writeLine(field.name() + " = Arrays.copyOf(" + field.name() + ", size * 2);")
+        self._endBlock()
+        for field in fields:
+            classFile.writeLine(field.name() + "[size] = record." + field.name() + ";")
+        classFile.writeLine("size += 1;")
+        self._endBlock()
+
+        self._endBlock()
+
+    ################################################################################
+    # Generate Util File
+    ################################################################################
+
+    def generateUtilFile(self):
+        self.currentFile = self.util
+        self.generateUtilFileHeader()
+        self._beginBlock("public class " + CodeGenerator.UTIL_FILE_NAME)
+        self.generateHelperFunctions()
+        self.generateClassParserFunctions()
+        self._endBlock()
+
+    def generateUtilFileHeader(self):
+        """ For generating the util file header, such as the import statements. """
+        # Import library headers
+        self.currentFile.writeLine("import java.util.ArrayList;")
+        self.currentFile.writeLine("import java.util.Arrays;")
+        self.currentFile.writeLine("import java.io.RandomAccessFile;")
+        self.currentFile.writeLine("import java.io.EOFException;")
+        self.currentFile.writeLine("import java.io.IOException;")
+        if self.parallelBodyLine() is not None:
+            self.currentFile.writeLine("import java.util.concurrent.Callable;")
+            self.currentFile.writeLine("import java.util.concurrent.ExecutorService;")
+            self.currentFile.writeLine("import java.util.concurrent.Future;")
+            self.currentFile.writeLine("import java.util.concurrent.atomic.AtomicInteger;")
+
+        self.currentFile.writeNewline()
+
+    def generateHelperFunctions(self):
+        """ For generating the helper functions that will be useful when parsing in the util file. """
+        # Static helpers for primitives
+        helpers = javagenStaticHelpers()
+        map(lambda s: self.currentFile.writeLine(s), helpers.splitlines())
+        self.currentFile.writeNewline()
+        if self.streamedBodyLine() is not None:
+            # Receives the instances of the streamed line of the body from iterparse. Exceptions thrown
+            # by handle are taken for parse errors of the instance, so handlers should not throw.
+            self._beginBlock("public interface InstanceHandler<B, I>")
+            self.currentFile.writeLine("void handle(B body, I instance);")
+            self._endBlock()
+            self.currentFile.writeNewline()
+        if self.parallelBodyLine() is not None:
+            helpers = javagenParallelHelpers.replace( "\t", InstaParseFile.indentString )
+            map(lambda s: self.currentFile.writeLine(s), helpers.splitlines())
+            self.currentFile.writeNewline()
+
+    def generateClassParserFunction( self, className, lines, streamedLine=None, parallelLine=None ):
+        """ For generating a helper functions for parsing a user defined class. The first argument
+        is the class name and the second argument is a list of FormatLine's. """
+        writeLine = self.currentFile.writeLine
+        write = self.currentFile.write
+
+        def isSimplePrimitive(field):
+            return field.isInteger() or field.isFloat() or field.isString() or field.isBool()
+
+        def generateSetup():
+            # Helper to do some setup in every parser function
+            writeLine(className + " result = new " + className + "();")
+            didSplit = False
+            didRepeat = False
+            didRepeatPlus = False
+
+            for line in lines:
+                # The parallel line is parsed by parseInChunks, without these
+                if line is parallelLine:
+                    continue
+                didRepeat = didRepeat or line.isRepeating()
+                didRepeatPlus = didRepeatPlus or  line.isOneOrMoreRepetition()
+                didSplit = didSplit or line.numFields() > 1 or (not line.isEmpty() and line.getField(0).isList())
+
+            if didSplit:
+                writeLine("String[] fields;")
+            if didRepeat:
+                writeLine("long prevFilePos = getFilePointer(f);")
+            if didRepeatPlus:
+                writeLine("boolean didRepeatOnce = false;")
+
+        def handleEmptyLine():
+            # Handle the empty line case
+            self._beginBlock("if (!readLine(f, \"" + className + "\").trim().equals(\"\"))")
+            writeLine("throw new ParserException(lastLinePos(f), \"Should be an empty line.\");")
+            self._endBlock()
+
+        def handleSimpleLineOneField(field):
+            # Helper for handleSimpleLine
+            if isSimplePrimitive(field):
+                # Field is simple, just parse it
+                writeLine("result." + field.name() + " = "
+                    + self.typeNameToParseFuncName[field.typeName()] + "(readLine(f, \"" + className + "\"), f);")
+            elif field.isPrimitive():
+                # Field is primitive list, split line
+                writeLine("fields = readLine(f, \"" + className + "\").split(\"" + self.format.lineDelimiter() + "\");")
+                writeLine("result." + field.name() + " = "
+                    + self.typeNameToParseFuncName["list(%s)" % field.listType()] + "(fields, f);")
+            else:
+                # Field is a class, recurse
+                writeLine("result." + field.name() + " = "
+                    + self.typeNameToParseFuncName[field.typeName()] + "(f);")
+
+        def handleSimpleLineMultipleField(index, field):
+            # Helper for handleSimpleLine
+            if isSimplePrimitive(field):
+                writeLine("result." + field.name() + " = "
+                    + self.typeNameToParseFuncName[field.typeName()]
+                    + "(fields[" + str(index) + "], f);")
+            elif field.isPrimitive():
+                # Field is primitive list, use rest of fields)
+                writeLine("result." + field.name() + " = "
+                    + self.typeNameToParseFuncName["list(%s)" % field.listType()]
+                    + "(Arrays.copyOfRange(fields, " + str(index) + ", fields.length), f);")
+            else:
+                # Field is a class? Cannot be!
+                raise Exception("This should never happen.")
+
+        def handleSimpleLine(line):
+            if line.numFields() == 1:
+                # Only one field, no need to split unnecessarily
+                handleSimpleLineOneField(line.getField(0))
+            else:
+                # Multiple fields, split it
+                writeLine("fields = readLine(f, \"" + className + "\").split(\"" + self.format.lineDelimiter() + "\");")
+                if (line.getField(-1).isList()):
+                    self._beginBlock("if (fields.length < " + str(line.numFields()) + ")")
+                else:
+                    self._beginBlock("if (fields.length != " + str(line.numFields()) + ")")
+                writeLine("throw new ParserException(lastLinePos(f), \"Expecting " + str(line.numFields())
+                    + " fields (\" + fields.length + \" found).\");")
+                self._endBlock()
+                # The ints and floats are converted in one go, and only parsed by the helpers reporting
+                # the field that could not be parsed if that fails.
+                numbers = [ ( index, field ) for index, field in enumerate(line) if field.isInteger() or field.isFloat() ]
+                if numbers:
+                    self._beginBlock("try")
+                    for index, field in numbers:
+                        writeLine("result." + field.name() + " = "
+                            + ("Integer.parseInt" if field.isInteger() else "Float.parseFloat")
+                            + "(fields[" + str(index) + "]);")
+                    self._endBlock()
+                    self._beginBlock("catch (NumberFormatException e)")
+                    for index, field in enumerate(line):
+                        handleSimpleLineMultipleField(index, field)
+                    self._endBlock()
+                for index, field in enumerate(line):
+                    if field.isString():
+                        writeLine("result." + field.name() + " = fields[" + str(index) + "];")
+                    elif not ( field.isInteger() or field.isFloat() ):
+                        handleSimpleLineMultipleField(index, field)
+
+        def handleRepeatingLineForField(field):
+            # Helper for handleRepeating
+            if field is streamedField:
+                # Only parsed into instance here, the handler is called outside the try catching parse errors
+                add, end = "instance = ", ";"
+            else:
+                add, end = "result." + field.name() + ".add(", ");"
+            if isSimplePrimitive(field):
+                # Field is simple, just parse it
+                writeLine(add
+                    + self.typeNameToParseFuncName[field.typeName()] + "(readLine(f, \"" + className + "\"), f)" + end)
+            elif field.isPrimitive():
+                # Field is primitive list, split line
+                writeLine("fields = readLine(f, \"" + className + "\").split(\"" + self.format.lineDelimiter() + "\");")
+                writeLine(add
+                    + self.typeNameToParseFuncName["list(%s)" % field.listType()] + "(fields, f)" + end)
+            else:
+                # Field is a class, recurse
+                writeLine(add
+                    + self.typeNameToParseFuncName[field.typeName()] + "(f)" + end)
+
+        def handleParallelLine(line):
+            # The instances are parsed from chunks of the file by the pool
+            field = line.getField(0)
+            instanceTypeName = field.typeName()
+            writeLine("ArrayList<" + instanceTypeName + "> instances = parseInChunks(f, filename, pool, chunkSize, "
+                + "new InstanceParser<" + instanceTypeName + ">()")
+            writeLine("{")
+            self.currentFile.indent()
+            self._beginBlock("public " + instanceTypeName + " parse(RandomAccessFile f)")
+            writeLine("return " + self.typeNameToParseFuncName[field.typeName()] + "(f);")
+            self._endBlock()
+            self.currentFile.dedent()
+            writeLine("});")
+            if line.isOneOrMoreRepetition():
+                self._beginBlock("if (instances.isEmpty())")
+                writeLine("throw new ParserException(nextLinePos(f), \"Expecting at least 1 \\\"" + field.typeName()
+                    + "\\\" when parsing \\\"" + className + "." + field.name() + "\\\" (0 found).\");")
+                self._endBlock()
+            if self.isColumnar(field):
+                writeLine("result." + field.name() + " = new " + self._getTypeName(field) + "();")
+                self._beginBlock("for (" + instanceTypeName + " instance : instances)")
+                writeLine("result." + field.name() + ".add(instance);")
+                self._endBlock()
+            else:
+                writeLine("result." + field.name() + " = instances;")
+
+        def handleStreamedRepetition(line):
+            # A '*' or '+' repetition of the streamed field. The handler is called between the try parsing
+            # each instance and the one reading past it, so that its exceptions are not taken for the end
+            # of the repetition.
+            field = line.getField(0)
+            if line.isOneOrMoreRepetition():
+                writeLine("didRepeatOnce = false;")
+            writeLine("prevFilePos = getFilePointer(f);")
+            self._beginBlock("while (" + self._lookaheadCondition(self.format.lookahead(field)) + ")")
+            def endOnError():
+                # Reset the file position and end the repetition
+                self._beginBlock("catch (Exception e)")
+                writeLine("seek(f, prevFilePos);")
+                writeLine("break;")
+                self._endBlock()
+            writeLine(self._getStreamedTypeName() + " instance;")
+            self._beginBlock("try")
+            handleRepeatingLineForField(field)
+            self._endBlock()
+            endOnError()
+            writeLine("handler.handle(result, instance);")
+            self._beginBlock("try")
+            writeLine("prevFilePos = getFilePointer(f);")
+            if line.isOneOrMoreRepetition():
+                writeLine("didRepeatOnce = true;")
+            # Check for newline
+            if (line.isSplitByNewline()):
+                self._beginBlock("if (!nextLineStartsWith(f, " + self._stringLiteral(WHITESPACE_CHARACTERS) + "))")
+                writeLine("break;")
+                self._endBlock()
+                handleEmptyLine()
+            self._endBlock()
+            endOnError()
+            self._endBlock()
+            # The separator after the last instance is not part of the repetition
+            if (line.isSplitByNewline()):
+                writeLine("seek(f, prevFilePos);")
+            if line.isOneOrMoreRepetition():
+                self._beginBlock("if (!didRepeatOnce)")
+                writeLine("throw new ParserException(prevFilePos, \"Expecting at least 1 \\\"" + field.typeName()
+                    + "\\\" when parsing \\\"" + className + "." + field.name() + "\\\" (0 found).\");")
+                self._endBlock()
+
+        def handleRepeatingLine(line):
+            # Must be a primitive or class repeated
+            if line is parallelLine:
+                handleParallelLine(line)
+            elif line.isIntegerRepetition() or line.isVariableRepetition():
+                # Constant repetition amount
+                field = line.getField(0)
+                # Generate the repetition string
+                repetitionString = ""
+                if line.isIntegerRepetition():
+                    repetitionString = str(line.repetitionAmountString())
+                else:
+                    repetitionString =  "result." + line.repetitionAmountString()
+                # Initialize the arraylist
+                if field is not streamedField:
+                    writeLine("result." + field.name() + " = new " + self._getTypeName(field) + "();")
+                # Begin loop
+                self._beginBlock("for (int i = 0; i < " + repetitionString + "; i++)")
+                if field is streamedField:
+                    writeLine(self._getStreamedTypeName() + " instance;")
+                # Wrap with try
+                self._beginBlock("try")
+                # Main handler
+                handleRepeatingLineForField(field)
+                # Check for newline
+                if (line.isSplitByNewline()):
+                    self._beginBlock("if (i != " + repetitionString + " - 1)")
+                    handleEmptyLine()
+                    self._endBlock()
+                # End try
+                self._endBlock()
+                # Catch any error to throw appropriate error message, on the line of a parser error or
+                # otherwise the line reading stopped at
+                for catch, pos in [ ( "catch (ParserException e)", "e.pos" ), ( "catch (Exception e)", "nextLinePos(f)" ) ]:
+                    self._beginBlock(catch)
+                    writeLine("throw new ParserException(" + pos + ", \"Expecting exactly \" + " + repetitionString
+                        + " + \" \\\"" + field.typeName() + "\\\" when parsing \\\"" + className + "." + field.name()
+                        + "\\\" (\" + i + \" found).\");")
+                    self._endBlock()
+                if field is streamedField:
+                    writeLine("handler.handle(result, instance);")
+                # End loop
+                self._endBlock()
+            elif ( line.isZeroOrMoreRepetition() or line.isOneOrMoreRepetition() ) and line.getField(0) is streamedField:
+                handleStreamedRepetition(line)
+            elif line.isZeroOrMoreRepetition() or line.isOneOrMoreRepetition():
+                field = line.getField(0)
+                if line.isOneOrMoreRepetition():
+                    writeLine("didRepeatOnce = false;")
+                # Wrap with try block
+                self._beginBlock("try")
+                # Initialize object
+                if field is not streamedField:
+                    writeLine("result." + field.name() + " = new " + self._getTypeName(field) + "();")
+                # Save initial position
+                writeLine("prevFilePos = getFilePointer(f);")
+                # Loop while the next line can start an instance, so the loop usually ends without an exception
+                self._beginBlock("while (" + self._lookaheadCondition(self.format.lookahead(field)) + ")")
+                # Main handler
+                handleRepeatingLineForField(field)
+                writeLine("prevFilePos = getFilePointer(f);")
+                if line.isOneOrMoreRepetition():
+                    writeLine("didRepeatOnce = true;")
+                # Check for newline
+                if (line.isSplitByNewline()):
+                    self._beginBlock("if (!nextLineStartsWith(f, " + self._stringLiteral(WHITESPACE_CHARACTERS) + "))")
+                    writeLine("break;")
+                    self._endBlock()
+                    handleEmptyLine()
+                # End loop
+                self._endBlock()
+                # The separator after the last instance is not part of the repetition
+                if (line.isSplitByNewline()):
+                    writeLine("seek(f, prevFilePos);")
+                # End try block
+                self._endBlock()
+                # Catch any errors, reset the file position and continue
+                self._beginBlock("catch (Exception e)")
+                writeLine("seek(f, prevFilePos);")
+                self._endBlock()
+                # Error if did not repeat once
+                if line.isOneOrMoreRepetition():
+                    self._beginBlock("if (!didRepeatOnce)")
+                    writeLine("throw new ParserException(prevFilePos, \"Expecting at least 1 \\\"" + field.typeName()
+                        + "\\\" when parsing \\\"" + className + "." + field.name() + "\\\" (0 found).\");")
+                    self._endBlock()
+            else:
+                raise Exception("This should never happen.")
+
+
+        if parallelLine is not None:
+            # The pool parses the chunks of the parallel line, reading the file named filename
+            streamedField = None
+            self._beginBlock("public static " + className + " parallelparse" + className + "(RandomAccessFile f, "
+                + "String filename, ExecutorService pool, long chunkSize)")
+        elif streamedLine is None:
+            streamedField = None
+            self._beginBlock("public static " + className + " parse" + className + "(RandomAccessFile f)")
+        else:
+            # The instances of the streamed field are passed to the handler instead of being stored
+            streamedField = streamedLine.getField(0)
+            self._beginBlock("public static " + className + " iterparse" + className + "(RandomAccessFile f, "
+                + self._getHandlerTypeName() + " handler)")
+        generateSetup()
+
+        # Handle the three different cases, helpers are inner functions defined above
+        for line in lines:
+            if line.isEmpty():
+                handleEmptyLine()
+            elif line.isRepeating():
+                handleRepeatingLine(line)
+            else:
+                handleSimpleLine(line)
+
+        writeLine("return result;")
+        self._endBlock()
+        self.currentFile.writeNewline()
+
+    ################################################################################
+    # Generate Main File
+    ################################################################################
+
+    def generateMainFile(self):
+        """ Generate main file where the main function resides. """
+        self.currentFile = self.main
+        self.generateMainFileHeader()
+        self._beginBlock("public class " + splitext(basename(self.currentFile.filename))[0])
+        self.generateMainFunction()
+        self.generateInputParserFunction()
+        self._endBlock()
+
+    def generateMainFileHeader(self):
+        """ For generating the main file header, such as the import statements. """
+        # Import library headers
+        self.currentFile.writeLine("import java.io.RandomAccessFile;")
+        self.currentFile.writeLine("import java.io.FileNotFoundException;")
+        self.currentFile.writeLine("import java.io.IOException;")
+        self.currentFile.writeLine("import java.io.EOFException;")
+        if self.parallelBodyLine() is not None:
+            self.currentFile.writeLine("import java.util.concurrent.ExecutorService;")
+            self.currentFile.writeLine("import java.util.concurrent.Executors;")
+        self.currentFile.writeNewline()
+
+    def generateMainFunction(self):
+        """ For generating the empty main method that the user can fill in. """
+        self._beginBlock("public static void main(String[] args)")
+        self.currentFile.comment("Call " + CodeGenerator.PARSE_INPUT + "(filename) to parse the file of that name.")
+        if self.streamedBodyLine() is not None:
+            self.currentFile.comment("Call " + CodeGenerator.ITERPARSE_INPUT + "(filename, handler) to have each \""
+                + self.streamedBodyLine().getField(0).name() + "\" passed to the handler as soon as it is parsed.")
+        if self.parallelBodyLine() is not None:
+            self.currentFile.comment("Call " + CodeGenerator.PARALLEL_PARSE_INPUT + "(filename, numThreads) to parse it with the \""
+                + self.parallelBodyLine().getField(0).name() + "\" parsed by a pool of threads.")
+        self._endBlock()
+        self.currentFile.writeNewline()
+
+    def generateInputParserFunction(self):
+        """ For generating the function to parse an input file, and the function to stream it if the
+        body has a repeated line. """
+        self._generateInputParserFunction(CodeGenerator.PARSE_INPUT)
+        if self.streamedBodyLine() is not None:
+            self.currentFile.writeNewline()
+            self._generateInputParserFunction(CodeGenerator.ITERPARSE_INPUT)
+        if self.parallelBodyLine() is not None:
+            self.currentFile.writeNewline()
+            self._generateInputParserFunction(CodeGenerator.PARALLEL_PARSE_INPUT)
+
+    def _generateInputParserFunction( self, functionName ):
+        writeLine = self.currentFile.writeLine
+        # Begin function declaration
+        if functionName == CodeGenerator.ITERPARSE_INPUT:
+            self._beginBlock("private static " + self.bodyTypeName + " " + CodeGenerator.ITERPARSE_INPUT
+                + "(String filename, " + CodeGenerator.UTIL_FILE_NAME + "." + self._getHandlerTypeName() + " handler)")
+        elif functionName == CodeGenerator.PARALLEL_PARSE_INPUT:
+            self._beginBlock("private static " + self.bodyTypeName + " " + CodeGenerator.PARALLEL_PARSE_INPUT
+                + "(String filename, int numThreads)")
+        else:
+            self._beginBlock("private static " + self.bodyTypeName
+                + " " + CodeGenerator.PARSE_INPUT + "(String filename)")
+
+        # Main try block
+        self._beginBlock("try")
+        # Initial setup
+        writeLine("RandomAccessFile f = new RandomAccessFile(filename, \"r\");")
+        # Begin parsing
+        if functionName == CodeGenerator.ITERPARSE_INPUT:
+            writeLine(self.bodyTypeName + " result = "
+                + CodeGenerator.UTIL_FILE_NAME + ".iterparse" + self.bodyTypeName + "(f, handler);")
+        elif functionName == CodeGenerator.PARALLEL_PARSE_INPUT:
+            writeLine("ExecutorService pool = Executors.newFixedThreadPool(numThreads);")
+            writeLine(self.bodyTypeName + " result;")
+            self._beginBlock("try")
+            writeLine("result = " + CodeGenerator.UTIL_FILE_NAME + ".parallelparse" + self.bodyTypeName
+                + "(f, filename, pool, " + str(CodeGenerator.PARALLEL_CHUNK_SIZE) + ");")
+            self._endBlock()
+            self._beginBlock("finally")
+            writeLine("pool.shutdownNow();")
+            self._endBlock()
+        else:
+            writeLine(self.bodyTypeName + " result = "
+                + CodeGenerator.UTIL_FILE_NAME + "." + self.typeNameToParseFuncName[self.bodyTypeName] + "(f);")
+        # Handle trailing newlines
+        writeLine("String line;")
+        writeLine("long end = f.getFilePointer();")
+        self._beginBlock("while ((line = f.readLine()) != null)")
+        self._beginBlock("if (!line.equals(\"\"))")
+        writeLine("throw new " + CodeGenerator.UTIL_FILE_NAME
+            + ".ParserException(end, \"Finished parsing but did not reach end of file.\");")
+        self._endBlock()
+        self._endBlock()
+        # Finish up
+        writeLine("f.close();")
+        writeLine("return result;")
+        self._endBlock()
+
+        # Catch file not found
+        self._beginBlock("catch (FileNotFoundException e)")
+        writeLine("System.err.println(\"Input file '\" + filename + \"' not found.\");")
+        writeLine("System.exit(1);")
+        self._endBlock()
+        # Catch random IOExceptions
+        self._beginBlock("catch (IOException e)")
+        writeLine("System.err.println(\"Could not open \\\"\" + filename + \"\\\".\");")
+        self._endBlock()
+        # Catch parser errors, only their line number is counted here
+        self._beginBlock("catch (" + CodeGenerator.UTIL_FILE_NAME + ".ParserException e)")
+        writeLine("System.err.println(\"Parser Error on line \" + " + CodeGenerator.UTIL_FILE_NAME
+            + ".lineNumberAt(filename, e.pos) + \": \" + e.getMessage());")
+        writeLine("System.exit(1);")
+        self._endBlock()
+        # All other exception catches (EOF exception caught here)
+        self._beginBlock("catch (Exception e)")
+        writeLine("System.err.println(e.getMessage());")
+        writeLine("System.exit(1);")
+        self._endBlock()
+
+        # Should never reach this line
+        writeLine("System.err.println(\"Unknown error occurred.\");")
+        writeLine("System.exit(1);")
+        writeLine("return null;")
+
+        # End function declaration
+        self._endBlock()
+
+    ################################################################################
+    # Helper Functions
+    ################################################################################
+
+    def _getBasicTypeName( self, fieldType ):
+        if fieldType.isInteger:
+            return "Integer"
+        if fieldType.isFloat:
+            return "Float"
+        elif fieldType.isString:
+            return "String"
+        elif fieldType.isBool:
+            return "Boolean"
+        elif fieldType.isList:
+            return "ArrayList<" + self._getBasicTypeName(fieldType.elementType) + ">"
+        else:
+            return None
+
+
+    def _getHandlerTypeName(self):
+        # Type of the handler of the instances of the streamed line of the body
+        return "InstanceHandler<" + self.bodyTypeName + ", " + self._getStreamedTypeName() + ">"
+
+    def _getStreamedTypeName(self):
+        # Type of the instances of the streamed line of the body
+        field = self.streamedBodyLine().getField(0)
+        return self._getBasicTypeName(field.fieldType()) or field.typeName()
+
+    def _getPrimitiveTypeName( self, fieldType ):
+        # Unboxed type of a single primitive value
+        if fieldType.isInteger:
+            return "int"
+        if fieldType.isFloat:
+            return "float"
+        elif fieldType.isBool:
+            return "boolean"
+        return self._getBasicTypeName(fieldType)
+
+    def _getTypeName( self, field ):
+        typeName = self._getBasicTypeName(field.fieldType())
+        if typeName == None:
+            typeName = field.typeName()
+
+        if self.isColumnar(field):
+            return typeName + CodeGenerator.COLUMNS_SUFFIX
+        elif field.isRepeating():
+            return "ArrayList<" + typeName + ">"
+        else:
+            return typeName
+
+    def _lookaheadCondition( self, lookahead ):
+        """ Returns a condition that is true if the next line may start a value with the given
+        LineLookahead. Only its first character is looked at. """
+        if lookahead is None:
+            return "true"
+        if lookahead.firstCharacters is None:
+            return "nextLineStartsWith(f, null)"
+        return "nextLineStartsWith(f, " + self._stringLiteral(lookahead.firstCharacters) + ")"
+
+    def _stringLiteral( self, string ):
+        return "\"" + string.replace("\\", "\\\\").replace("\"", "\\\"").replace("\t", "\\t") \
+            .replace("\r", "\\r").replace("\n", "\\n") + "\""
+
+    def _beginBlock( self, line ):
+        self.currentFile.writeLine(line)
+        self.currentFile.writeLine("{")
+        self.currentFile.indent()
+
+    def _endBlock(self):
+        self.currentFile.dedent()
+        self.currentFile.writeLine("}")
@@ -0,0 +1,982 @@
+#!/usr/bin/env python
+
+""" Generates InstaParse parsers in Python. """
+
+from instaparse import CodeGenerator, InstaParseFile
+
+listHelpers = """
+def intListParse( strings, inputData, currentLinePos ):
+\tintList = []
+\tif len(strings) == 0:
+\t\traise ParserError( inputData, currentLinePos, "Parser Error on line %d: Could not parse empty string as list." )
+\tfor s in strings:
+\t\tintList.append(intParse( s, inputData, currentLinePos ))
+\treturn intList
+
+def floatListParse( strings, inputData, currentLinePos ):
+\tfloatList = []
+\tif len(strings) == 0:
+\t\traise ParserError( inputData, currentLinePos, "Parser Error on line %d: Could not parse empty string as list." )
+\tfor s in strings:
+\t\tfloatList.append(floatParse( s, inputData, currentLinePos ))
+\treturn floatList
+"""
+
+# With the packed-lists option, numeric lists are converted in bulk into arrays. Only when that fails
+# are the elements parsed one at a time, to report the element that could not be parsed. Int lists with
+# an element too large for a C long stay plain lists.
+packedListHelpers = """
+def intListParse( strings, inputData, currentLinePos ):
+\tif len(strings) == 0:
+\t\traise ParserError( inputData, currentLinePos, "Parser Error on line %d: Could not parse empty string as list." )
+\ttry:
+\t\tintList = map( int, strings )
+\texcept ValueError:
+\t\tfor s in strings:
+\t\t\tintParse( s, inputData, currentLinePos )
+\t\traise
+\ttry:
+\t\treturn array.array( "l", intList )
+\texcept OverflowError:
+\t\t# Ints too large for a C long are kept in a plain list
+\t\treturn intList
+
+def floatListParse( strings, inputData, currentLinePos ):
+\tif len(strings) == 0:
+\t\traise ParserError( inputData, currentLinePos, "Parser Error on line %d: Could not parse empty string as list." )
+\ttry:
+\t\treturn array.array( "d", map( float, strings ) )
+\texcept ValueError:
+\t\tfor s in strings:
+\t\t\tfloatParse( s, inputData, currentLinePos )
+\t\traise
+"""
+
+# Parses the chunks of a repetition split by empty lines for parallelparse. A chunk starts with an
+# instance and ends just before an empty line, or at the end of the input, so that the workers parsing
+# the chunks stop where parsing the whole repetition sequentially would unless they reach the end.
+parallelHelpers = """
+# Parses a chunk of the input in a worker process: the instances of a repetition split by empty lines,
+# starting at offset start, until the chunk ends at offset end or the repetition cannot go on. Returns
+# the instances, the offset after the last one and whether the chunk was parsed whole.
+def parseChunk(chunk):
+\tfilename, parseFuncName, currentLinePos, end = chunk
+\tinputFile = open(filename, 'rb')
+\tinputData = readInput(inputFile)
+\tinputFile.close()
+\tparse = globals()[parseFuncName]
+\tinstances = []
+\tlinePos = currentLinePos
+\twhile True:
+\t\ttry:
+\t\t\tinstance, linePos = parse( inputData, linePos )
+\t\texcept ( ValueError, EOFError ):
+\t\t\treturn instances, currentLinePos, False
+\t\tinstances.append(instance)
+\t\tcurrentLinePos = linePos
+\t\tif currentLinePos >= end:
+\t\t\treturn instances, currentLinePos, currentLinePos == end
+\t\tline, linePos = peekline( inputData, currentLinePos )
+\t\tif line != '':
+\t\t\treturn instances, currentLinePos, False
+
+# Parses the instances of a repetition split by empty lines from offset currentLinePos, appending them
+# to instances. The input is split at empty lines into chunks of about chunkSize bytes that the pool
+# parses in order. Returns the offset after the last instance.
+def parseInChunks( inputData, currentLinePos, filename, parseFuncName, instances, pool, chunkSize ):
+\tchunks = []
+\tstart = currentLinePos
+\twhile start < len(inputData):
+\t\tend = inputData.find("\\n\\n", start + chunkSize - 1)
+\t\tend = len(inputData) if end == -1 else end + 1
+\t\tchunks.append(( filename, parseFuncName, start, end ))
+\t\t# The empty line after the chunk belongs to no chunk
+\t\tstart = end + 1
+\tfor chunkInstances, linePos, complete in pool.imap( parseChunk, chunks ):
+\t\t# No instances in a chunk means the repetition ended with the previous one.
+\t\tif not chunkInstances:
+\t\t\tbreak
+\t\tfor instance in chunkInstances:
+\t\t\tinstances.append(instance)
+\t\tcurrentLinePos = linePos
+\t\tif not complete:
+\t\t\tbreak
+\treturn currentLinePos
+"""
+
+# With the table-driven option, the classes are parsed by running the operations of the PLAN written
+# after these helpers, instead of by a parser function generated for every class.
+tableHelpers = """
+# Opcodes of the operations parsing the lines of a class in the PLAN:
+# ( EMPTY_LINE, )
+# ( PRIMITIVE_LINE, name, convert, isList ) for a line holding a single primitive field
+# ( FIELDS_LINE, names, converts, hasList ) for a line holding several primitive fields
+# ( CLASS_LINE, name, parse ) for a line holding a single class field
+# ( REPEATED_LINE, name, typeName, isClass, parse, isList, isSplitByNewline, lookahead, amount, columns )
+# where amount is '*', '+', a number or the name of the field holding the number of repetitions, and
+# lookahead is ( isBlank, numFields, hasList, firstCharacters ) or None, see lookaheadFails.
+# Functions and the columns classes are named in the PLAN and looked up by compilePlan.
+EMPTY_LINE, PRIMITIVE_LINE, FIELDS_LINE, CLASS_LINE, REPEATED_LINE = range(5)
+
+# Returns the PLAN with the names of functions and columns classes replaced by what they name.
+def compilePlan(plan):
+\tfunctions = globals()
+\tcompiled = {}
+\tfor className, ops in plan.items():
+\t\tcompiledOps = []
+\t\tfor op in ops:
+\t\t\tif op[0] == PRIMITIVE_LINE or op[0] == CLASS_LINE:
+\t\t\t\top = op[:2] + ( functions[op[2]], ) + op[3:]
+\t\t\telif op[0] == FIELDS_LINE:
+\t\t\t\top = op[:2] + ( tuple( functions[name] for name in op[2] ), ) + op[3:]
+\t\t\telif op[0] == REPEATED_LINE:
+\t\t\t\tcolumns = getattr( InstaParseData, op[9] ) if op[9] is not None else None
+\t\t\t\top = op[:4] + ( functions[op[4]], ) + op[5:9] + ( columns, )
+\t\t\tcompiledOps.append(op)
+\t\tcompiled[className] = tuple(compiledOps)
+\treturn compiled
+
+# Returns whether line, the next line as returned by peekline, cannot start a value with the lookahead.
+def lookaheadFails( line, lookahead ):
+\tif line is None:
+\t\treturn True
+\tisBlank, numFields, hasList, firstCharacters = lookahead
+\tif isBlank and line != '':
+\t\treturn True
+\tif numFields is not None and ( line.count(DELIMITER) < numFields - 1 if hasList else line.count(DELIMITER) != numFields - 1 ):
+\t\treturn True
+\treturn firstCharacters is not None and line[:1] not in firstCharacters
+
+# Runs the operations parsing lines of the class into userClass. Returns userClass and the new offset.
+def parseLines( className, ops, userClass, inputData, currentLinePos ):
+\tfor op in ops:
+\t\tcode = op[0]
+\t\tif code == PRIMITIVE_LINE:
+\t\t\tline, nextLinePos = readline( inputData, currentLinePos, className )
+\t\t\tsetattr( userClass, op[1], op[2]( line.split(DELIMITER) if op[3] else line, inputData, currentLinePos ) )
+\t\t\tcurrentLinePos = nextLinePos
+\t\telif code == FIELDS_LINE:
+\t\t\tnames, converts, hasList = op[1:]
+\t\t\tline, nextLinePos = readline( inputData, currentLinePos, className )
+\t\t\tfields = line.split(DELIMITER)
+\t\t\tnumFields = len(names)
+\t\t\tif len(fields) < numFields if hasList else len(fields) != numFields:
+\t\t\t\traise ParserError( inputData, currentLinePos, 'Parser Error on line %d: Expecting %d fields (%d found).', numFields, len(fields) )
+\t\t\tfor index in xrange(numFields - 1 if hasList else numFields):
+\t\t\t\tsetattr( userClass, names[index], converts[index]( fields[index], inputData, currentLinePos ) )
+\t\t\tif hasList:
+\t\t\t\tsetattr( userClass, names[-1], converts[-1]( fields[numFields - 1:], inputData, currentLinePos ) )
+\t\t\tcurrentLinePos = nextLinePos
+\t\telif code == CLASS_LINE:
+\t\t\tvalue, currentLinePos = op[2]( inputData, currentLinePos )
+\t\t\tsetattr( userClass, op[1], value )
+\t\telif code == REPEATED_LINE:
+\t\t\tinstances = op[9]() if op[9] is not None else []
+\t\t\tsetattr( userClass, op[1], instances )
+\t\t\tappend = instances.append
+\t\t\tposition = [ currentLinePos ]
+\t\t\tfor instance in repeat( className, op, userClass, inputData, position ):
+\t\t\t\tappend(instance)
+\t\t\tcurrentLinePos = position[0]
+\t\telse:
+\t\t\tline, nextLinePos = readline( inputData, currentLinePos, className )
+\t\t\tif line:
+\t\t\t\traise ParserError( inputData, currentLinePos, "Parser Error on line %d: Should be an empty line." )
+\t\t\tcurrentLinePos = nextLinePos
+\treturn userClass, currentLinePos
+
+# Generates the instances of a REPEATED_LINE operation of the class from the offset in position, which
+# is replaced by the offset after the last instance when it finishes.
+def repeat( className, op, userClass, inputData, position ):
+\tname, typeName, isClass, parse, isList, isSplitByNewline, lookahead, amount = op[1:9]
+\tcurrentLinePos = position[0]
+\tif amount == '*' or amount == '+':
+\t\tnumInstances = 0
+\t\tprevLinePos = currentLinePos
+\t\ttry:
+\t\t\twhile True:
+\t\t\t\t# The repetition ends without an exception when the next line cannot start an instance.
+\t\t\t\tif lookahead is not None:
+\t\t\t\t\tline, nextLinePos = peekline( inputData, currentLinePos )
+\t\t\t\t\tif lookaheadFails( line, lookahead ):
+\t\t\t\t\t\tbreak
+\t\t\t\tif isClass:
+\t\t\t\t\tretObj, currentLinePos = parse( inputData, currentLinePos )
+\t\t\t\telse:
+\t\t\t\t\t# With a lookahead, the line peeked at is the instance itself.
+\t\t\t\t\tif lookahead is None:
+\t\t\t\t\t\tline, nextLinePos = readline( inputData, currentLinePos, className )
+\t\t\t\t\tretObj = parse( line.split(DELIMITER) if isList else line, inputData, currentLinePos )
+\t\t\t\t\tcurrentLinePos = nextLinePos
+\t\t\t\tnumInstances += 1
+\t\t\t\tyield retObj
+\t\t\t\tif isSplitByNewline:
+\t\t\t\t\tprevLinePos = currentLinePos
+\t\t\t\t\tline, nextLinePos = peekline( inputData, currentLinePos )
+\t\t\t\t\tif line != '':
+\t\t\t\t\t\tbreak
+\t\t\t\t\tcurrentLinePos = nextLinePos
+\t\texcept ( ValueError, EOFError ) as e:
+\t\t\tpass
+\t\tif isSplitByNewline:
+\t\t\tcurrentLinePos = prevLinePos
+\t\tif amount == '+' and numInstances < 1:
+\t\t\traise ParserError( inputData, currentLinePos, 'Parser Error on line %d: Expecting at least 1 "%s" when parsing "%s.%s" (0 found).', typeName, className, name )
+\telse:
+\t\tnumRepetition = amount if type(amount) == int else getattr( userClass, amount )
+\t\ttry:
+\t\t\tfor _index in xrange(numRepetition):
+\t\t\t\tif isClass:
+\t\t\t\t\tretObj, currentLinePos = parse( inputData, currentLinePos )
+\t\t\t\telse:
+\t\t\t\t\tline, nextLinePos = readline( inputData, currentLinePos, className )
+\t\t\t\t\tretObj = parse( line.split(DELIMITER) if isList else line, inputData, currentLinePos )
+\t\t\t\t\tcurrentLinePos = nextLinePos
+\t\t\t\tyield retObj
+\t\t\t\tif isSplitByNewline and _index + 1 < numRepetition:
+\t\t\t\t\tline, nextLinePos = readline( inputData, currentLinePos, className )
+\t\t\t\t\tif line:
+\t\t\t\t\t\traise ParserError( inputData, currentLinePos, "Parser Error on line %d: Should be an empty line." )
+\t\t\t\t\tcurrentLinePos = nextLinePos
+\t\texcept ValueError as e:
+\t\t\traise ParserError( inputData, currentLinePos, 'Parser Error on line %d: Expecting exactly %d "%s" when parsing "%s.%s" (%d found)', numRepetition, typeName, className, name, _index )
+\tposition[0] = currentLinePos
+
+# Returns the function parsing the class, "parseX" for a class X.
+def classParser(className):
+\tdataClass = getattr( InstaParseData, className )
+\tdef parse( inputData, currentLinePos ):
+\t\treturn parseLines( className, OPS[className], dataClass(), inputData, currentLinePos )
+\tparse.__name__ = "parse" + className
+\treturn parse
+
+# Returns the generator function streaming the instances of the line at index streamedIndex of the
+# class, "iterparseX" for a class X. It first yields the X object once the lines before the streamed
+# line are parsed, then each instance of the streamed line, and stores the offset reached in the
+# position list when it finishes.
+def classIterparser( className, streamedIndex ):
+\tdataClass = getattr( InstaParseData, className )
+\tdef iterparse( inputData, position ):
+\t\tops = OPS[className]
+\t\tuserClass, currentLinePos = parseLines( className, ops[:streamedIndex], dataClass(), inputData, position[0] )
+\t\tyield userClass
+\t\tinstancePosition = [ currentLinePos ]
+\t\tfor instance in repeat( className, ops[streamedIndex], userClass, inputData, instancePosition ):
+\t\t\tyield instance
+\t\tuserClass, currentLinePos = parseLines( className, ops[streamedIndex + 1:], userClass, inputData, instancePosition[0] )
+\t\tposition[0] = currentLinePos
+\titerparse.__name__ = "iterparse" + className
+\treturn iterparse
+"""
+
+# The function parsing the class with the instances of its line at index parallelIndex parsed by a
+# multiprocessing pool, with the table-driven option. Requires the parallelHelpers.
+tableParallelHelpers = """
+# Returns the function parsing the class with the chunks of the line at index parallelIndex parsed by
+# the pool, "parallelparseX" for a class X.
+def classParallelParser( className, parallelIndex ):
+\tdataClass = getattr( InstaParseData, className )
+\tdef parallelparse( inputData, currentLinePos, filename, pool, chunkSize ):
+\t\tops = OPS[className]
+\t\tuserClass, currentLinePos = parseLines( className, ops[:parallelIndex], dataClass(), inputData, currentLinePos )
+\t\tname, typeName, amount, columns = ops[parallelIndex][1], ops[parallelIndex][2], ops[parallelIndex][8], ops[parallelIndex][9]
+\t\tinstances = columns() if columns is not None else []
+\t\tsetattr( userClass, name, instances )
+\t\tcurrentLinePos = parseInChunks( inputData, currentLinePos, filename, "parse" + typeName, instances, pool, chunkSize )
+\t\tif amount == '+' and len(instances) < 1:
+\t\t\traise ParserError( inputData, currentLinePos, 'Parser Error on line %d: Expecting at least 1 "%s" when parsing "%s.%s" (0 found).', typeName, className, name )
+\t\treturn parseLines( className, ops[parallelIndex + 1:], userClass, inputData, currentLinePos )
+\tparallelparse.__name__ = "parallelparse" + className
+\treturn parallelparse
+"""
+
+
+def pygenStaticHelpers( packedLists=False, parallel=False, tableDriven=False ):
+    helpers = """
+# Maps the input file into memory, or reads it whole if it cannot be mapped, e.g. when it is empty.
+def readInput(inputFile):
+\ttry:
+\t\treturn mmap.mmap( inputFile.fileno(), 0, access=mmap.ACCESS_READ )
+\texcept ( ValueError, EnvironmentError ):
+\t\treturn inputFile.read()
+
+# Returns the stripped line starting at offset pos of the input data, and the offset of the next line.
+def readline( inputData, pos, className ):
+\tend = inputData.find("\\n", pos)
+\tif end == -1:
+\t\tif pos >= len(inputData):
+\t\t\traise ValueError("Parser Error: Reached end of file while parsing object \\"" + className + "\\".")
+\t\tend = len(inputData)
+\treturn inputData[pos:end].strip(), end + 1
+
+# Like readline, but returns None instead of the line at the end of the input.
+def peekline( inputData, pos ):
+\tend = inputData.find("\\n", pos)
+\tif end == -1:
+\t\tif pos >= len(inputData):
+\t\t\treturn None, pos
+\t\tend = len(inputData)
+\treturn inputData[pos:end].strip(), end + 1
+
+# Returns the number of the line at offset pos of the input data. Line numbers are only needed for
+# error messages, so they are counted from the offset when an error is raised rather than tracked.
+def lineNumberAt( inputData, pos ):
+\t# Past the end of the input is the offset after a last line without a newline
+\treturn inputData[:pos].count("\\n") + ( 2 if pos > len(inputData) else 1 )
+
+# A parser error citing the line at offset pos of the input data, whose number is the first argument of
+# the message. Backtracking discards most errors, so the line number is only counted once the message
+# is needed.
+class ParserError(ValueError):
+\tdef __init__( self, inputData, pos, message, *args ):
+\t\tValueError.__init__( self, message )
+\t\tself.inputData, self.pos, self.messageArgs = inputData, pos, args
+
+\tdef __str__(self):
+\t\treturn self.args[0] % ( ( lineNumberAt( self.inputData, self.pos ), ) + self.messageArgs )
+
+def intParse( s, inputData, currentLinePos ):
+\ttry:
+\t\treturn int(s)
+\texcept ValueError as e:
+\t\traise ParserError( inputData, currentLinePos, "Parser Error on line %d: Could not parse \\\"%s\\\" as int.", s )
+
+def boolParse( s, inputData, currentLinePos ):
+\tif s == "1" or s.lower() == "true":
+\t\treturn True
+\telif s == "0" or s.lower() == "false":
+\t\treturn False
+\traise ParserError( inputData, currentLinePos, "Parser Error on line %d: Could not parse \\\"%s\\\" as bool.", s )
+
+def stringParse( s, inputData, currentLinePos ):
+\treturn s
+
+def floatParse( s, inputData, currentLinePos ):
+\ttry:
+\t\treturn float(s)
+\texcept ValueError as e:
+\t\traise ParserError( inputData, currentLinePos, "Parser Error on line %d: Could not parse \\\"%s\\\" as float.", s )
+
+def boolListParse( strings, inputData, currentLinePos ):
+\tboolList = []
+\tif len(strings) == 0:
+\t\traise ParserError( inputData, currentLinePos, "Parser Error on line %d: Could not parse empty string as list." )
+\tfor s in strings:
+\t\tboolList.append(boolParse( s, inputData, currentLinePos ))
+\treturn boolList
+
+def stringListParse( strings, inputData, currentLinePos ):
+\tstringList = []
+\tif len(strings) == 0:
+\t\traise ParserError( inputData, currentLinePos, "Parser Error on line %d: Could not parse empty string as list." )
+\tfor s in strings:
+\t\tstringList.append(stringParse( s, inputData, currentLinePos ))
+\treturn stringList
+
+"""
+    helpers += packedListHelpers if packedLists else listHelpers
+    if parallel:
+        helpers += parallelHelpers
+    if tableDriven:
+        helpers += tableHelpers
+        if parallel:
+            helpers += tableParallelHelpers
+        helpers = helpers.replace( "InstaParseData", CodeGenerator.DATA_FILE_NAME )
+    helpers += "\n\n"
+    helpers = helpers.replace( "intParse", CodeGenerator.PARSE_INT )
+    helpers = helpers.replace( "boolParse", CodeGenerator.PARSE_BOOL )
+    helpers = helpers.replace( "stringParse", CodeGenerator.PARSE_STRING )
+    helpers = helpers.replace( "floatParse", CodeGenerator.PARSE_FLOAT )
+    helpers = helpers.replace( "intListParse", CodeGenerator.PARSE_INT_LIST )
+    helpers = helpers.replace( "boolListParse", CodeGenerator.PARSE_BOOL_LIST )
+    helpers = helpers.replace( "stringListParse", CodeGenerator.PARSE_STRING_LIST )
+    helpers = helpers.replace( "floatListParse", CodeGenerator.PARSE_FLOAT_LIST )
+
+    # Replace the tabs with the appropriate amount of indent spaces
+    helpers = helpers.replace( "\t", InstaParseFile.indentString )
+
+    return helpers
+
+
+class PythonGenerator(CodeGenerator):
+
+    OPTIONS = dict(CodeGenerator.OPTIONS)
+    OPTIONS["packed-lists"] = "parses list(int) and list(float) fields into array.array's of C longs and doubles " \
+                              "instead of lists of Python objects. Int lists holding a value too large for a C long " \
+                              "stay lists."
+    OPTIONS["dict-classes"] = "generates data classes storing their fields in a per-instance __dict__ instead of " \
+                              "__slots__, for code adding its own attributes to parsed objects."
+    OPTIONS["table-driven"] = "compiles the format into a table of the operations parsing the lines of every class, run " \
+                              "by a single interpreter, instead of a parser function per class, so that the size of the " \
+                              "util file grows with the format rather than with the code parsing it."
+
+    def write( self, line ):
+        self.currentFile.write(line)
+
+    def writeLine( self, line ):
+        self.currentFile.writeLine(line)
+
+    def writeNewline(self):
+        self.currentFile.writeNewline()
+
+    def comment( self, line ):
+        self.currentFile.comment(line)
+
+    def writeImportLine( self, line ):
+        self.currentFile.writeImportLine(line)
+
+    def beginBlock( self, line ):
+        self.writeLine(line)
+        self.currentFile.indent()
+
+    def endBlock(self):
+        self.currentFile.dedent()
+
+    def initialize(self):
+        """ Perform additional initialization if required. """
+        self.main.setExtension("py")
+        self.util.setExtension("py")
+        self.data.setExtension("py")
+
+    ################################################################################
+    # Generate Data File
+    ################################################################################
+
+    def generateDataFileHeader(self):
+        """ For generating the data file header, such as the import statements. """
+        self.writeLine("#!/usr/bin/env python")
+        self.writeNewline()
+        if self.columnarClassNames:
+            self.writeLine("import array")
+            self.writeNewline()
+
+    def generateClass( self, className, fields ):
+        """ Helper function for generating the code segement defining a class (or the corresponding
+        data structure). The first argument is the class name and the second argument is a list of
+        fields (in order) of that class. """
+        self.beginDataClass( className, [ f.name() for f in fields ] )
+        # Fields not given to the constructor are None until parsed
+        self.beginBlock("def __init__( %s ):" % ", ".join([ "self" ] + [ "%s=None" % f.name() for f in fields ]))
+        for f in fields:
+            self.writeLine("self.%s = %s" % ( f.name(), f.name() ))
+        if not fields:
+            self.writeLine("pass")
+        self.endBlock()
+        if self.parallelBodyLine() is not None and "dict-classes" not in self.options:
+            # Pickling the constructor arguments is about twice as fast as the default for __slots__
+            # classes, which matters for the objects parsed by the worker processes of parallelparse.
+            self.beginBlock("def __reduce__(self):")
+            arguments = [ "self.%s" % f.name() for f in fields ]
+            self.writeLine("return ( %s, ( %s ) )" % ( className,
+                arguments[0] + "," if len(arguments) == 1 else ", ".join(arguments) ))
+            self.endBlock()
+        self.endBlock()
+        self.writeNewline()
+
+    def beginDataClass( self, className, attributeNames ):
+        """ Begins a class of the data file with the given instance attributes, which are stored in
+        __slots__ unless the dict-classes option is set. """
+        if "dict-classes" in self.options:
+            self.beginBlock("class %s:" % className)
+            return
+        self.beginBlock("class %s(object):" % className)
+        slots = ", ".join("\"%s\"" % name for name in attributeNames)
+        self.writeLine("__slots__ = ( %s )" % ( slots + "," if len(attributeNames) == 1 else slots ))
+        self.writeNewline()
+
+    def generateColumnsClass( self, className, fields ):
+        """ Helper function for generating the class storing the instances of a class as one column
+        per field. Ints, floats and bools are stored in array.array's of C longs, doubles and signed
+        chars, strings in lists. An int column becomes a list once it is appended an int too large for
+        a C long, which the other parsers accept. """
+        self.beginDataClass( className + CodeGenerator.COLUMNS_SUFFIX, [ f.name() for f in fields ] )
+        self.beginBlock("def __init__(self):")
+        for f in fields:
+            if f.isInteger():
+                self.writeLine("self.%s = array.array(\"l\")" % f.name())
+            elif f.isFloat():
+                self.writeLine("self.%s = array.array(\"d\")" % f.name())
+            elif f.isBool():
+                self.writeLine("self.%s = array.array(\"b\")" % f.name())
+            else:
+                self.writeLine("self.%s = []" % f.name())
+        self.endBlock()
+        self.writeNewline()
+        self.beginBlock("def __len__(self):")
+        self.writeLine("return len(self.%s)" % fields[0].name())
+        self.endBlock()
+        self.writeNewline()
+        self.beginBlock("def append( self, record ):")
+        for f in fields:
+            if f.isInteger():
+                self.beginBlock("try:")
+                self.writeLine("self.%s.append(record.%s)" % ( f.name(), f.name() ))
+                self.endBlock()
+                self.beginBlock("except OverflowError:")
+                self.writeLine("self.%s = list(self.%s)" % ( f.name(), f.name() ))
+                self.writeLine("self.%s.append(record.%s)" % ( f.name(), f.name() ))
+                self.endBlock()
+            else:
+                self.writeLine("self.%s.append(record.%s)" % ( f.name(), f.name() ))
+        self.endBlock()
+        self.endBlock()
+        self.writeNewline()
+
+    ################################################################################
+    # Generate Util File
+    ################################################################################
+
+    def generateUtilFileHeader(self):
+        """ For generating the util file header, such as the import statements. """
+        self.writeLine("#!/usr/bin/env python")
+        self.writeNewline()
+        if "packed-lists" in self.options:
+            self.writeLine("import array")
+        self.writeLine("import mmap")
+        self.writeLine("import " + CodeGenerator.DATA_FILE_NAME)
+
+    def generateHelperFunctions(self):
+        """ For generating the helper functions that will be useful when parsing in the util file. """
+        helpers =  pygenStaticHelpers( "packed-lists" in self.options, self.parallelBodyLine() is not None,
+            "table-driven" in self.options )
+        self.write(helpers)
+        self.writeNewline()
+
+    def generateClassParserFunctions(self):
+        """ With the table-driven option, writes the PLAN of the operations parsing each class and
+        the parser functions running it instead of generating a function per class. """
+        if "table-driven" not in self.options:
+            CodeGenerator.generateClassParserFunctions(self)
+            return
+        self.writeLine("DELIMITER = %r" % self.format.lineDelimiter())
+        self.writeNewline()
+        self.beginBlock("PLAN = {")
+        for className, lines in self.classes.items():
+            self.beginBlock("%r: (" % className)
+            for line in lines:
+                self.writeLine("%s," % self.lineOperation( className, line ))
+            self.endBlock()
+            self.writeLine("),")
+        self.endBlock()
+        self.writeLine("}")
+        self.writeNewline()
+        for className in self.classes:
+            self.writeLine("%s = classParser(%r)" % ( self.typeNameToParseFuncName[className], className ))
+        lines = self.classes[self.bodyTypeName]
+        streamedLine = self.streamedBodyLine()
+        if streamedLine is not None:
+            self.writeLine("iterparse%s = classIterparser( %r, %d )" % ( self.bodyTypeName, self.bodyTypeName,
+                [ i for i, line in enumerate(lines) if line is streamedLine ][0] ))
+        parallelLine = self.parallelBodyLine()
+        if parallelLine is not None:
+            self.writeLine("parallelparse%s = classParallelParser( %r, %d )" % ( self.bodyTypeName, self.bodyTypeName,
+                [ i for i, line in enumerate(lines) if line is parallelLine ][0] ))
+        self.writeNewline()
+        self.writeLine("OPS = compilePlan(PLAN)")
+        self.writeNewline()
+
+    def lineOperation( self, className, line ):
+        """ Returns the source of the PLAN operation parsing the FormatLine of the class, as laid out
+        in the tableHelpers. """
+        if line.isEmpty():
+            return "( EMPTY_LINE, )"
+        field = line.getField(0)
+        parseFuncName = self.typeNameToParseFuncName[field.typeName()]
+        if line.isRepeating():
+            lookahead = self.format.lookahead(field)
+            if lookahead is not None:
+                lookahead = ( lookahead.isBlank, lookahead.numFields, lookahead.hasList, lookahead.firstCharacters )
+            if line.isZeroOrMoreRepetition():
+                amount = "*"
+            elif line.isOneOrMoreRepetition():
+                amount = "+"
+            elif line.isIntegerRepetition():
+                amount = int(line.repetitionAmountString())
+            else:
+                amount = line.repetitionAmountString()
+            columns = field.typeName() + CodeGenerator.COLUMNS_SUFFIX if self.isColumnar(field) else None
+            return "( REPEATED_LINE, %r, %r, %r, %r, %r, %r, %r, %r, %r )" % ( field.name(), field.typeName(),
+                not field.isPrimitive(), parseFuncName, field.isList(), line.isSplitByNewline(), lookahead, amount, columns )
+        if line.numFields() == 1 and field.isPrimitive():
+            return "( PRIMITIVE_LINE, %r, %r, %r )" % ( field.name(), parseFuncName, field.isList() )
+        if line.numFields() == 1:
+            return "( CLASS_LINE, %r, %r )" % ( field.name(), parseFuncName )
+        return "( FIELDS_LINE, %r, %r, %r )" % ( tuple( f.name() for f in line ),
+            tuple( self.typeNameToParseFuncName[f.typeName()] for f in line ), line.getField(-1).isList() )
+
+    def generateClassParserFunction( self, className, lines, streamedLine=None, parallelLine=None ):
+        """ For generating the helper functions for parsing a user defined class. The first argument
+        is the class name and the second argument is a list of FormatLine's. """
+        # The name of the class parser should be "parseX" where X is the class name.
+        # The argument to the parser should be the input data to be parsed and the offset of the
+        # current line in the input data. Line numbers are only computed from the offset for errors.
+        # If parsed successfully, the parser should return a X object and the new offset.
+        if parallelLine is not None:
+            # The parallel parser "parallelparseX" also takes the name of the input file, the
+            # multiprocessing pool parsing the chunks of the parallel line and their size in bytes.
+            self.beginBlock("def parallelparse%s( inputData, currentLinePos, filename, pool, chunkSize ):" % className)
+        elif streamedLine is None:
+            self.beginBlock("def parse%s( inputData, currentLinePos ):" % className)
+        else:
+            # The streaming parser "iterparseX" is a generator first yielding the X object once the
+            # lines before the streamed line are parsed, then each instance of the streamed line.
+            # The offset reached is stored in the position list when it finishes.
+            self.beginBlock("def iterparse%s( inputData, position ):" % className)
+            self.writeLine("currentLinePos = position[0]")
+        self.writeLine("userClass = %s.%s()" % ( CodeGenerator.DATA_FILE_NAME, className ))
+        self.writeNewline()
+
+        def readLine():
+            # The offset of the next line is only stored in currentLinePos once the line has been
+            # parsed, so that a repetition ending on this line can resume from currentLinePos.
+            self.writeLine("line, nextLinePos = readline( inputData, currentLinePos, \"%s\" )" % className)
+
+        def advance():
+            self.writeLine("currentLinePos = nextLinePos")
+
+        def handleEmptyLine():
+            self.comment("Parsing empty line")
+            readLine()
+            self.beginBlock("if line:")
+            self.writeLine("raise ParserError( inputData, currentLinePos, \"Parser Error on line %d: Should be an empty line.\" )")
+            self.endBlock()
+            advance()
+
+        def handlePrimitive( field, target ):
+            """ Parses a line holding the single primitive field into target. """
+            readLine()
+            if field.isList():
+                self.writeLine("%s = %s( line.split('%s'), inputData, currentLinePos )" % \
+                    ( target, self.typeNameToParseFuncName[field.typeName()], self.format.lineDelimiter() ))
+            else:
+                self.writeLine("%s = %s( line, inputData, currentLinePos )" % \
+                    ( target, self.typeNameToParseFuncName[field.typeName()] ))
+            advance()
+
+        def handleSimpleLine(line):
+            # The case where there is only one primitive field.
+            if line.numFields() == 1 and line.getField(0).isPrimitive():
+                field = line.getField(0)
+                handlePrimitive( field, "userClass.%s" % field.name() )
+            # The case where there is only one non-primitive field.
+            elif line.numFields() == 1 and not line.getField(0).isPrimitive():
+                field = line.getField(0)
+                self.writeLine("userClass.%s, currentLinePos = %s( inputData, currentLinePos )" % ( field.name(), self.typeNameToParseFuncName[field.typeName()] ))
+            # The case where there is multiple fields on a line. The fields are all primitives.
+            else:
+                readLine()
+                self.writeLine("fields = line.split('%s')" % self.format.lineDelimiter())
+                # If the last field is not a list, then the number of fields should match exactly
+                if not line.getField(-1).isList():
+                    self.beginBlock("if len(fields) != %d:" % line.numFields())
+                    self.writeLine("raise ParserError( inputData, currentLinePos, 'Parser Error on line %d: Expecting " + \
+                        str(line.numFields()) + " fields (%d found).', len(fields) )")
+                    self.endBlock()
+                # Else there should be at least X fields on the line, where X is the number of fields
+                # on the line in the format file
+                else:
+                    self.beginBlock("if len(fields) < %d:" % (line.numFields()))
+                    self.writeLine("raise ParserError( inputData, currentLinePos, 'Parser Error on line %d: Expecting " + \
+                        str(line.numFields()) + " fields (%d found).', len(fields) )")
+                    self.endBlock()
+                # The ints and floats are converted together, and only parsed one field at a time to
+                # report the field that could not be parsed if that fails.
+                numbers = [ ( i, field ) for i, field in enumerate(line) if field.isInteger() or field.isFloat() ]
+                if numbers:
+                    self.beginBlock("try:")
+                    if len(numbers) == line.numFields() and len(set( f.typeName() for _, f in numbers )) == 1:
+                        self.writeLine("%s = map( %s, fields )" % ( ", ".join( "userClass." + f.name() for _, f in numbers ),
+                            numbers[0][1].typeName() ))
+                    else:
+                        self.writeLine("%s = %s" % ( ", ".join( "userClass." + f.name() for _, f in numbers ),
+                            ", ".join( "%s(fields[%d])" % ( f.typeName(), i ) for i, f in numbers ) ))
+                    self.endBlock()
+                    self.beginBlock("except ValueError:")
+                    for i, field in enumerate(line):
+                        handleField( i, field )
+                    self.endBlock()
+                for i, field in enumerate(line):
+                    if field.isString():
+                        self.writeLine("userClass.%s = fields[%d]" % ( field.name(), i ))
+                    elif not ( field.isInteger() or field.isFloat() ):
+                        handleField( i, field )
+                advance()
+
+        def handleField( i, field ):
+            """ Parses the field at index i of the split line. """
+            if field.isList():
+                self.writeLine("userClass.%s = %s( fields[%d:], inputData, currentLinePos )" % ( \
+                    field.name(), self.typeNameToParseFuncName[field.typeName()], i ))
+            else:
+                self.writeLine("userClass.%s = %s( fields[%d], inputData, currentLinePos )" % ( \
+                    field.name(), self.typeNameToParseFuncName[field.typeName()], i ))
+
+        def storeInstance( field, streamed ):
+            if streamed:
+                self.writeLine("numInstances += 1")
+                self.writeLine("yield retObj")
+            else:
+                self.writeLine("userClass.%s.append(retObj)" % field.name())
+
+        def handleRepeatedField( field, streamed ):
+            # Field is an user defined class.
+            if not field.isPrimitive():
+                self.writeLine("retObj, currentLinePos = %s( inputData, currentLinePos )" % self.typeNameToParseFuncName[field.typeName()])
+            # Field is a primitive, possibly a list.
+            else:
+                handlePrimitive( field, "retObj" )
+            storeInstance( field, streamed )
+
+        def checkAtLeastOne( field, numInstances ):
+            self.beginBlock("if %s < 1:" % numInstances)
+            self.writeLine("raise ParserError( inputData, currentLinePos, \"Parser Error on line %d: Expecting at least 1 \\\"" + \
+                field.typeName() + "\\\" when parsing \\\"" + className + "." + field.name() + \
+                "\\\" (0 found).\" )")
+            self.endBlock()
+
+        def handleRepeatingLine(line):
+            field = line.getField(0)
+            streamed = line is streamedLine
+            if streamed:
+                self.writeLine("yield userClass")
+                self.writeLine("numInstances = 0")
+            elif self.isColumnar(field):
+                self.writeLine("userClass.%s = %s.%s%s()" % \
+                    ( field.name(), CodeGenerator.DATA_FILE_NAME, field.typeName(), CodeGenerator.COLUMNS_SUFFIX ))
+            else:
+                self.writeLine("userClass.%s = []" % field.name())
+
+            if line is parallelLine:
+                self.writeLine("currentLinePos = parseInChunks( inputData, currentLinePos, " \
+                    "filename, \"%s\", userClass.%s, pool, chunkSize )" % ( self.typeNameToParseFuncName[field.typeName()], field.name() ))
+                if line.isOneOrMoreRepetition():
+                    checkAtLeastOne( field, "len(userClass.%s)" % field.name() )
+
+            elif line.isZeroOrMoreRepetition() or line.isOneOrMoreRepetition():
+                lookahead = self.format.lookahead(field)
+                if line.isSplitByNewline():
+                    self.writeLine("prevLinePos = currentLinePos")
+                self.beginBlock("try:")
+                self.beginBlock("while True:")
+                # The repetition ends without an exception when the next line cannot start an instance.
+                if lookahead is not None:
+                    self.writeLine("line, nextLinePos = peekline( inputData, currentLinePos )")
+                    self.beginBlock("if %s:" % self.lookaheadFails(lookahead))
+                    self.writeLine("break")
+                    self.endBlock()
+                if lookahead is not None and field.isPrimitive():
+                    # The line peeked at is the instance itself.
+                    self.writeLine("retObj = %s( %s, inputData, currentLinePos )" % \
+                        ( self.typeNameToParseFuncName[field.typeName()],
+                        "line.split('%s')" % self.format.lineDelimiter() if field.isList() else "line" ))
+                    advance()
+                    storeInstance( field, streamed )
+                else:
+                    handleRepeatedField( field, streamed )
+                if line.isSplitByNewline():
+                    self.writeLine("prevLinePos = currentLinePos")
+                    self.writeLine("line, nextLinePos = peekline( inputData, currentLinePos )")
+                    self.beginBlock("if line != '':")
+                    self.writeLine("break")
+                    self.endBlock()
+                    advance()
+                self.endBlock()
+                self.endBlock()
+
+                # Backtracking to the last line parsed only means resetting the offset.
+                self.beginBlock("except ( ValueError, EOFError ) as e:")
+                self.writeLine("pass")
+                self.endBlock()
+                if line.isSplitByNewline():
+                    self.writeLine("currentLinePos = prevLinePos")
+                if line.isOneOrMoreRepetition():
+                    checkAtLeastOne( field, "numInstances" if streamed else "len(userClass.%s)" % field.name() )
+
+            elif line.isIntegerRepetition() or line.isVariableRepetition():
+                numRepetition = line.repetitionAmountString()
+                if line.isVariableRepetition():
+                    numRepetition = "userClass." + numRepetition
+
+                self.beginBlock("try:")
+                self.beginBlock("for _index in xrange(%s):" % numRepetition)
+                handleRepeatedField( field, streamed )
+                if line.isSplitByNewline():
+                    self.beginBlock("if _index + 1 < %s:" % numRepetition)
+                    handleEmptyLine()
+                    self.endBlock()
+                self.endBlock()
+                self.endBlock()
+
+                self.beginBlock("except ValueError as e:")
+                self.writeLine("raise ParserError( inputData, currentLinePos, 'Parser Error on line %d: Expecting exactly %d \\\"" + \
+                    field.typeName() + "\\\" when parsing \\\"" + className + "." + field.name() + \
+                    "\\\" (%d found)', " + numRepetition + ", _index )")
+                self.endBlock()
+
+        def handleLine(line):
+            if line.isEmpty():
+                handleEmptyLine()
+            elif line.isRepeating():
+                handleRepeatingLine(line)
+            else:
+                handleSimpleLine(line)
+
+        for line in lines:
+            handleLine(line)
+            self.writeNewline()
+
+        if streamedLine is None:
+            self.writeLine("return userClass, currentLinePos")
+        else:
+            self.writeLine("position[0] = currentLinePos")
+        self.endBlock()
+        self.writeNewline()
+
+    def lookaheadFails( self, lookahead ):
+        """ Returns a condition on `line`, the next line as returned by peekline, that is true if the
+        line cannot be the start of a value with the given LineLookahead. """
+        conditions = [ "line is None" ]
+        if lookahead.isBlank:
+            conditions.append("line != ''")
+        if lookahead.numFields is not None:
+            conditions.append("line.count('%s') %s %d" % ( self.format.lineDelimiter(),
+                "<" if lookahead.hasList else "!=", lookahead.numFields - 1 ))
+        if lookahead.firstCharacters is not None:
+            conditions.append("line[:1] not in %r" % lookahead.firstCharacters)
+        return " or ".join(conditions)
+
+    ################################################################################
+    # Generate Main File
+    ################################################################################
+
+    def generateMainFileHeader(self):
+        """ For generating the main file header, such as the import statements. """
+        self.writeLine("#!/usr/bin/env python")
+        self.writeNewline()
+        self.writeLine("import " + CodeGenerator.UTIL_FILE_NAME)
+        if self.parallelBodyLine() is not None:
+            self.writeLine("import multiprocessing")
+        self.writeLine("import sys")
+        self.writeNewline()
+
+    def generateInputParserFunction(self):
+        """ For generating the function to parse an input file. """
+        self.beginBlock("def %s( filename ):" % CodeGenerator.PARSE_INPUT)
+
+        self.beginBlock("try:")
+        self.writeReadInput()
+        # Parse file
+        self.writeLine("body, linePos = %s.%s( inputData, 0 )"
+            % ( CodeGenerator.UTIL_FILE_NAME, self.typeNameToParseFuncName[self.bodyTypeName] ))
+        self.writeTrailingLinesCheck()
+        self.writeLine("return body")
+        self.endBlock()
+        self.writeErrorHandlers()
+
+        self.endBlock()
+        self.writeNewline()
+
+        if self.parallelBodyLine() is not None:
+            self.generateParallelInputParserFunction()
+
+        streamedLine = self.streamedBodyLine()
+        if streamedLine is None:
+            return
+        # The streaming parser returns the body and an iterator over the instances of its first
+        # repeated line. The fields of the body after that line are set once the iterator is exhausted.
+        self.beginBlock("def %s( filename ):" % CodeGenerator.ITERPARSE_INPUT)
+        self.beginBlock("try:")
+        self.writeReadInput()
+        self.writeLine("position = [ 0 ]")
+        self.writeLine("instances = %s.iterparse%s( inputData, position )" % ( CodeGenerator.UTIL_FILE_NAME, self.bodyTypeName ))
+        self.writeLine("body = next(instances)")
+        self.writeLine("return body, %sInstances( inputData, instances, position )" % CodeGenerator.ITERPARSE_INPUT)
+        self.endBlock()
+        self.writeErrorHandlers()
+        self.endBlock()
+        self.writeNewline()
+
+        self.beginBlock("def %sInstances( inputData, instances, position ):" % CodeGenerator.ITERPARSE_INPUT)
+        self.beginBlock("try:")
+        self.beginBlock("for instance in instances:")
+        self.writeLine("yield instance")
+        self.endBlock()
+        self.writeLine("linePos = position[0]")
+        self.writeTrailingLinesCheck()
+        self.endBlock()
+        self.writeErrorHandlers()
+        self.endBlock()
+        self.writeNewline()
+
+    def generateParallelInputParserFunction(self):
+        """ For generating the function parsing an input file with the chunks of the parallel line
+        parsed by a pool of processes, by default as many as there are CPUs. """
+        self.beginBlock("def %s( filename, processes=None, chunkSize=%d ):" % \
+            ( CodeGenerator.PARALLEL_PARSE_INPUT, CodeGenerator.PARALLEL_CHUNK_SIZE ))
+        self.beginBlock("try:")
+        self.writeReadInput()
+        self.writeLine("pool = multiprocessing.Pool(processes)")
+        self.beginBlock("try:")
+        self.writeLine("body, linePos = %s.parallelparse%s( inputData, 0, filename, pool, chunkSize )"
+            % ( CodeGenerator.UTIL_FILE_NAME, self.bodyTypeName ))
+        self.endBlock()
+        # Chunks after the end of the repetition may still be parsing
+        self.beginBlock("finally:")
+        self.writeLine("pool.terminate()")
+        self.endBlock()
+        self.writeTrailingLinesCheck()
+        self.writeLine("return body")
+        self.endBlock()
+        self.writeErrorHandlers()
+        self.endBlock()
+        self.writeNewline()
+
+    def writeReadInput(self):
+        # Open file, the whole input is read once and walked by offset
+        self.writeLine("inputFile = open(filename, 'rb')")
+        self.writeLine("inputData = %s.readInput(inputFile)" % CodeGenerator.UTIL_FILE_NAME)
+        self.writeLine("inputFile.close()")
+
+    def writeTrailingLinesCheck(self):
+        # Handle trailing newlines
+        self.beginBlock("while linePos < len(inputData):")
+        self.writeLine("line, nextLinePos = %s.readline( inputData, linePos, '' )" % CodeGenerator.UTIL_FILE_NAME)
+        self.beginBlock("if line != '':")
+        self.writeLine("sys.stderr.write(\"Parser Error on line %%d: Finished parsing but did not reach end of file.\" %% %s.lineNumberAt( inputData, linePos ))"
+            % CodeGenerator.UTIL_FILE_NAME)
+        self.writeLine("exit(1)")
+        self.endBlock()
+        self.writeLine("linePos = nextLinePos")
+        self.endBlock()
+
+    def writeErrorHandlers(self):
+        # Catch File IO errors
+        self.beginBlock("except IOError as e:")
+        self.writeLine("sys.stderr.write('Parser Error: Problem opening file, %s' % e)" )
+        self.writeLine("exit(1)")
+        self.endBlock()
+        # Catch parser errors
+        self.beginBlock("except ValueError as e:")
+        self.writeLine("sys.stderr.write(str(e) + \"\\n\")")
+        self.writeLine("exit(1)")
+        self.endBlock()
+        # Catch all other errors
+        self.beginBlock("except Exception as e:")
+        self.writeLine("sys.stderr.write('Parser Error: %s\\n' % e)")
+        self.writeLine("import traceback")
+        self.writeLine("traceback.print_exc()")
+        self.writeLine("exit(1)")
+        self.endBlock()
+
+    def generateMainFunction(self):
+        """ For generating the empty main method that the user can fill in. """
+        self.beginBlock("if __name__ == '__main__':")
+        self.currentFile.comment("Call " + CodeGenerator.PARSE_INPUT + "(filename) to parse the file of that name.")
+        if self.streamedBodyLine() is not None:
+            self.currentFile.comment("Call " + CodeGenerator.ITERPARSE_INPUT + "(filename) to get the body and an iterator over the \"" +
+                self.streamedBodyLine().getField(0).name() + "\" parsed as it is consumed.")
+        if self.parallelBodyLine() is not None:
+            self.currentFile.comment("Call " + CodeGenerator.PARALLEL_PARSE_INPUT + "(filename) to parse it with the \"" +
+                self.parallelBodyLine().getField(0).name() + "\" parsed by a pool of processes.")
+        self.writeLine("pass")
+        self.endBlock()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+
+""" Writes random input files that conform to an InstaParse format, for benchmarking and load
+testing the generated parsers.
+
+Each class of the format is compiled once into a list of steps writing one of its lines, so
+producing an input only runs those steps and never inspects the format again. Output is buffered
+and written to the file in large blocks as it is produced, so inputs of any size can be written in
+constant memory.
+
+Repetitions with '*' and '+' are read greedily by the generated parsers, so for formats where the
+line following such a repetition could also be read as another instance of it, the input written
+is valid but may be parsed differently from how it was generated. """
+
+import random
+from sys import exit, stdout, stderr
+from optparse import OptionParser
+
+from instaparse import InstaParseFormatFileParser, InstaParseFormat
+
+# Number of buffered chunks after which the buffer is written to the output file
+FLUSH_CHUNKS = 4096
+# Number of distinct words string fields are chosen from
+NUM_WORDS = 256
+SIZE_SUFFIXES = { "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3 }
+
+class InputSynthesizer:
+    """ Writes random inputs for an InstaParseFormat. Each repetition count is chosen uniformly from
+    an inclusive ( minimum, maximum ) range: zeroOrMoreRange for '*' lines, oneOrMoreRange for '+'
+    lines, countRange for the int fields used as variable repetition counts and listRange for the
+    number of elements of lists. The same seed always produces the same input. """
+
+    def __init__( self, format, seed=None, zeroOrMoreRange=( 0, 8 ), oneOrMoreRange=( 1, 8 ),
+            countRange=( 0, 8 ), listRange=( 1, 8 ) ):
+        self.format = format
+        self.zeroOrMoreRange = zeroOrMoreRange
+        self.oneOrMoreRange = oneOrMoreRange
+        self.countRange = countRange
+        self.listRange = listRange
+        self.random = random.Random(seed)
+        self.delimiter = format.lineDelimiter()
+        self.words = []
+        while len(self.words) < NUM_WORDS:
+            word = "".join(self.random.choice("abcdefghijklmnopqrstuvwxyz") for _ in xrange(self.random.randint(1, 10)))
+            if self.delimiter not in word:
+                self.words.append(word)
+        # Number of bytes and lines written to the output file so far
+        self.numBytes = 0
+        self.numLines = 0
+        self._outputFile = None
+        self._chunks = []
+        self._targetBytes = None
+        self._classWriters = {}
+
+    def write( self, outputFile, numBytes=None ):
+        """ Writes one input to the file. If numBytes is given, the first '*' or '+' line of the body
+        is repeated until at least that many bytes have been written, instead of a random number of
+        times. Returns the number of bytes written. """
+        self.numBytes = 0
+        self.numLines = 0
+        self._outputFile = outputFile
+        self._targetBytes = numBytes
+        self._classWriters = {}
+        for className, lines in self.format.classes().items():
+            self._classWriters[className] = self._compileClass( lines, className == self.format.bodyTypeName() )
+        self._classWriters[self.format.bodyTypeName()](self._chunks)
+        self._flush()
+        return self.numBytes
+
+    def _flush(self):
+        data = "".join(self._chunks)
+        del self._chunks[:]
+        self._outputFile.write(data)
+        self.numBytes += len(data)
+        self.numLines += data.count("\n")
+
+    def _compileClass( self, lines, isBody ):
+        """ Returns a function writing one random instance of the class with the given FormatLine's
+        to a list of chunks. """
+        # Int fields used as the repetition count of a later line are kept within countRange.
+        countFieldNames = set(line.repetitionAmountString() for line in lines if line.isVariableRepetition())
+        steps = []
+        sizedLine = None
+        for line in lines:
+            if line.isEmpty():
+                steps.append(lambda chunks, counts: chunks.append("\n"))
+            elif line.isRepeating():
+                isSized = ( isBody and sizedLine is None and self._targetBytes is not None and
+                    ( line.isZeroOrMoreRepetition() or line.isOneOrMoreRepetition() ) )
+                if isSized:
+                    sizedLine = line
+                steps.append(self._compileRepetition( line, isSized ))
+            elif not line.getField(0).isPrimitive():
+                steps.append(self._compileInstance(line.getField(0)))
+            else:
+                steps.append(self._compilePrimitiveLine( line, countFieldNames ))
+
+        def writeInstance(chunks):
+            counts = {}
+            for step in steps:
+                step( chunks, counts )
+        return writeInstance
+
+    def _compileInstance( self, field ):
+        classWriters = self._classWriters
+        typeName = field.typeName()
+        return lambda chunks, counts: classWriters[typeName](chunks)
+
+    def _compilePrimitiveLine( self, line, countFieldNames ):
+        delimiter = self.delimiter
+        valueFunctions = []
+        countNames = []
+        for field in line:
+            if field.name() in countFieldNames:
+                low, high = self.countRange
+                valueFunctions.append(self._integerFunction( low, high ))
+                countNames.append(( len(valueFunctions) - 1, field.name() ))
+            else:
+                valueFunctions.append(self._valueFunction(field.fieldType()))
+
+        if not countNames:
+            if len(valueFunctions) == 1:
+                valueFunction = valueFunctions[0]
+                return lambda chunks, counts: chunks.append(valueFunction() + "\n")
+            return lambda chunks, counts: chunks.append(delimiter.join([ f() for f in valueFunctions ]) + "\n")
+
+        def writeLine( chunks, counts ):
+            values = [ f() for f in valueFunctions ]
+            for index, name in countNames:
+                counts[name] = int(values[index])
+            chunks.append(delimiter.join(values) + "\n")
+        return writeLine
+
+    def _compileRepetition( self, line, isSized ):
+        field = line.getField(0)
+        if field.isPrimitive():
+            valueFunction = self._valueFunction(field.fieldType())
+            writeItem = lambda chunks: chunks.append(valueFunction() + "\n")
+        else:
+            classWriters = self._classWriters
+            typeName = field.typeName()
+            writeItem = lambda chunks: classWriters[typeName](chunks)
+        separator = "\n" if line.isSplitByNewline() else ""
+        flush = self._flush
+
+        if isSized:
+            minimum = 1 if line.isOneOrMoreRepetition() else 0
+            def writeSized( chunks, counts ):
+                numWritten = 0
+                # Bytes buffered but not yet counted in numBytes
+                pendingBytes = sum(len(chunk) for chunk in chunks)
+                while numWritten < minimum or self.numBytes + pendingBytes < self._targetBytes:
+                    start = len(chunks)
+                    flushedBytes = self.numBytes
+                    if numWritten and separator:
+                        chunks.append(separator)
+                    writeItem(chunks)
+                    numWritten += 1
+                    if self.numBytes != flushedBytes:
+                        # The instance flushed the buffer itself, so only what it wrote since is pending.
+                        start = 0
+                        pendingBytes = 0
+                    pendingBytes += sum(len(chunk) for chunk in chunks[start:])
+                    if len(chunks) >= FLUSH_CHUNKS:
+                        flush()
+                        pendingBytes = 0
+            return writeSized
+
+        if line.isZeroOrMoreRepetition():
+            low, high = self.zeroOrMoreRange
+            countFunction = self._countFunction( low, high )
+        elif line.isOneOrMoreRepetition():
+            low, high = self.oneOrMoreRange
+            countFunction = self._countFunction( max(low, 1), high )
+        elif line.isIntegerRepetition():
+            count = int(line.repetitionAmountString())
+            countFunction = lambda counts: count
+        else:
+            name = line.repetitionAmountString()
+            countFunction = lambda counts: counts[name]
+
+        def writeRepetition( chunks, counts ):
+            for index in xrange(countFunction(counts)):
+                if index and separator:
+                    chunks.append(separator)
+                writeItem(chunks)
+                if len(chunks) >= FLUSH_CHUNKS:
+                    flush()
+        return writeRepetition
+
+    def _countFunction( self, low, high ):
+        randomFloat = self.random.random
+        span = high - low + 1
+        return lambda counts: low + int(randomFloat() * span)
+
+    def _integerFunction( self, low, high ):
+        randomFloat = self.random.random
+        span = high - low + 1
+        return lambda: str(low + int(randomFloat() * span))
+
+    def _valueFunction( self, fieldType ):
+        """ Returns a function returning a random value of the type as a string. """
+        randomFloat = self.random.random
+        if fieldType.isList:
+            elementFunction = self._valueFunction(fieldType.elementType)
+            low, high = self.listRange
+            lengthFunction = self._countFunction( max(low, 1), high )
+            delimiter = self.delimiter
+            return lambda: delimiter.join([ elementFunction() for _ in xrange(lengthFunction(None)) ])
+        if fieldType.isInteger:
+            return self._integerFunction( -1000000, 1000000 )
+        if fieldType.isFloat:
+            return lambda: "%.4f" % ( randomFloat() * 2000 - 1000 )
+        if fieldType.isBool:
+            return lambda: "true" if randomFloat() < 0.5 else "false"
+        words = self.words
+        numWords = len(words)
+        return lambda: words[int(randomFloat() * numWords)]
+
+def parseSize(sizeString):
+    """ Parses a number of bytes with an optional K, M or G suffix. """
+    sizeString = sizeString.strip().upper()
+    if sizeString[-1:] in SIZE_SUFFIXES:
+        return int(float(sizeString[:-1]) * SIZE_SUFFIXES[sizeString[-1]])
+    return int(sizeString)
+
+def parseRange(rangeString):
+    """ Parses an inclusive range written as "min,max", or a single number for both. """
+    bounds = [ int(bound) for bound in rangeString.split(",") ]
+    return ( bounds[0], bounds[-1] )
+
+if __name__ == "__main__":
+    optParser = OptionParser(usage = "usage: %prog [options] format_file_name")
+    optParser.add_option( "-o", "--output", action = "store", dest = "outputName", default = "-",
+            help = "file the input is written to. Defaults to stdout." )
+    optParser.add_option( "--size", action = "store", dest = "size",
+            help = "repeats the first '*' or '+' line of the body until the input is at least this many bytes. "
+                   "Accepts a K, M or G suffix, e.g. 2G." )
+    optParser.add_option( "--seed", action = "store", type = "int", dest = "seed", default = 0,
+            help = "seed of the random values, the same seed always produces the same input" )
+    optParser.add_option( "--zero-or-more", action = "store", dest = "zeroOrMore", default = "0,8",
+            help = "range of the number of instances of '*' lines, as min,max" )
+    optParser.add_option( "--one-or-more", action = "store", dest = "oneOrMore", default = "1,8",
+            help = "range of the number of instances of '+' lines, as min,max" )
+    optParser.add_option( "--count", action = "store", dest = "count", default = "0,8",
+            help = "range of the int fields used as variable repetition counts, as min,max" )
+    optParser.add_option( "--list", action = "store", dest = "list", default = "1,8",
+            help = "range of the number of elements of list fields, as min,max" )
+    (options, args) = optParser.parse_args()
+    if len(args) != 1:
+        optParser.print_help()
+        exit(1)
+
+    parser = InstaParseFormatFileParser(args[0])
+    if parser.parseFailed():
+        parser.printFailures()
+        exit(1)
+    try:
+        formatObject = InstaParseFormat(parser.objectModel)
+    except ValueError as e:
+        stderr.write(str(e) + "\n")
+        exit(1)
+
+    synthesizer = InputSynthesizer( formatObject, options.seed, parseRange(options.zeroOrMore),
+        parseRange(options.oneOrMore), parseRange(options.count), parseRange(options.list) )
+    outputFile = stdout if options.outputName == "-" else open( options.outputName, "w" )
+    synthesizer.write( outputFile, parseSize(options.size) if options.size else None )
+    if outputFile is not stdout:
+        outputFile.close()
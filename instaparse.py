@@ -1,20 +1,35 @@
 #!/usr/bin/env python
 
+from time import time
+# Taken before anything else is imported, so that --timing can report the cost of loading the tool.
+_moduleLoadStart = time()
+
 import re
-from sys import exit
+from sys import exit, stdin, stdout, stderr, modules
+from contextlib import contextmanager
 from collections import OrderedDict
-from os.path import dirname, basename, join, splitext
+from os import getpid, makedirs, rename
+from os.path import dirname, basename, join, splitext, exists, abspath, getsize, relpath
 from optparse import OptionParser
+from glob import glob, has_magic
+from importlib import import_module
+# Modules that are slow to load and only needed by some modes (json, hashlib, threading, urllib and
+# multiprocessing) are imported where they are used, to keep the start up of the tool fast.
 
 class InstaParseFile:
     """ Simple custom file class used by code generation components. """
 
     indentString = "    "
-    commentString = "#"
 
-    def __init__( self, name ):
+    def __init__( self, name, commentString="#" ):
         self.filename = name
-        self.fileContents = ""
+        self.commentString = commentString
+        # Body chunks and import lines are buffered separately and only joined on save, since
+        # repeatedly concatenating (or prepending to) one string is quadratic in the file size.
+        self._chunks = []
+        self._importLines = []
+        # Number of bytes written so far, kept up to date so it can be read without joining
+        self.size = 0
         self.indentLevel = 0
         self.shouldIndent = True
 
@@ -25,7 +40,7 @@ class InstaParseFile:
         self.indentLevel -= 1
 
     def comment( self, line ):
-        """ Writes a comment line using the commentString variable that can be adjusted. """
+        """ Writes a comment line starting with the commentString given on construction. """
         self.writeLine(self.commentString + " " + line)
 
     def write( self, line ):
@@ -34,9 +49,10 @@ class InstaParseFile:
         It will indent only if the most recent `write` call is a `writeLine` or `writeNewline` (
         ignoring other methods in this class). """
         if self.shouldIndent:
-            self.fileContents += InstaParseFile.indentString * self.indentLevel + line
-        else:
-            self.fileContents += line
+            self._chunks.append(InstaParseFile.indentString * self.indentLevel)
+            self.size += len(InstaParseFile.indentString) * self.indentLevel
+        self._chunks.append(line)
+        self.size += len(line)
         self.shouldIndent = False
 
     def writeLine( self, line ):
@@ -44,18 +60,25 @@ class InstaParseFile:
         self.shouldIndent = True
 
     def writeImportLine( self, line ):
-        """ Helps write an import or include line at the top of the file disregarding the indent level. """
-        self.fileContents = line + "\n" + self.fileContents
+        """ Helps write an import or include line at the top of the file disregarding the indent level.
+        The most recently written import line ends up first in the file. """
+        self._importLines.append(line + "\n")
+        self.size += len(line) + 1
 
     def writeNewline(self):
         """ Helper to write a simple newline, useful for adding an empty line. """
-        self.fileContents += "\n"
+        self._chunks.append("\n")
+        self.size += 1
         self.shouldIndent = True
 
+    def contents(self):
+        """ Returns the full contents of the file written so far. """
+        return "".join(reversed(self._importLines)) + "".join(self._chunks)
+
     def save(self):
         """ Saves the InstaParseFile. Ideally, use only once per InstaParseFile at the end of code generation. """
         outputFile = open( self.filename, "w")
-        outputFile.write(self.fileContents)
+        outputFile.write(self.contents())
         outputFile.close()
 
     def setExtension( self, extensionString ):
@@ -118,12 +141,100 @@ def listType(typeName):
     else:
         return None
 
+class ImmutableObject(object):
+    """ Base class for compact objects that cannot be modified once constructed. Subclasses list their
+    attributes in __slots__ and assign them in __init__ through object.__setattr__. """
+
+    __slots__ = ()
+
+    def __setattr__( self, name, value ):
+        raise AttributeError("%s is immutable." % type(self).__name__)
+
+    def __delattr__( self, name ):
+        raise AttributeError("%s is immutable." % type(self).__name__)
+
+class FreezableObject(object):
+    """ Base class for compact objects that are built up step by step, then made immutable by `freeze`.
+    Subclasses list their attributes in __slots__ and extend `freeze` to freeze their contents. """
+
+    __slots__ = ( "_frozen", )
+
+    def freeze(self):
+        object.__setattr__( self, "_frozen", True )
+
+    def isFrozen(self):
+        return getattr( self, "_frozen", False )
+
+    def __setattr__( self, name, value ):
+        if self.isFrozen():
+            raise AttributeError("%s is immutable once frozen." % type(self).__name__)
+        object.__setattr__( self, name, value )
+
+# The characters a value of each primitive type may start with in any of the generated parsers,
+# including the whitespace some of them skip before a value. Used to look ahead at the next line.
+WHITESPACE_CHARACTERS = " \t\r\n"
+FIRST_CHARACTERS = {
+    StringConstants.INTEGER_TYPE: "0123456789+-" + WHITESPACE_CHARACTERS,
+    StringConstants.FLOAT_TYPE: "0123456789+-.iInN" + WHITESPACE_CHARACTERS,
+    StringConstants.BOOL_TYPE: "01tTfF" + WHITESPACE_CHARACTERS,
+}
+
+class TypeDescriptor(ImmutableObject):
+    """ Immutable description of a field type, resolved once from its type name so that generators
+    can read attributes instead of re-parsing the name. Use `typeDescriptor` to get the shared
+    instance for a type name rather than constructing one directly. """
+
+    __slots__ = ( "name", "isPrimitive", "isInteger", "isFloat", "isString", "isBool", "isList",
+        "elementType", "isUserClass", "firstCharacters" )
+
+    def __init__( self, typeName ):
+        setAttribute = object.__setattr__.__get__(self)
+        elementTypeName = listType(typeName)
+        setAttribute( "isList", elementTypeName is not None )
+        setAttribute( "elementType", typeDescriptor(elementTypeName) if elementTypeName is not None else None )
+        # List names are normalized so that e.g. "list( int )" and "list(int)" are the same type.
+        setAttribute( "name", "%s(%s)" % ( StringConstants.LIST_TYPE, elementTypeName ) if self.isList else typeName )
+        setAttribute( "isInteger", isInteger(typeName) )
+        setAttribute( "isFloat", isFloat(typeName) )
+        setAttribute( "isString", isString(typeName) )
+        setAttribute( "isBool", isBool(typeName) )
+        setAttribute( "isPrimitive", self.isList or self.isInteger or self.isFloat or self.isString or self.isBool )
+        setAttribute( "isUserClass", not self.isPrimitive )
+        # The characters a value of this type may start with, or None if it may start with anything
+        if self.isList:
+            setAttribute( "firstCharacters", self.elementType.firstCharacters )
+        else:
+            setAttribute( "firstCharacters", FIRST_CHARACTERS.get(typeName) )
+
+    def __str__(self):
+        return self.name
+
+_primitiveTypeDescriptors = {}
+
+def typeDescriptor( typeName, userClassTypes=None ):
+    """ Returns the shared TypeDescriptor for the type name. Primitive and list types are interned
+    for the whole process. User class types are interned in the userClassTypes dictionary if one is
+    given, which should be owned by the format declaring the classes, so that a long running process
+    does not accumulate the class names of every format it has seen. """
+    descriptor = _primitiveTypeDescriptors.get(typeName)
+    if descriptor is not None:
+        return descriptor
+    if isPrimitive(typeName):
+        return _primitiveTypeDescriptors.setdefault( typeName, TypeDescriptor(typeName) )
+    if userClassTypes is None:
+        return TypeDescriptor(typeName)
+    descriptor = userClassTypes.get(typeName)
+    if descriptor is None:
+        descriptor = userClassTypes[typeName] = TypeDescriptor(typeName)
+    return descriptor
+
 
 class RegexPatterns:
     """ Patterns used for parsing. Names are considered simple words with underscores. """
     DELIMITER = re.compile(r"^delimiter\s+\"(.+)\"\s*(#.*)?$")
     CLASS_NAME = re.compile(r"^[\w_]+$")
-    FIELD = re.compile(r"^([\w_]+):(" + StringConstants.LIST_TYPE + r"\s*\(\s*([\w_]+)\s*\)|[\w_]+)(:([\w_]+|\+|\*)(\!)?)?\s*")
+    # Not anchored with ^ so that it can be matched at any position within a line.
+    FIELD = re.compile(r"([\w_]+):(" + StringConstants.LIST_TYPE + r"\s*\(\s*([\w_]+)\s*\)|[\w_]+)(:([\w_]+|\+|\*)(\!)?)?\s*")
 
 class ParserUtil:
     @staticmethod
@@ -152,41 +263,55 @@ class ParserUtil:
     @staticmethod
     def fieldDeclarationsFromLine(line):
         fields = []
-        fieldMatchResult = RegexPatterns.FIELD.match(line)
-        while fieldMatchResult and len(fieldMatchResult.groups()) in [ 5, 6 ]:
-            regexGroups = fieldMatchResult.groups()
-            field = FieldDeclaration( regexGroups[0], regexGroups[1] )
-            field.instanceRepetitionModeString = regexGroups[-2] if regexGroups[-2] else ""
-            field.shouldSeparateInstancesByAdditionalNewline = regexGroups[-1] == StringConstants.SEPARATE_BY_ADDITIONAL_NEWLINE_MODE
-            fields.append(field)
-            line = line[fieldMatchResult.end():]
-            fieldMatchResult = RegexPatterns.FIELD.match(line)
-        if line.strip():
+        position = 0
+        # The scanner matches each field in place, continuing where the previous match ended,
+        # instead of re-slicing the rest of the line after every match.
+        nextFieldMatch = RegexPatterns.FIELD.scanner(line).match
+        fieldMatchResult = nextFieldMatch()
+        while fieldMatchResult:
+            name, typeName, _, _, modeString, separator = fieldMatchResult.groups()
+            fields.append(FieldDeclaration( name, typeName, modeString or "",
+                separator == StringConstants.SEPARATE_BY_ADDITIONAL_NEWLINE_MODE ))
+            position = fieldMatchResult.end()
+            fieldMatchResult = nextFieldMatch()
+        if position != len(line):
             # Unidentified tokens at end of line; invalidate field decls altogether.
             return []
         return fields
 
-class FieldDeclaration:
+class FieldDeclaration(ImmutableObject):
 
-    def __init__( self, name, typeName ):
-        self.name = name
-        self.typeName = typeName
-        self.instanceRepetitionModeString = ""
-        self.shouldSeparateInstancesByAdditionalNewline = False
+    __slots__ = ( "name", "typeName", "instanceRepetitionModeString", "shouldSeparateInstancesByAdditionalNewline" )
+
+    def __init__( self, name, typeName, instanceRepetitionModeString="", shouldSeparateInstancesByAdditionalNewline=False ):
+        setAttribute = object.__setattr__.__get__(self)
+        setAttribute( "name", name )
+        setAttribute( "typeName", typeName )
+        setAttribute( "instanceRepetitionModeString", instanceRepetitionModeString )
+        setAttribute( "shouldSeparateInstancesByAdditionalNewline", shouldSeparateInstancesByAdditionalNewline )
 
     def __str__(self):
         return str(( self.name, self.typeName, self.instanceRepetitionModeString,
             self.shouldSeparateInstancesByAdditionalNewline ))
 
-class ClassDeclaration:
+class ClassDeclaration(FreezableObject):
+
+    __slots__ = ( "name", "lines" )
 
     def __init__( self, name ):
         self.name = name
         self.lines = []
 
     def addFieldsAsLine( self, fields ):
+        if self.isFrozen():
+            raise AttributeError("ClassDeclaration is immutable once frozen.")
         self.lines.append(fields)
 
+    def freeze(self):
+        if not self.isFrozen():
+            self.lines = tuple(tuple(line) for line in self.lines)
+            FreezableObject.freeze(self)
+
     def __str__(self):
         result = "class " + self.name + "\n"
         for line in self.lines:
@@ -196,7 +321,9 @@ class ClassDeclaration:
             result += "\n"
         return result[:-1]
 
-class FormatFileObjectModel:
+class FormatFileObjectModel(FreezableObject):
+
+    __slots__ = ( "lineDelimiter", "commandLineOptions", "classes", "body" )
 
     def __init__(self):
         self.lineDelimiter = StringConstants.DEFAULT_SINGLE_LINE_DELIMITER
@@ -205,8 +332,18 @@ class FormatFileObjectModel:
         self.body = FieldDeclaration("body", "Body")
 
     def addClass( self, inputClass ):
+        if self.isFrozen():
+            raise AttributeError("FormatFileObjectModel is immutable once frozen.")
         self.classes.append(inputClass)
 
+    def freeze(self):
+        if not self.isFrozen():
+            for inputClass in self.classes:
+                inputClass.freeze()
+            self.classes = tuple(self.classes)
+            self.commandLineOptions = tuple(self.commandLineOptions)
+            FreezableObject.freeze(self)
+
     def __str__(self):
         result = ""
         if len(self.classes) > 0:
@@ -215,18 +352,25 @@ class FormatFileObjectModel:
 
 class InstaParseFormatFileParser:
 
-    def __init__( self, formatFileName ):
+    def __init__( self, formatFileName=None, formatInput=None ):
+        """ Parses the format file of the given name, or the format in formatInput if it is given.
+        formatInput may either be a string or a file-like object yielding lines. """
         self.tagLineMarkerIntervals = {}
         self.failureMessages = []
         self.objectModel = FormatFileObjectModel()
-        try:
-            InstaparseFile = open( formatFileName, "r" )
-            self.formatInputAsLines = [line.strip() for line in InstaparseFile.readlines()]
-            InstaparseFile.close()
-        except IOError:
-            return self.pushFailureMessage("Could not find file " + formatFileName + ".")
-            self.formatInputAsLines = []
-        self.computeTagIntervals()
+        self.formatInputAsLines = []
+        self.strippedLines = []
+        if formatInput is None:
+            try:
+                formatInput = open( formatFileName, "r" )
+            except IOError:
+                return self.pushFailureMessage("Could not find file " + formatFileName + ".")
+            self.scanLines(formatInput)
+            formatInput.close()
+        elif isinstance( formatInput, basestring ):
+            self.scanLines(formatInput.splitlines())
+        else:
+            self.scanLines(formatInput)
         if len(self.failureMessages) > 0:
             return
         if StringConstants.BODY_TAG not in self.tagLineMarkerIntervals:
@@ -243,8 +387,9 @@ class InstaParseFormatFileParser:
             return
         headTagBeginMarker, headTagEndMarker = self.tagLineMarkerIntervals[StringConstants.HEAD_TAG]
         for lineMarker in xrange( headTagBeginMarker + 1, headTagEndMarker ):
+            # The delimiter itself may contain the comment character, so only skip whole line comments.
             currentStrippedLine = self.formatInputAsLines[lineMarker]
-            if not currentStrippedLine:
+            if not self.strippedLines[lineMarker]:
                 continue
             delimiterMatchResults = RegexPatterns.DELIMITER.match(currentStrippedLine)
             if delimiterMatchResults is None:
@@ -257,7 +402,7 @@ class InstaParseFormatFileParser:
         lineMarker, singleTagEndMarker = self.tagLineMarkerIntervals[StringConstants.OBJECTS_TAG]
         while lineMarker < singleTagEndMarker - 1:
             lineMarker += 1
-            currentStrippedLine = ParserUtil.stripCommentsAndWhitespaceFromLine(self.formatInputAsLines[lineMarker])
+            currentStrippedLine = self.strippedLines[lineMarker]
             if not currentStrippedLine:
                 continue
             if not RegexPatterns.CLASS_NAME.match(currentStrippedLine):
@@ -266,7 +411,7 @@ class InstaParseFormatFileParser:
             classDeclLineMarker = lineMarker
             while lineMarker < singleTagEndMarker - 1:
                 lineMarker += 1
-                currentStrippedLine = ParserUtil.stripCommentsAndWhitespaceFromLine(self.formatInputAsLines[lineMarker])
+                currentStrippedLine = self.strippedLines[lineMarker]
                 if not currentStrippedLine:
                     classDecl.addFieldsAsLine([])
                     continue
@@ -286,7 +431,7 @@ class InstaParseFormatFileParser:
         hasBegunParsingFields = False
         body = ClassDeclaration("Body")
         for lineMarker in xrange( bodyTagBeginMarker + 1, bodyTagEndMarker ):
-            currentStrippedLine = ParserUtil.stripCommentsAndWhitespaceFromLine(self.formatInputAsLines[lineMarker])
+            currentStrippedLine = self.strippedLines[lineMarker]
             if not currentStrippedLine:
                 if hasBegunParsingFields:
                     body.addFieldsAsLine(list())
@@ -317,127 +462,167 @@ class InstaParseFormatFileParser:
     def parseFailed(self):
         return len(self.failureMessages) > 0
 
-    def nextTagLocationFromLineMarker( self, marker ):
-        while marker < len(self.formatInputAsLines):
-            currentStrippedLine = ParserUtil.stripCommentsAndWhitespaceFromLine(self.formatInputAsLines[marker])
-            if ParserUtil.lineStartsValidTag(currentStrippedLine):
-                return marker
-            marker += 1
-        return len(self.formatInputAsLines)
-
-    def firstLineMarkerWithText(self):
-        marker = 0
-        for line in self.formatInputAsLines:
-            if ParserUtil.stripCommentsAndWhitespaceFromLine(line):
-                return marker
-            marker += 1
-        return -1
-
-    def computeTagIntervals(self):
-        lineMarkerBegin = self.firstLineMarkerWithText()
-        if lineMarkerBegin >= len(self.formatInputAsLines):
-            return self.pushFailureMessage( "Input file empty or commented out." )
-        if not ParserUtil.lineStartsValidTag(self.formatInputAsLines[lineMarkerBegin]):
-            return self.pushFailureMessage( "Found an invalid tag declaration.", lineMarkerBegin )
+    def scanLines( self, lines ):
+        """ Reads the format in a single pass, stripping whitespace and comments from every line once
+        and computing the line interval covered by each tag along the way. """
         lastTagName = None
-        while lineMarkerBegin < len(self.formatInputAsLines):
-            tagName = self.formatInputAsLines[lineMarkerBegin]
-            if tagName in self.tagLineMarkerIntervals:
-                return self.pushFailureMessage( "Duplicate tag name.", self.tagLineMarkerIntervals[tagName][0], lineMarkerBegin )
-            lineMarkerEnd = self.nextTagLocationFromLineMarker(lineMarkerBegin + 1)
-            lastTagName = self.formatInputAsLines[lineMarkerBegin]
-            self.tagLineMarkerIntervals[lastTagName] = ( lineMarkerBegin, lineMarkerEnd )
-            lineMarkerBegin = lineMarkerEnd
-        if lastTagName:
-            for lineMarker in xrange( len(self.formatInputAsLines) - 1, 0, -1 ):
-                if ParserUtil.stripCommentsAndWhitespaceFromLine(self.formatInputAsLines[lineMarker]):
-                    lineMarkerBegin, _ = self.tagLineMarkerIntervals[lastTagName]
-                    self.tagLineMarkerIntervals[lastTagName] = lineMarkerBegin, lineMarker + 1
-                    break
+        lastLineMarkerWithText = -1
+        for lineMarker, line in enumerate(lines):
+            line = line.strip()
+            strippedLine = ParserUtil.stripCommentsAndWhitespaceFromLine(line)
+            self.formatInputAsLines.append(line)
+            self.strippedLines.append(strippedLine)
+            if not strippedLine:
+                continue
+            lastLineMarkerWithText = lineMarker
+            if ParserUtil.lineStartsValidTag(strippedLine):
+                if strippedLine in self.tagLineMarkerIntervals:
+                    return self.pushFailureMessage( "Duplicate tag name.", self.tagLineMarkerIntervals[strippedLine][0], lineMarker )
+                if lastTagName:
+                    self.tagLineMarkerIntervals[lastTagName] = ( self.tagLineMarkerIntervals[lastTagName][0], lineMarker )
+                self.tagLineMarkerIntervals[strippedLine] = ( lineMarker, lineMarker + 1 )
+                lastTagName = strippedLine
+            elif lastTagName is None:
+                return self.pushFailureMessage( "Found an invalid tag declaration.", lineMarker )
+        if lastTagName is None:
+            return self.pushFailureMessage( "Input file empty or commented out." )
+        # The last tag extends up to its last line with text.
+        self.tagLineMarkerIntervals[lastTagName] = ( self.tagLineMarkerIntervals[lastTagName][0], lastLineMarkerWithText + 1 )
+
+class InstaParseFormat(ImmutableObject):
+    """ The validated format, built from a FormatFileObjectModel. The object model is frozen on
+    construction, and neither it nor this format may be modified afterwards, so one format can be
+    shared by any number of code generators. """
 
+    __slots__ = ( "_model", "_userClasses", "_userClassNames", "_classes", "_bodyTypeName", "_lookaheads",
+        "_blankLineClasses" )
 
-class InstaParseFormat:
     def __init__( self, objectModel ):
-        self._model = objectModel
-        self._userClasses = OrderedDict()
+        setAttribute = object.__setattr__.__get__(self)
+        objectModel.freeze()
+        userClasses = OrderedDict()
         # The class names are stored twice because we want to perserve the ordering of the classes
-        self._userClassNames = list()
+        userClassNames = list()
         # Make sure the user defined classes are of the correct format, else raise error.
-        for c in self._model.classes:
-            _assertValidName( c.name, self._userClasses )
-            _assertValidClass( c, self._userClasses )
-            self._userClasses[c.name] = c
-            self._userClassNames.append(c.name)
-        self._classes = OrderedDict()
-        for className in self._userClasses:
-            self._classes[className] = _generateFormatLines( className, self._userClasses )
-        self._bodyTypeName = self._model.body.typeName
+        for c in objectModel.classes:
+            _assertValidName( c.name, userClasses )
+            _assertValidClass( c, userClasses )
+            userClasses[c.name] = c
+            userClassNames.append(c.name)
+        classes = OrderedDict()
+        # Type descriptors of the user classes, shared by all the fields of this format.
+        userClassTypes = {}
+        # What the first line of each class looks like, see `lookahead`
+        lookaheads = {}
+        # Whether an instance of each class may span a blank line, see `mayContainBlankLine`
+        blankLineClasses = {}
+        for className in userClasses:
+            classes[className] = _generateFormatLines( className, userClasses, userClassTypes )
+            lookaheads[className] = _classLookahead( classes[className], lookaheads )
+            blankLineClasses[className] = _classMayContainBlankLine( classes[className], blankLineClasses )
+        setAttribute( "_model", objectModel )
+        setAttribute( "_userClasses", userClasses )
+        setAttribute( "_userClassNames", tuple(userClassNames) )
+        setAttribute( "_classes", classes )
+        setAttribute( "_bodyTypeName", objectModel.body.typeName )
+        setAttribute( "_lookaheads", lookaheads )
+        setAttribute( "_blankLineClasses", blankLineClasses )
 
     def lineDelimiter(self):
         return self._model.lineDelimiter
 
     def classes(self):
-        """ Return a ordered dictionary with class names as keys and the corresponding list of
-        FormatLine's (containing the fields on that line) as values. """
+        """ Return a ordered dictionary with class names as keys and the corresponding tuple of
+        FormatLine's (containing the fields on that line) as values. It must not be modified. """
         return self._classes
 
     def bodyTypeName(self):
         return self._bodyTypeName
 
-class FormatField:
-    def __init__( self, field, userClasses, parent=None ):
-        self._field = field
-        self._userClasses = userClasses
-        self._parent = parent
+    def isFlatClass( self, className ):
+        """ Returns whether every field of the class is a single primitive value, so that its
+        instances can be stored as one column per field. """
+        fields = [ field for line in self._classes[className] for field in line ]
+        return len(fields) > 0 and all( field.isPrimitive() and not field.isList() and not field.isRepeating()
+            for field in fields )
+
+    def mayContainBlankLine( self, className ):
+        """ Returns whether an instance of the class may span a line that is empty but for whitespace,
+        such as an empty line of the class, a string alone on a line or a repetition split by empty
+        lines. """
+        return self._blankLineClasses[className]
+
+    def lookahead( self, field ):
+        """ Returns the LineLookahead that the next line must match for an instance of the field to be
+        parsed from it, or None if an instance could start with any line, or no line at all. """
+        if field.isPrimitive():
+            return LineLookahead( firstCharacters=field.fieldType().firstCharacters )
+        return self._lookaheads[field.typeName()]
+
+class FormatField(ImmutableObject):
+
+    __slots__ = ( "_field", "_parent", "_type", "_repetitionMode" )
+
+    def __init__( self, field, userClasses, parent=None, userClassTypes=None ):
+        setAttribute = object.__setattr__.__get__(self)
         # Verify this field has a valid type
         _assertValidType( field.typeName, userClasses )
+        setAttribute( "_field", field )
+        setAttribute( "_parent", parent )
+        setAttribute( "_type", typeDescriptor( field.typeName, userClassTypes ) )
+        mode = field.instanceRepetitionModeString
+        try:
+            mode = int(mode)
+        except ValueError as e:
+            pass
+        setAttribute( "_repetitionMode", mode )
 
 
     def name(self):
         return self._field.name
 
     def typeName(self):
-        return self._field.typeName
+        return self._type.name
+
+    def fieldType(self):
+        """ The TypeDescriptor of this field. """
+        return self._type
 
     def parent(self):
         """ The parent of this object """
         return self._parent
 
     def isRepeating(self):
-        return self._instanceRepetitionModeString() != ""
+        return self._repetitionMode != ""
 
     def _instanceRepetitionModeString(self):
-        mode = self._field.instanceRepetitionModeString
-        try:
-            return int(mode)
-        except ValueError as e:
-            return mode
+        return self._repetitionMode
 
     def _shouldSeparateInstancesByAdditionalNewline(self):
         return self._field.shouldSeparateInstancesByAdditionalNewline
 
 
     def isPrimitive(self):
-        return isPrimitive(self._field.typeName)
+        return self._type.isPrimitive
 
     def isInteger(self):
-        return isInteger(self._field.typeName)
+        return self._type.isInteger
 
     def isFloat(self):
-        return isFloat(self._field.typeName)
+        return self._type.isFloat
 
     def isString(self):
-        return isString(self._field.typeName)
+        return self._type.isString
 
     def isBool(self):
-        return isBool(self._field.typeName)
+        return self._type.isBool
 
     def isList(self):
-        return isList(self._field.typeName)
+        return self._type.isList
 
     def listType(self):
-        if self.isList():
-            return listType(self._field.typeName)
+        if self._type.isList:
+            return self._type.elementType.name
         else:
             return None
 
@@ -450,18 +635,21 @@ class FormatField:
                 s += "!"
         return s
 
-class FormatLine:
+class FormatLine(ImmutableObject):
     """ Representing a line in a class declaration or body of the format file.
     May contains zero or more fields. """
+
+    __slots__ = ( "_fields", "_container", "_repetitionString", "_isSplitByNewline" )
+
     def __init__( self, fields, container=None ):
-        self._fields = fields
+        setAttribute = object.__setattr__.__get__(self)
+        setAttribute( "_fields", tuple(fields) )
         # container is the FormatField object representing the class field that contains this line
-        self._container = container
-        self._currentIndex = 0
+        setAttribute( "_container", container )
         # Repetition string only makes sense when a line has exactly one field
-        self._repetitionString = fields[0]._instanceRepetitionModeString() if len(fields) == 1 else ""
-        self._isSplitByNewline = fields[0]._shouldSeparateInstancesByAdditionalNewline() if \
-            len(fields) == 1 else ""
+        setAttribute( "_repetitionString", fields[0]._instanceRepetitionModeString() if len(fields) == 1 else "" )
+        setAttribute( "_isSplitByNewline", fields[0]._shouldSeparateInstancesByAdditionalNewline() if \
+            len(fields) == 1 else "" )
 
     def container(self):
         return self._container
@@ -488,12 +676,8 @@ class FormatLine:
         return self._repetitionString == StringConstants.LINE_ONE_OR_MORE
 
     def isIntegerRepetition(self):
-        try:
-            int(self._repetitionString)
-            return True
-        except ValueError as e:
-            # Failed to cast to int, it's not int
-            return False
+        # The repetition mode of a field has already been converted to an int if it is one.
+        return type(self._repetitionString) == int
 
     def isVariableRepetition(self):
         return ( not self.isZeroOrMoreRepetition() and
@@ -504,16 +688,7 @@ class FormatLine:
         return self._isSplitByNewline
 
     def __iter__(self):
-        return self
-
-    def next(self):
-        if self._currentIndex < len(self._fields):
-            self._currentIndex += 1
-            return self._fields[self._currentIndex - 1]
-        else:
-            # Reset the counter so we can use this in more than one for loop
-            self._currentIndex = 0
-            raise StopIteration
+        return iter(self._fields)
 
     def __str__(self):
         s = ""
@@ -521,7 +696,60 @@ class FormatLine:
             s += str(f) + " "
         return s
 
-def _generateFormatLines( className, userClasses ):
+class LineLookahead(ImmutableObject):
+    """ A test on the next line of the input that must pass for a value to be parsed from it. It is
+    only a necessary condition, e.g. a line of digits passes the test for an int but may still be out
+    of range, so generated parsers use it to avoid attempting a parse that would certainly fail. """
+
+    __slots__ = ( "isBlank", "numFields", "hasList", "firstCharacters" )
+
+    def __init__( self, isBlank=False, numFields=None, hasList=False, firstCharacters=None ):
+        setAttribute = object.__setattr__.__get__(self)
+        # Whether the line must be empty but for whitespace
+        setAttribute( "isBlank", isBlank )
+        # The number of fields the line is split into by the delimiter, or None if the whole line is a
+        # single field. The line may have more fields if hasList is set.
+        setAttribute( "numFields", numFields )
+        setAttribute( "hasList", hasList )
+        # The characters the line may start with, or None if it may start with anything
+        setAttribute( "firstCharacters", firstCharacters )
+
+def _classLookahead( lines, lookaheads ):
+    """ Returns the LineLookahead of the first line of a class from its FormatLine's, given those of the
+    classes declared before it. """
+    if not lines:
+        return None
+    line = lines[0]
+    if line.isEmpty():
+        return LineLookahead( isBlank=True, firstCharacters=WHITESPACE_CHARACTERS )
+    field = line.getField(0)
+    # A repetition that may have no instances does not say anything about the first line.
+    if line.isRepeating() and not line.isOneOrMoreRepetition() and \
+            not ( line.isIntegerRepetition() and int(line.repetitionAmountString()) > 0 ):
+        return None
+    if not field.isPrimitive():
+        return lookaheads[field.typeName()]
+    if line.numFields() == 1:
+        return LineLookahead( firstCharacters=field.fieldType().firstCharacters )
+    return LineLookahead( numFields=line.numFields(), hasList=line.getField(-1).isList(),
+        firstCharacters=field.fieldType().firstCharacters )
+
+def _classMayContainBlankLine( lines, blankLineClasses ):
+    """ Returns whether an instance of a class may span a blank line from its FormatLine's, given the
+    result for the classes declared before it. """
+    for line in lines:
+        if line.isEmpty() or ( line.isRepeating() and line.isSplitByNewline() ):
+            return True
+        field = line.getField(0)
+        if line.numFields() == 1 and field.isPrimitive() and \
+                ( field.isString() or field.listType() == StringConstants.STRING_TYPE ):
+            return True
+        for field in line:
+            if not field.isPrimitive() and blankLineClasses[field.typeName()]:
+                return True
+    return False
+
+def _generateFormatLines( className, userClasses, userClassTypes=None ):
     """ Return a list of FormatLine, where each FormatLine contains the fields of the given class. """
     lines = []
     variables = dict()
@@ -529,7 +757,7 @@ def _generateFormatLines( className, userClasses ):
         fields = []
         for var in line:
             _assertValidName( var.name, variables.keys() + userClasses.keys() )
-            obj = FormatField( var, userClasses )
+            obj = FormatField( var, userClasses, userClassTypes=userClassTypes )
             variables[var.name] = obj
             fields.append(obj)
             # Make sure if the variable has a instance repetition mode, it is either an
@@ -544,7 +772,7 @@ def _generateFormatLines( className, userClasses ):
                 raise ValueError("Unknown repetition mode '%s': it must be either an integer, " + \
                     "the symbol '+' or '*', or an int variable already defined in class." % mode)
         lines.append(FormatLine( fields ))
-    return lines
+    return tuple(lines)
 
 
 def _assertValidName( name, usedNames ):
@@ -608,6 +836,9 @@ class CodeGenerator:
     UTIL_FILE_NAME = PARSER_NAME + "Util"
     DATA_FILE_NAME = PARSER_NAME + "Data"
 
+    # Starts a single line comment in the generated language
+    COMMENT_STRING = "#"
+
     # Used variable names
     USER_ARGS = "userArgs"
     PARSED_OBJ = "parsedObject"
@@ -623,17 +854,52 @@ class CodeGenerator:
     PARSE_FLOAT_LIST = "parseFloatList"
     PARSE_NEWLINE = "parseNewline"
     PARSE_INPUT = "parse"
-
-    def __init__( self, filename, format ):
+    ITERPARSE_INPUT = "iterparse"
+    PARALLEL_PARSE_INPUT = "parallelparse"
+    # Default size in bytes of the chunks of the input parsed concurrently by parallelparse
+    PARALLEL_CHUNK_SIZE = 1 << 22
+
+    # Options changing the generated parser that this generator supports, mapped to their descriptions
+    OPTIONS = {
+        "columnar": "stores repetitions of classes holding only single primitive values, such as "
+                    "'points:Point:*', as one array per field in a class named after the repeated class "
+                    "followed by 'Columns'.",
+    }
+    # Suffix of the name of the class storing the columns of a class, with the columnar option
+    COLUMNS_SUFFIX = "Columns"
+
+    def __init__( self, filename, format, timer=None, options=() ):
         self.foldername = dirname(filename)
         self.filename = basename(filename)
-        self.main = InstaParseFile(filename)
-        self.util = InstaParseFile(join(self.foldername, CodeGenerator.UTIL_FILE_NAME))
-        self.data = InstaParseFile(join(self.foldername, CodeGenerator.DATA_FILE_NAME))
+        self.main = self.newFile(filename)
+        self.util = self.newFile(join(self.foldername, CodeGenerator.UTIL_FILE_NAME))
+        self.data = self.newFile(join(self.foldername, CodeGenerator.DATA_FILE_NAME))
         self.format = format
         self.classes = format.classes()
         self.bodyTypeName = format.bodyTypeName()
         self.currentFile = None
+        # Optional PhaseTimer recording the time taken and bytes written by each generated class,
+        # class parser function and saved file
+        self.timer = timer
+        for option in options:
+            if option not in self.OPTIONS:
+                raise ValueError("Option '%s' not supported by %s. Supported options: %s." % \
+                    ( option, self.__class__.__name__, ", ".join(sorted(self.OPTIONS)) or "none" ))
+        self.options = frozenset(options)
+        # Classes whose repetitions are stored as columns, see `isColumnar`
+        self.columnarClassNames = set()
+        if "columnar" in self.options:
+            for lines in self.classes.values():
+                for line in lines:
+                    for field in line:
+                        if field.isRepeating() and not field.isPrimitive() and format.isFlatClass(field.typeName()):
+                            self.columnarClassNames.add(field.typeName())
+            for className in self.columnarClassNames:
+                if className + CodeGenerator.COLUMNS_SUFFIX in self.classes:
+                    raise ValueError("The columns of \"%s\" cannot be stored in \"%s\", a class of that name already exists." % \
+                        ( className, className + CodeGenerator.COLUMNS_SUFFIX ))
+        # Found once as every class would otherwise look for it, see `parallelBodyLine`
+        self._parallelLine = self._findParallelBodyLine()
         self.typeNameToParseFuncName = {
             StringConstants.INTEGER_TYPE: CodeGenerator.PARSE_INT,
             StringConstants.FLOAT_TYPE: CodeGenerator.PARSE_FLOAT,
@@ -650,14 +916,53 @@ class CodeGenerator:
         """ Perform additional initialization if required. """
         pass
 
+    def newFile( self, filename ):
+        """ Creates an InstaParseFile for output in this generator's language. All generator state
+        lives on the instance, so any number of generators may run concurrently, even on the same
+        InstaParseFormat. """
+        return InstaParseFile( filename, self.COMMENT_STRING )
+
     def codeGen(self):
         """ This method is called to generate and write the parser to the specified file. """
+        self.generateFiles()
+        self.saveFiles()
+
+    def saveFiles(self):
+        """ Writes every output file to disk. """
+        for outputFile in self.outputFiles():
+            if self.timer is None:
+                outputFile.save()
+                continue
+            start = time()
+            outputFile.save()
+            self.timer.call( "save", basename(outputFile.filename), time() - start, outputFile.size )
+
+    def profiledCall( self, phase, name, method, *args ):
+        """ Calls the method with the given arguments, recording the time taken and the bytes it wrote
+        as a call of the phase if this generator has a timer. The bytes are counted in the current
+        file, plus all of the new current file if the method switched to another one. """
+        if self.timer is None:
+            return method(*args)
+        startFile = self.currentFile
+        startSize = startFile.size if startFile is not None else 0
+        start = time()
+        result = method(*args)
+        seconds = time() - start
+        numBytes = startFile.size - startSize if startFile is not None else 0
+        if self.currentFile is not startFile and self.currentFile is not None:
+            numBytes += self.currentFile.size
+        self.timer.call( phase, name, seconds, numBytes )
+        return result
+
+    def generateFiles(self):
+        """ Generates the contents of every output file in memory without writing anything to disk. """
         self.generateDataFile()
         self.generateUtilFile()
         self.generateMainFile()
-        self.main.save()
-        self.util.save()
-        self.data.save()
+
+    def outputFiles(self):
+        """ Returns the list of InstaParseFile's produced by this generator. """
+        return [ self.main, self.util, self.data ]
 
     ################################################################################
     # Generate Data File
@@ -680,7 +985,9 @@ class CodeGenerator:
             for line in lines:
                 for field in line:
                     fields.append(field)
-            self.generateClass( className, fields )
+            self.profiledCall( "generateClass", className, self.generateClass, className, fields )
+            if className in self.columnarClassNames:
+                self.profiledCall( "generateColumnsClass", className, self.generateColumnsClass, className, fields )
             #The name for the parseing function for class X is parseX
             self.typeNameToParseFuncName[className] = "parse%s" % className
 
@@ -691,6 +998,17 @@ class CodeGenerator:
         print "classGen"
         raise NotImplementedError()
 
+    def isColumnar( self, field ):
+        """ Returns whether the repetitions of the field are stored as columns, with the columnar option. """
+        return field.isRepeating() and field.typeName() in self.columnarClassNames
+
+    def generateColumnsClass( self, className, fields ):
+        """ Helper function for generating the class storing the instances of a class as one column
+        per field, named after the class followed by COLUMNS_SUFFIX. Instances are added to it with
+        the same method as to the list the repetition is stored in otherwise. Only called with the
+        columnar option, for classes with only single primitive fields. """
+        raise NotImplementedError()
+
     ################################################################################
     # Generate Util File
     ################################################################################
@@ -711,15 +1029,52 @@ class CodeGenerator:
         raise NotImplementedError()
 
     def generateClassParserFunctions(self):
-        """ For generating all the functions for parsing user defined classes. """
+        """ For generating all the functions for parsing user defined classes, and the function for
+        streaming the body if it has a repeated line. """
         for className, lines in self.classes.items():
-            self.generateClassParserFunction( className, lines )
-
-    def generateClassParserFunction( self, className, lines ):
+            self.profiledCall( "generateClassParserFunction", className, self.generateClassParserFunction, className, lines )
+        streamedLine = self.streamedBodyLine()
+        if streamedLine is not None:
+            self.profiledCall( "generateClassParserFunction", "iterparse" + self.bodyTypeName,
+                self.generateClassParserFunction, self.bodyTypeName, self.classes[self.bodyTypeName], streamedLine )
+        parallelLine = self.parallelBodyLine()
+        if parallelLine is not None:
+            self.profiledCall( "generateClassParserFunction", "parallelparse" + self.bodyTypeName,
+                self.generateClassParserFunction, self.bodyTypeName, self.classes[self.bodyTypeName], None, parallelLine )
+
+    def generateClassParserFunction( self, className, lines, streamedLine=None, parallelLine=None ):
         """ For generating a helper functions for parsing a user defined class. The first argument
-        is the class name and the second argument is a list of FormatLine's. """
+        is the class name and the second argument is a list of FormatLine's. If streamedLine, one of
+        the lines, is given, the function for streaming the class is generated instead, which hands
+        the instances of that line's field to the caller as they are parsed rather than storing them.
+        If parallelLine is given instead, the function for parsing the class in parallel is generated,
+        which splits the input holding the instances of that line into chunks at empty lines and parses
+        the chunks concurrently. """
         raise NotImplementedError
 
+    def streamedBodyLine(self):
+        """ Returns the first repeated line of the body, whose instances are streamed by iterparse,
+        or None if the body has no repeated line. """
+        for line in self.classes[self.bodyTypeName]:
+            if line.isRepeating():
+                return line
+        return None
+
+    def parallelBodyLine(self):
+        """ Returns the first line of the body repeating a class with '*!' or '+!' whose instances
+        cannot span an empty line, so that the input can be split into chunks at any empty line and
+        the chunks parsed in parallel by parallelparse, or None if the body has no such line. """
+        return self._parallelLine
+
+    def _findParallelBodyLine(self):
+        for line in self.classes[self.bodyTypeName]:
+            if line.isRepeating() and line.isSplitByNewline() and \
+                    ( line.isZeroOrMoreRepetition() or line.isOneOrMoreRepetition() ) and \
+                    not line.getField(0).isPrimitive() and \
+                    not self.format.mayContainBlankLine(line.getField(0).typeName()):
+                return line
+        return None
+
     ################################################################################
     # Generate Main File
     ################################################################################
@@ -744,1633 +1099,433 @@ class CodeGenerator:
         raise NotImplementedError()
 
 
-def javagenStaticHelpers():
-    helpers = """
-public static int javagenParseInt(String s, int[] lineNumber)
-{
-\ttry
-\t{
-\t\treturn Integer.parseInt(s);
-\t}
-\tcatch (NumberFormatException e)
-\t{
-\t\tthrow new NumberFormatException(
-\t\t\t"Parser Error on line " + lineNumber[0] + ": Could not parse \\"" + s + "\\" as int.");
-\t}
-}
-
-public static boolean javagenParseBool(String s, int[] lineNumber)
-{
-\tif (s.equals("1") || s.toLowerCase().equals("true"))
-\t{
-\t\treturn true;
-\t}
-\telse if (s.equals("0") || s.toLowerCase().equals("false"))
-\t{
-\t\treturn false;
-\t}
-\tthrow new NumberFormatException(
-\t\t"Parser Error on line " + lineNumber[0] + ": Could not parse \\"" + s + "\\" as bool.");
-}
-
-public static String javagenParseString(String s, int[] lineNumber)
-{
-\treturn s;
-}
-
-public static float javagenParseFloat(String s, int[] lineNumber)
-{
-\ttry
-\t{
-\t\treturn Float.parseFloat(s);
-\t}
-\tcatch (NumberFormatException e)
-\t{
-\t\tthrow new NumberFormatException(
-\t\t\t"Parser Error on line " + lineNumber[0] + ": Could not parse \\"" + s + "\\" as float.");
-\t}
-}
-
-public static ArrayList<Integer> javagenParseIntList(String[] strings, int[] lineNumber)
-{
-\tif (strings.length == 0)
-\t\tthrow new NumberFormatException(
-\t\t\t"Parser Error on line " + lineNumber[0] + ": Could not parse empty string as list.");
-\tArrayList<Integer> resval = new ArrayList<Integer>();
-\tfor (String s : strings)
-\t\tresval.add(javagenParseInt(s, lineNumber));
-\treturn resval;
-}
-
-public static ArrayList<Boolean> javagenParseBoolList(String[] strings, int[] lineNumber)
-{
-\tif (strings.length == 0)
-\t\tthrow new NumberFormatException(
-\t\t\t"Parser Error on line " + lineNumber[0] + ": Could not parse empty string as list.");
-\tArrayList<Boolean> resval = new ArrayList<Boolean>();
-\tfor (String s : strings)
-\t\tresval.add(javagenParseBool(s, lineNumber));
-\treturn resval;
-}
+class PhaseTimer:
+    """ Accumulates the wall time spent and bytes produced in named phases, in the order the phases
+    first ran. Individual calls within a phase, such as generating one class, are recorded
+    separately with `call` and are not added to the phase totals. """
 
-public static ArrayList<String> javagenParseStringList(String[] strings, int[] lineNumber)
-{
-\tif (strings.length == 0)
-\t\tthrow new NumberFormatException(
-\t\t\t"Parser Error on line " + lineNumber[0] + ": Could not parse empty string as list.");
-\tArrayList<String> resval = new ArrayList<String>();
-\tfor (String s : strings)
-\t\tresval.add(javagenParseString(s, lineNumber));
-\treturn resval;
-}
+    def __init__(self):
+        self.phases = OrderedDict()
+        self.phaseBytes = {}
+        self.calls = []
+
+    def add( self, name, seconds, numBytes=0 ):
+        self.phases[name] = self.phases.get( name, 0.0 ) + seconds
+        self.phaseBytes[name] = self.phaseBytes.get( name, 0 ) + numBytes
+
+    def call( self, phase, name, seconds, numBytes=0 ):
+        """ Records one call within a phase, e.g. the generateClass call for a single class. """
+        self.calls.append(( phase, name, seconds, numBytes ))
+
+    @contextmanager
+    def phase( self, name ):
+        """ Times the body of a with statement as part of the named phase. """
+        start = time()
+        try:
+            yield
+        finally:
+            self.add( name, time() - start )
+
+    def report(self):
+        """ Returns a human readable summary: the phase totals, followed by the number of calls, time
+        and bytes of each kind of call. """
+        lines = [ "%-10s %9.2f ms %10d bytes" % ( name, seconds * 1000, self.phaseBytes[name] )
+                  for name, seconds in self.phases.items() ]
+        lines.append("%-10s %9.2f ms" % ( "total", sum(self.phases.values()) * 1000 ))
+        callTotals = OrderedDict()
+        for phase, name, seconds, numBytes in self.calls:
+            count, totalSeconds, totalBytes = callTotals.get( phase, ( 0, 0.0, 0 ) )
+            callTotals[phase] = ( count + 1, totalSeconds + seconds, totalBytes + numBytes )
+        for phase, ( count, seconds, numBytes ) in callTotals.items():
+            lines.append("%-27s x%-5d %9.2f ms %10d bytes" % ( phase, count, seconds * 1000, numBytes ))
+        return "\n".join(lines)
+
+    def asDict(self):
+        """ Returns the phases and calls as a dictionary that can be serialized as JSON. Times are in
+        milliseconds. """
+        return {
+            "phases": [ { "name": name, "ms": seconds * 1000, "bytes": self.phaseBytes[name] }
+                        for name, seconds in self.phases.items() ],
+            "calls": [ { "phase": phase, "name": name, "ms": seconds * 1000, "bytes": numBytes }
+                       for phase, name, seconds, numBytes in self.calls ],
+            "totalMs": sum(self.phases.values()) * 1000,
+        }
 
-public static ArrayList<Float> javagenParseFloatList(String[] strings, int[] lineNumber)
-{
-\tif (strings.length == 0)
-\t\tthrow new NumberFormatException(
-\t\t\t"Parser Error on line " + lineNumber[0] + ": Could not parse empty string as list.");
-\tArrayList<Float> resval = new ArrayList<Float>();
-\tfor (String s : strings)
-\t\tresval.add(javagenParseFloat(s, lineNumber));
-\treturn resval;
-}
 
-public static String readLine(RandomAccessFile f, String className)
-{
-\ttry
-\t{
-\t\tString result = f.readLine();
-\t\tif (result == null) throw new RuntimeException("Parser Error: Reached end of file while parsing object \\"" + className + "\\".");
-\t\treturn result;
-\t}
-\tcatch (IOException e)
-\t{
-\t\tthrow new RuntimeException("IO Error: Unknown problem when reading input file.");
-\t}
+# The module and class of the code generator for each language. Generators are only imported when
+# their language is first requested, see `generatorClass`.
+LANGUAGE_GENERATORS = {
+    "python": ( "generators.pygen", "PythonGenerator" ),
+    "java": ( "generators.javagen", "JavaGenerator" ),
+    "c++": ( "generators.cppgen", "CPPGenerator" ),
 }
 
-public static void seek(RandomAccessFile f, long pos)
-{
-\ttry
-\t{
-\t\tf.seek(pos);
-\t}
-\tcatch (IOException e)
-\t{
-\t\tthrow new RuntimeException("IO Error: Unknown problem when reading input file.");
-\t}
-}
+def generatorClass(language):
+    """ Returns the CodeGenerator subclass for the language, importing it if necessary. """
+    moduleName, className = LANGUAGE_GENERATORS[language]
+    return getattr( import_module(moduleName), className )
 
-public static long getFilePointer(RandomAccessFile f)
-{
-\ttry
-\t{
-\t\treturn f.getFilePointer();
-\t}
-\tcatch (IOException e)
-\t{
-\t\tthrow new RuntimeException("IO Error: Unknown problem when reading input file.");
-\t}
+# Subdirectory of the output directory each language is written to when generating several at once
+LANGUAGE_DIRECTORIES = {
+    "python": "python",
+    "java": "java",
+    "c++": "cpp",
 }
-"""
-
-    helpers = helpers.replace("javagenParseIntList", CodeGenerator.PARSE_INT_LIST)
-    helpers = helpers.replace("javagenParseBoolList", CodeGenerator.PARSE_BOOL_LIST)
-    helpers = helpers.replace("javagenParseStringList", CodeGenerator.PARSE_STRING_LIST)
-    helpers = helpers.replace("javagenParseFloatList", CodeGenerator.PARSE_FLOAT_LIST)
-    helpers = helpers.replace("javagenParseInt", CodeGenerator.PARSE_INT)
-    helpers = helpers.replace("javagenParseBool", CodeGenerator.PARSE_BOOL)
-    helpers = helpers.replace("javagenParseString", CodeGenerator.PARSE_STRING)
-    helpers = helpers.replace("javagenParseFloat", CodeGenerator.PARSE_FLOAT)
-
-    # Replace the tabs with the appropriate amount of indent spaces
-    helpers = helpers.replace( "\t", InstaParseFile.indentString )
-
-    return helpers
-
-
-
-""" Class for generating Java code. """
-class JavaGenerator(CodeGenerator):
-
-    def initialize(self):
-        """ Perform additional initialization if required. """
-        InstaParseFile.commentString = "//"
-        self.main.setExtension("java")
-        self.util.setExtension("java")
-        self.classFiles = []
-
-    def codeGen(self):
-        """ This method is called to generate and write the parser to the specified file. """
-        self.generateClasses()
-        self.generateUtilFile()
-        self.generateMainFile()
-        self.main.save()
-        self.util.save()
-        map(lambda c: c.save(), self.classFiles)
-
-    ################################################################################
-    # Generate Data File
-    ################################################################################
-
-    def generateClass( self, className, fields ):
-        """ Helper function for generating the code segement defining a class (or the corresponding
-        data structure). The first argument is the class name and the second argument is a list of
-        fields (in order) of that class. """
-        self.typeNameToParseFuncName[className] = "parse%s" % className
-        classFile = InstaParseFile(join(self.foldername, className + ".java"))
-        self.classFiles.append(classFile)
-        self.currentFile = classFile
-
-        shouldImportArrayList = False
-
-        self._beginBlock("public class " + className )
-
-        for field in fields:
-            if field.isRepeating() or field.isList():
-                shouldImportArrayList = True
-            classFile.writeLine("public " + self._getTypeName(field) + " " + field.name() + ";")
-
-        if shouldImportArrayList:
-            classFile.writeImportLine("")
-            classFile.writeImportLine("import java.util.ArrayList;")
-
-        self._endBlock()
-
-    ################################################################################
-    # Generate Util File
-    ################################################################################
-
-    def generateUtilFile(self):
-        self.currentFile = self.util
-        self.generateUtilFileHeader()
-        self._beginBlock("public class " + CodeGenerator.UTIL_FILE_NAME)
-        self.generateHelperFunctions()
-        self.generateClassParserFunctions()
-        self._endBlock()
-
-    def generateUtilFileHeader(self):
-        """ For generating the util file header, such as the import statements. """
-        # Import library headers
-        self.currentFile.writeLine("import java.util.ArrayList;")
-        self.currentFile.writeLine("import java.util.Arrays;")
-        self.currentFile.writeLine("import java.io.RandomAccessFile;")
-        self.currentFile.writeLine("import java.io.EOFException;")
-        self.currentFile.writeLine("import java.io.IOException;")
-
-        self.currentFile.writeNewline()
-
-    def generateHelperFunctions(self):
-        """ For generating the helper functions that will be useful when parsing in the util file. """
-        # Static helpers for primitives
-        helpers = javagenStaticHelpers()
-        map(lambda s: self.currentFile.writeLine(s), helpers.splitlines())
-        self.currentFile.writeNewline()
-
-    def generateClassParserFunction( self, className, lines ):
-        """ For generating a helper functions for parsing a user defined class. The first argument
-        is the class name and the second argument is a list of FormatLine's. """
-        writeLine = self.currentFile.writeLine
-        write = self.currentFile.write
-
-        def isSimplePrimitive(field):
-            return field.isInteger() or field.isFloat() or field.isString() or field.isBool()
-
-        def generateSetup():
-            # Helper to do some setup in every parser function
-            writeLine(className + " result = new " + className + "();")
-            didSplit = False
-            didRepeat = False
-            didRepeatPlus = False
-
-            for line in lines:
-                didRepeat = didRepeat or line.isRepeating()
-                didRepeatPlus = didRepeatPlus or  line.isOneOrMoreRepetition()
-                didSplit = didSplit or line.numFields() > 1 or (not line.isEmpty() and line.getField(0).isList())
-
-            if didSplit:
-                writeLine("String[] fields;")
-            if didRepeat:
-                writeLine("long prevFilePos = getFilePointer(f);")
-                writeLine("int prevLineNumber = lineNumber[0];")
-            if didRepeatPlus:
-                writeLine("boolean didRepeatOnce = false;")
-
-        def handleEmptyLine():
-            # Handle the empty line case
-            self._beginBlock("if (!readLine(f, \"" + className + "\").trim().equals(\"\"))")
-            writeLine("throw new RuntimeException(\"Parser Error on line \" + lineNumber[0] +" +
-                "\": Should be an empty line.\");")
-            self._endBlock()
-            writeLine("lineNumber[0] += 1;")
-
-        def handleSimpleLineOneField(field):
-            # Helper for handleSimpleLine
-            if isSimplePrimitive(field):
-                # Field is simple, just parse it
-                writeLine("result." + field.name() + " = "
-                    + self.typeNameToParseFuncName[field.typeName()] + "(readLine(f, \"" + className + "\"), lineNumber);")
-                writeLine("lineNumber[0] += 1;")
-            elif field.isPrimitive():
-                # Field is primitive list, split line
-                writeLine("fields = readLine(f, \"" + className + "\").split(\"" + self.format.lineDelimiter() + "\");")
-                write("result." + field.name() + " = "
-                    + self.typeNameToParseFuncName["list(%s)" % field.listType()] + "(fields, lineNumber);")
-                writeLine("lineNumber[0] += 1;")
-            else:
-                # Field is a class, recurse
-                writeLine("result." + field.name() + " = "
-                    + self.typeNameToParseFuncName[field.typeName()] + "(f, lineNumber);")
-
-        def handleSimpleLineMultipleField(index, field):
-            # Helper for handleSimpleLine
-            if isSimplePrimitive(field):
-                writeLine("result." + field.name() + " = "
-                    + self.typeNameToParseFuncName[field.typeName()]
-                    + "(fields[" + str(index) + "], lineNumber);")
-            elif field.isPrimitive():
-                # Field is primitive list, use rest of fields)
-                writeLine("result." + field.name() + " = "
-                    + self.typeNameToParseFuncName["list(%s)" % field.listType()]
-                    + "(Arrays.copyOfRange(fields, " + str(index) + ", fields.length), lineNumber);")
-            else:
-                # Field is a class? Cannot be!
-                raise Exception("This should never happen.")
-
-            writeLine("lineNumber[0] += 1;")
-
-        def handleSimpleLine(line):
-            if line.numFields() == 1:
-                # Only one field, no need to split unnecessarily
-                handleSimpleLineOneField(line.getField(0))
-            else:
-                # Multiple fields, split it
-                writeLine("fields = readLine(f, \"" + className + "\").split(\"" + self.format.lineDelimiter() + "\");")
-                if (line.getField(-1).isList()):
-                    self._beginBlock("if (fields.length < " + str(line.numFields()) + ")")
-                else:
-                    self._beginBlock("if (fields.length != " + str(line.numFields()) + ")")
-                writeLine("throw new RuntimeException(\"Parser Error on line \" + lineNumber[0] + " +
-                    "\": Expecting " + str(line.numFields()) + " fields (\" + fields.length + \" found).\");")
-                self._endBlock()
-                for index, field in enumerate(line):
-                    handleSimpleLineMultipleField(index, field)
-
-        def handleRepeatingLineForField(field):
-            # Helper for handleRepeating
-            if isSimplePrimitive(field):
-                # Field is simple, just parse it
-                writeLine("result." + field.name() + ".add("
-                    + self.typeNameToParseFuncName[field.typeName()] + "(readLine(f, \"" + className + "\"), lineNumber));")
-                writeLine("lineNumber[0] += 1;")
-            elif field.isPrimitive():
-                # Field is primitive list, split line
-                writeLine("fields = readLine(f, \"" + className + "\").split(\"" + self.format.lineDelimiter() + "\");")
-                writeLine("result." + field.name() + ".add("
-                    + self.typeNameToParseFuncName["list(%s)" % field.listType()] + "(fields, lineNumber));")
-                writeLine("lineNumber[0] += 1;")
-            else:
-                # Field is a class, recurse
-                writeLine("result." + field.name() + ".add("
-                    + self.typeNameToParseFuncName[field.typeName()] + "(f, lineNumber));")
-
-        def handleRepeatingLine(line):
-            # Must be a primitive or class repeated
-            if line.isIntegerRepetition() or line.isVariableRepetition():
-                # Constant repetition amount
-                field = line.getField(0)
-                # Generate the repetition string
-                repetitionString = ""
-                if line.isIntegerRepetition():
-                    repetitionString = str(line.repetitionAmountString())
-                else:
-                    repetitionString =  "result." + line.repetitionAmountString()
-                # Initialize the arraylist
-                writeLine("result." + field.name() + " = new " + self._getTypeName(field) + "();")
-                # Begin loop
-                self._beginBlock("for (int i = 0; i < " + repetitionString + "; i++)")
-                # Wrap with try
-                self._beginBlock("try")
-                # Main handler
-                handleRepeatingLineForField(field)
-                # Check for newline
-                if (line.isSplitByNewline()):
-                    self._beginBlock("if (i != " + repetitionString + " - 1)")
-                    handleEmptyLine()
-                    self._endBlock()
-                # End try
-                self._endBlock()
-                # Catch any error to throw appropriate error message
-                self._beginBlock("catch (Exception e)")
-                writeLine("throw new RuntimeException(\"Parser Error on line \" + lineNumber[0] +"
-                    + "\": Expecting exactly \" + " + repetitionString + " + \" \\\"" + field.typeName()
-                    + "\\\" when parsing \\\"" + className + "." + field.name()
-                    + "\\\" (\" + i + \" found).\");")
-                self._endBlock()
-                # End loop
-                self._endBlock()
-            elif line.isZeroOrMoreRepetition():
-                field = line.getField(0)
-                # Wrap with try block
-                self._beginBlock("try")
-                # Initialize object
-                writeLine("result." + field.name() + " = new " + self._getTypeName(field) + "();")
-                # Save initial position
-                writeLine("prevFilePos = getFilePointer(f);")
-                writeLine("prevLineNumber = lineNumber[0];")
-                # Begin infinite loop
-                self._beginBlock("while (true)")
-                # Main handler
-                handleRepeatingLineForField(field)
-                writeLine("prevFilePos = getFilePointer(f);")
-                writeLine("prevLineNumber = lineNumber[0];")
-                # Check for newline
-                if (line.isSplitByNewline()):
-                    handleEmptyLine()
-                # End infinite loop and try block
-                self._endBlock()
-                self._endBlock()
-                # Catch any errors, reset line number and continue
-                self._beginBlock("catch (Exception e)")
-                writeLine("seek(f, prevFilePos);")
-                writeLine("lineNumber[0] = prevLineNumber;")
-                self._endBlock()
-            elif line.isOneOrMoreRepetition:
-                field = line.getField(0)
-                # Wrap with try block
-                self._beginBlock("try")
-                # Initialize object and checker to ensure at least one repetition
-                writeLine("didRepeatOnce = false;")
-                writeLine("result." + field.name() + " = new " + self._getTypeName(field) + "();")
-                # Begin infinite loop
-                self._beginBlock("while (true)")
-                # Main handler
-                handleRepeatingLineForField(field)
-                writeLine("prevFilePos = getFilePointer(f);")
-                writeLine("prevLineNumber = lineNumber[0];")
-                writeLine("didRepeatOnce = true;")
-                # Check for newline
-                if (line.isSplitByNewline()):
-                    handleEmptyLine()
-                # End infinite loop and try block
-                self._endBlock()
-                self._endBlock()
-                # Catch any errors, either (1) reset line number and continue (2) error if did not repeat once
-                self._beginBlock("catch (Exception e)")
-                self._beginBlock("if (!didRepeatOnce)")
-                writeLine("throw new RuntimeException(\"Parser Error on line \" + lineNumber[0] +"
-                    + "\": Expecting at least 1 \\\"" + field.typeName()
-                    + "\\\" when parsing \\\"" + className + "." + field.name()
-                    + "\\\" (0 found).\");")
-                self._endBlock()
-                writeLine("seek(f, prevFilePos);")
-                writeLine("lineNumber[0] = prevLineNumber;")
-                self._endBlock()
-            else:
-                raise Exception("This should never happen.")
 
+def codeGenConcurrently( formatObject, targets, options=() ):
+    """ Runs a code generator for each (language, outputName) pair on the same format, each in its
+    own thread, and waits for all of them. Raises a RuntimeError naming the language of the first
+    generator that failed, with the traceback of its error. """
+    from sys import exc_info
+    from threading import Thread
+    errors = []
 
-        self._beginBlock("public static " + className + " parse" + className + "(RandomAccessFile f, int[] lineNumber)")
-        generateSetup()
-
-        # Handle the three different cases, helpers are inner functions defined above
-        for line in lines:
-            if line.isEmpty():
-                handleEmptyLine()
-            elif line.isRepeating():
-                handleRepeatingLine(line)
-            else:
-                handleSimpleLine(line)
-
-        writeLine("return result;")
-        self._endBlock()
-        self.currentFile.writeNewline()
-
-    ################################################################################
-    # Generate Main File
-    ################################################################################
-
-    def generateMainFile(self):
-        """ Generate main file where the main function resides. """
-        self.currentFile = self.main
-        self.generateMainFileHeader()
-        self._beginBlock("public class " + splitext(basename(self.currentFile.filename))[0])
-        self.generateMainFunction()
-        self.generateInputParserFunction()
-        self._endBlock()
-
-    def generateMainFileHeader(self):
-        """ For generating the main file header, such as the import statements. """
-        # Import library headers
-        self.currentFile.writeLine("import java.io.RandomAccessFile;")
-        self.currentFile.writeLine("import java.io.FileNotFoundException;")
-        self.currentFile.writeLine("import java.io.IOException;")
-        self.currentFile.writeLine("import java.io.EOFException;")
-        self.currentFile.writeNewline()
-
-    def generateMainFunction(self):
-        """ For generating the empty main method that the user can fill in. """
-        self._beginBlock("public static void main(String[] args)")
-        self.currentFile.comment("Call " + CodeGenerator.PARSE_INPUT + "(filename) to parse the file of that name.")
-        self._endBlock()
-        self.currentFile.writeNewline()
-
-    def generateInputParserFunction(self):
-        """ For generating the function to parse an input file. """
-        writeLine = self.currentFile.writeLine
-        # Begin function declaration
-        self._beginBlock("private static " + self.bodyTypeName
-            + " " + CodeGenerator.PARSE_INPUT + "(String filename)")
-
-        # Main try block
-        self._beginBlock("try")
-        # Initial setup
-        writeLine("RandomAccessFile f = new RandomAccessFile(filename, \"r\");")
-        writeLine("int[] lineNumber = {1};")
-        # Begin parsing
-        writeLine(self.bodyTypeName + " result = "
-            + CodeGenerator.UTIL_FILE_NAME + "." + self.typeNameToParseFuncName[self.bodyTypeName] + "(f, lineNumber);")
-        # Handle trailing newlines
-        writeLine("String line;")
-        self._beginBlock("while ((line = f.readLine()) != null)")
-        self._beginBlock("if (!line.equals(\"\"))")
-        writeLine("throw new RuntimeException(\"Parser Error on line \" + lineNumber[0] + \": Finished parsing but did not reach end of file.\");")
-        self._endBlock()
-        self._endBlock()
-        # Finish up
-        writeLine("f.close();")
-        writeLine("return result;")
-        self._endBlock()
-
-        # Catch file not found
-        self._beginBlock("catch (FileNotFoundException e)")
-        writeLine("System.err.println(\"Input file '\" + filename + \"' not found.\");")
-        writeLine("System.exit(1);")
-        self._endBlock()
-        # Catch random IOExceptions
-        self._beginBlock("catch (IOException e)")
-        writeLine("System.err.println(\"Could not open \\\"\" + filename + \"\\\".\");")
-        self._endBlock()
-        # All other exception catches (EOF exception caught here)
-        self._beginBlock("catch (Exception e)")
-        writeLine("System.err.println(e.getMessage());")
-        writeLine("System.exit(1);")
-        self._endBlock()
-
-        # Should never reach this line
-        writeLine("System.err.println(\"Unknown error occurred.\");")
-        writeLine("System.exit(1);")
-        writeLine("return null;")
-
-        # End function declaration
-        self._endBlock()
-
-    ################################################################################
-    # Helper Functions
-    ################################################################################
+    def run( language, outputName ):
+        try:
+            generatorClass(language)( outputName, formatObject, options=options ).codeGen()
+        except Exception as e:
+            errors.append(( language, e, exc_info()[2] ))
+
+    threads = [ Thread( target=run, args=target ) for target in targets ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        language, error, traceback = errors[0]
+        raise RuntimeError("Generating %s failed: %s" % ( language, error )), None, traceback
+
+# Records the cache key of the last batch generation in each output directory, followed by the files it
+# generated relative to that directory, one per line
+BATCH_STAMP_FILE_NAME = ".instaparse-stamp"
+
+def batchOutputName( formatFileName, language, languages, outputName ):
+    """ The output file name used for one language of one format file in batch mode: a directory
+    named after the format file, with a subdirectory per language if there are several. """
+    formatDirectory = join(dirname(outputName), splitext(basename(formatFileName))[0])
+    if len(languages) > 1:
+        formatDirectory = join(formatDirectory, LANGUAGE_DIRECTORIES[language])
+    return join(formatDirectory, basename(outputName))
+
+def _batchCodeGen( job ):
+    """ Generates the parsers for one format file of a batch. Runs in a worker process, so it takes
+    its arguments as a single tuple and returns ( formatFileName, status, seconds, message ), where
+    status is one of "generated", "unchanged" or "failed". """
+    formatFileName, languages, outputName, force, options = job
+    start = time()
+    try:
+        with open( formatFileName, "r" ) as formatFile:
+            formatText = formatFile.read()
+        stampDirectory = dirname(batchOutputName( formatFileName, languages[0], [], outputName ))
+        stampFileName = join(stampDirectory, BATCH_STAMP_FILE_NAME)
+        stamp = cacheKey( formatText, ",".join(languages), basename(outputName), options )
+        if not force and exists(stampFileName):
+            with open( stampFileName, "r" ) as stampFile:
+                stampLines = stampFile.read().splitlines()
+            # Unchanged only if none of the generated files has been removed since
+            if stampLines[:1] == [ stamp ] and len(stampLines) > 1 and \
+                    all( exists(join(stampDirectory, name)) for name in stampLines[1:] ):
+                return ( formatFileName, "unchanged", time() - start, "" )
+
+        parser = InstaParseFormatFileParser(formatInput=formatText)
+        if parser.parseFailed():
+            return ( formatFileName, "failed", time() - start, parser.failureString().strip() )
+        formatObject = InstaParseFormat(parser.objectModel)
+        stampLines = [ stamp ]
+        for language in languages:
+            languageOutputName = batchOutputName( formatFileName, language, languages, outputName )
+            if not exists(dirname(languageOutputName)):
+                makedirs(dirname(languageOutputName))
+            generator = generatorClass(language)( languageOutputName, formatObject, options=options )
+            generator.codeGen()
+            stampLines += [ relpath( outputFile.filename, stampDirectory ) for outputFile in generator.outputFiles() ]
+
+        with open( stampFileName, "w" ) as stampFile:
+            stampFile.write("\n".join(stampLines) + "\n")
+        return ( formatFileName, "generated", time() - start, "" )
+    except Exception as e:
+        return ( formatFileName, "failed", time() - start, str(e) )
+
+def batchCodeGen( formatFileNames, languages, outputName, force=False, numProcesses=None, options=() ):
+    """ Generates parsers for many format files using a pool of worker processes, one per CPU by
+    default. Each format file gets its own output directory (see `batchOutputName`), and files whose
+    format and generators have not changed since they were last generated are skipped unless force
+    is set or a file generated then is missing. Returns the list of results from `_batchCodeGen`, in
+    the order of formatFileNames. """
+    from multiprocessing import Pool, cpu_count
+    jobs = [ ( formatFileName, languages, outputName, force, options ) for formatFileName in formatFileNames ]
+    pool = Pool( numProcesses or cpu_count() )
+    try:
+        return pool.map( _batchCodeGen, jobs, chunksize=1 )
+    finally:
+        pool.close()
+        pool.join()
+
+class SourceCache:
+    """ Content-addressed cache of generated sources, keyed by a hash of the format text, language,
+    main file name and the generator itself (see `cacheKey`).
+
+    Entries are kept in memory in least recently used order, bounded by the total size of their
+    contents in bytes. If a directory is given, entries are also written there and looked up on a
+    memory miss, so the cache survives restarts and can be shared between processes. """
+
+    def __init__( self, maxBytes=64 * 1024 * 1024, directory=None ):
+        self.maxBytes = maxBytes
+        self.directory = directory
+        from threading import Lock
+        # Guards the entries and counters, so one cache can be shared by generating threads.
+        self._lock = Lock()
+        self._entries = OrderedDict()
+        self._numBytes = 0
+        self.hits = 0
+        self.diskHits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get( self, key ):
+        """ Returns the cached sources for the key, or None if they are not cached. """
+        with self._lock:
+            return self._get(key)
+
+    def put( self, key, sources ):
+        with self._lock:
+            self._remember( key, OrderedDict(sources) )
+        self._store( key, sources )
+
+    def stats(self):
+        with self._lock:
+            return { "hits": self.hits, "diskHits": self.diskHits, "misses": self.misses,
+                "evictions": self.evictions, "entries": len(self._entries), "bytes": self._numBytes }
+
+    def _get( self, key ):
+        if key in self._entries:
+            sources = self._entries.pop(key)
+            self._entries[key] = sources
+            self.hits += 1
+            return OrderedDict(sources)
+        sources = self._load(key)
+        if sources is not None:
+            self._remember( key, sources )
+            self.diskHits += 1
+            return OrderedDict(sources)
+        self.misses += 1
+        return None
 
-    def _getBasicTypeName( self, typeName ):
-        if isInteger(typeName):
-            return "Integer"
-        if isFloat(typeName):
-            return "Float"
-        elif isString(typeName):
-            return "String"
-        elif isBool(typeName):
-            return "Boolean"
-        elif isList(typeName):
-            return "ArrayList<" + self._getBasicTypeName(listType(typeName)) + ">"
-        else:
+    def _remember( self, key, sources ):
+        size = _sourcesSize(sources)
+        if size > self.maxBytes:
+            return
+        if key in self._entries:
+            self._numBytes -= _sourcesSize(self._entries.pop(key))
+        self._entries[key] = sources
+        self._numBytes += size
+        while self._numBytes > self.maxBytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._numBytes -= _sourcesSize(evicted)
+            self.evictions += 1
+
+    def _path( self, key ):
+        return join(self.directory, key + ".json")
+
+    def _load( self, key ):
+        import json
+        if self.directory is None or not exists(self._path(key)):
             return None
-
-
-    def _getTypeName( self, field ):
-        typeName = self._getBasicTypeName(field.typeName())
-        if typeName == None:
-            typeName = field.typeName()
-
-        if field.isRepeating():
-            return "ArrayList<" + typeName + ">"
-        else:
-            return typeName
-
-    def _beginBlock( self, line ):
-        self.currentFile.writeLine(line)
-        self.currentFile.writeLine("{")
-        self.currentFile.indent()
-
-    def _endBlock(self):
-        self.currentFile.dedent()
-        self.currentFile.writeLine("}")
-
-
-def pygenStaticHelpers():
-    helpers = """
-def readline(inputFile, className):
-\tline = inputFile.readline()
-\tif line == "":
-\t\traise ValueError("Parser Error: Reached end of file while parsing object \\"" + className + "\\".")
-\treturn line.strip()
-
-def intParse( s, currentLineNumber ):
-\ttry:
-\t\treturn int(s)
-\texcept ValueError as e:
-\t\traise ValueError("Parser Error on line %d: Could not parse \\\"%s\\\" as int." % ( currentLineNumber, s ))
-
-def boolParse( s, currentLineNumber ):
-\tif s == "1" or s.lower() == "true":
-\t\treturn True
-\telif s == "0" or s.lower() == "false":
-\t\treturn False
-\traise ValueError("Parser Error on line %d: Could not parse \\\"%s\\\" as bool." % ( currentLineNumber, s ))
-
-def stringParse( s, currentLineNumber ):
-\treturn s
-
-def floatParse( s, currentLineNumber ):
-\ttry:
-\t\treturn float(s)
-\texcept ValueError as e:
-\t\traise ValueError("Parser Error on line %d: Could not parse \\\"%s\\\" as float." % ( currentLineNumber, s ))
-
-def intListParse( strings, currentLineNumber ):
-\tintList = []
-\tif len(strings) == 0:
-\t\traise ValueError("Parser Error on line %d: Could not parse empty string as list." % currentLineNumber)
-\tfor s in strings:
-\t\tintList.append(intParse( s, currentLineNumber ))
-\treturn intList
-
-def boolListParse( strings, currentLineNumber ):
-\tboolList = []
-\tif len(strings) == 0:
-\t\traise ValueError("Parser Error on line %d: Could not parse empty string as list." % currentLineNumber)
-\tfor s in strings:
-\t\tboolList.append(boolParse( s, currentLineNumber ))
-\treturn boolList
-
-def stringListParse( strings, currentLineNumber ):
-\tstringList = []
-\tif len(strings) == 0:
-\t\traise ValueError("Parser Error on line %d: Could not parse empty string as list." % currentLineNumber)
-\tfor s in strings:
-\t\tstringList.append(stringParse( s, currentLineNumber ))
-\treturn stringList
-
-def floatListParse( strings, currentLineNumber ):
-\tfloatList = []
-\tif len(strings) == 0:
-\t\traise ValueError("Parser Error on line %d: Could not parse empty string as list." % currentLineNumber)
-\tfor s in strings:
-\t\tfloatList.append(floatParse( s, currentLineNumber ))
-\treturn floatList
-
-
-"""
-    helpers = helpers.replace( "intParse", CodeGenerator.PARSE_INT )
-    helpers = helpers.replace( "boolParse", CodeGenerator.PARSE_BOOL )
-    helpers = helpers.replace( "stringParse", CodeGenerator.PARSE_STRING )
-    helpers = helpers.replace( "floatParse", CodeGenerator.PARSE_FLOAT )
-    helpers = helpers.replace( "intListParse", CodeGenerator.PARSE_INT_LIST )
-    helpers = helpers.replace( "boolListParse", CodeGenerator.PARSE_BOOL_LIST )
-    helpers = helpers.replace( "stringListParse", CodeGenerator.PARSE_STRING_LIST )
-    helpers = helpers.replace( "floatListParse", CodeGenerator.PARSE_FLOAT_LIST )
-
-    # Replace the tabs with the appropriate amount of indent spaces
-    helpers = helpers.replace( "\t", InstaParseFile.indentString )
-
-    return helpers
-
-
-class PythonGenerator(CodeGenerator):
-
-    def write( self, line ):
-        self.currentFile.write(line)
-
-    def writeLine( self, line ):
-        self.currentFile.writeLine(line)
-
-    def writeNewline(self):
-        self.currentFile.writeNewline()
-
-    def comment( self, line ):
-        self.currentFile.comment(line)
-
-    def writeImportLine( self, line ):
-        self.currentFile.writeImportLine(line)
-
-    def beginBlock( self, line ):
-        self.writeLine(line)
-        self.currentFile.indent()
-
-    def endBlock(self):
-        self.currentFile.dedent()
-
-    def initialize(self):
-        """ Perform additional initialization if required. """
-        InstaParseFile.commentString = "#"
-        self.main.setExtension("py")
-        self.util.setExtension("py")
-        self.data.setExtension("py")
-
-    ################################################################################
-    # Generate Data File
-    ################################################################################
-
-    def generateDataFileHeader(self):
-        """ For generating the data file header, such as the import statements. """
-        self.writeLine("#!/usr/bin/env python")
-        self.writeNewline()
-
-    def generateClass( self, className, fields ):
-        """ Helper function for generating the code segement defining a class (or the corresponding
-        data structure). The first argument is the class name and the second argument is a list of
-        fields (in order) of that class. """
-        self.beginBlock("class %s:" % className)
-        self.beginBlock("def __init__(self):")
-        # Initialize each field to be None
-        for f in fields:
-            self.writeLine("self.%s = None" % f.name())
-        self.endBlock()
-        self.endBlock()
-        self.writeNewline()
-
-    ################################################################################
-    # Generate Util File
-    ################################################################################
-
-    def generateUtilFileHeader(self):
-        """ For generating the util file header, such as the import statements. """
-        self.writeLine("#!/usr/bin/env python")
-        self.writeNewline()
-        self.writeLine("import " + CodeGenerator.DATA_FILE_NAME)
-
-    def generateHelperFunctions(self):
-        """ For generating the helper functions that will be useful when parsing in the util file. """
-        helpers =  pygenStaticHelpers()
-        self.write(helpers)
-        self.writeNewline()
-
-    def generateClassParserFunction( self, className, lines ):
-        """ For generating the helper functions for parsing a user defined class. The first argument
-        is the class name and the second argument is a list of FormatLine's. """
-        # The name of the class parser should be "parseX" where X is the class name.
-        # The argument to the parser should be the input file to be parsed ,the current
-        # line number and the position of the current line in the input file.
-        # If parsed successfully, the parser should return a X object, the new line number and position.
-        self.beginBlock("def parse%s( inputFile, currentLineNumber, currentLinePos ):" % className)
-        self.writeLine("userClass = %s.%s()" % ( CodeGenerator.DATA_FILE_NAME, className ))
-        self.writeNewline()
-
-        def handleEmptyLine():
-            self.comment("Parsing empty line")
-            self.writeLine("fields = readline(inputFile, \"%s\").split()" % className)
-            self.beginBlock("if len(fields) > 0:")
-            self.writeLine("raise ValueError(\"Parser Error on line %d: Should be an empty line.\"" + \
-                " % (currentLineNumber))")
-            self.endBlock()
-            self.writeLine("currentLineNumber += 1")
-            self.writeLine("currentLinePos = inputFile.tell()")
-
-        def handleSimpleLine(line):
-            # The case where there is only one primitve field that is not a list.
-            if line.numFields() == 1 and line.getField(0).isPrimitive() and not line.getField(0).isList():
-                field = line.getField(0)
-                self.writeLine("userClass.%s = %s( readline(inputFile, \"%s\"), currentLineNumber )" % \
-                    ( field.name(), self.typeNameToParseFuncName[field.typeName()], className ))
-                self.writeLine("currentLineNumber += 1")
-                self.writeLine("currentLinePos = inputFile.tell()")
-            # The case where ther is only one list primitive field.
-            elif line.numFields() == 1 and line.getField(0).isPrimitive() and line.getField(0).isList():
-                field = line.getField(0)
-                listType = "list(%s)" % field.listType()
-                self.writeLine("fields = readline(inputFile, \"%s\").split('%s')" % (className, self.format.lineDelimiter()))
-                self.writeLine("userClass.%s = %s( fields, currentLineNumber )" % ( field.name(), self.typeNameToParseFuncName[listType] ))
-                self.writeLine("currentLineNumber += 1")
-                self.writeLine("currentLinePos = inputFile.tell()")
-            # The case where there is only one non-primitive field.
-            elif line.numFields() == 1 and not line.getField(0).isPrimitive():
-                field = line.getField(0)
-                self.writeLine("userClass.%s, currentLineNumber, currentLinePos = %s( inputFile, currentLineNumber, currentLinePos )" % ( field.name(), self.typeNameToParseFuncName[field.typeName()] ))
-            # The case where there is multiple fields on a line. The fields are all primitives.
-            else:
-                self.writeLine("fields = readline(inputFile, \"%s\").split('%s')" % (className, self.format.lineDelimiter()))
-                # If the last field is not a list, then the number of fields should match exactly
-                if not line.getField(-1).isList():
-                    self.beginBlock("if len(fields) != %d:" % line.numFields())
-                    self.writeLine("raise ValueError('Parser Error on line %d: Expecting " + \
-                        str(line.numFields()) + " fields (%d found).' % ( currentLineNumber, len(fields) ))")
-                    self.endBlock()
-                # Else there should be at least X fields on the line, where X is the number of fields
-                # on the line in the format file
-                else:
-                    self.beginBlock("if len(fields) < %d:" % (line.numFields()))
-                    self.writeLine("raise ValueError('Parser Error on line %d: Expecting " + \
-                        str(line.numFields()) + " fields (%d found).' % ( currentLineNumber, len(fields) ))")
-                    self.endBlock()
-                for i, field in enumerate(line):
-                    if field.isList():
-                        listType = "list(%s)" % field.listType()
-                        self.writeLine("userClass.%s = %s( fields[%d:], currentLineNumber )" % ( \
-                            field.name(), self.typeNameToParseFuncName[field.typeName()], i ))
-                    else:
-                        self.writeLine("userClass.%s = %s( fields[%d], currentLineNumber )" % ( \
-                            field.name(), self.typeNameToParseFuncName[field.typeName()], i ))
-                self.writeLine("currentLineNumber += 1")
-                self.writeLine("currentLinePos = inputFile.tell()")
-
-        def handleRepeatingLine(line):
-            field = line.getField(0)
-            self.writeLine("userClass.%s = []" % field.name())
-
-            if line.isZeroOrMoreRepetition() or line.isOneOrMoreRepetition():
-                self.writeLine("prevLineNumber = currentLineNumber")
-                self.writeLine("prevLinePos = currentLinePos")
-                self.beginBlock("try:")
-                self.beginBlock("while True:")
-                # Field is an user defined class.
-                if not field.isPrimitive():
-                    self.writeLine("retObj, currentLineNumber, currentLinePos = %s( inputFile, currentLineNumber, currentLinePos )" % self.typeNameToParseFuncName[field.typeName()])
-                # Field is a non-list primitive.
-                elif field.isPrimitive() and not field.isList():
-                    self.writeLine("retObj = %s( readline(inputFile, \"%s\"), currentLineNumber )" % \
-                        (self.typeNameToParseFuncName[field.typeName()], className))
-                    self.writeLine("currentLineNumber += 1")
-                    self.writeLine("currentLinePos = inputFile.tell()")
-                # Field is a list primitive.
-                else:
-                    listType = "list(%s)" % field.listType()
-                    self.writeLine("fields = readline(inputFile, \"%s\").split(%s)" % (className, self.format.lineDelimiter()))
-                    self.writeLine("retObj = %s( fields, currentLineNumber )" % \
-                        self.typeNameToParseFuncName[listType])
-                    self.writeLine("currentLineNumber += 1")
-                    self.writeLine("currentLinePos = inputFile.tell()")
-                self.writeLine("userClass.%s.append(retObj)" % field.name())
-                if line.isSplitByNewline():
-                    self.writeLine("prevLineNumber = currentLineNumber")
-                    self.writeLine("prevLinePos = currentLinePos")
-                    handleEmptyLine()
-                self.endBlock()
-                self.endBlock()
-
-                self.beginBlock("except ( ValueError, EOFError ) as e:")
-                if line.isOneOrMoreRepetition():
-                    self.beginBlock("if len(userClass.%s) < 1:" % field.name())
-                    self.writeLine("raise ValueError(\"Parser Error on line %d: Expecting at least 1 \\\"" + \
-                        field.typeName() + "\\\" when parsing \\\"" + className + "." + field.name() + \
-                        "\\\" (0 found).\" % currentLineNumber)")
-                    self.endBlock()
-                if line.isSplitByNewline():
-                    self.writeLine("currentLineNumber = prevLineNumber")
-                    self.writeLine("currentLinePos = prevLinePos")
-                self.writeLine("inputFile.seek(currentLinePos)")
-                self.endBlock()
-
-            elif line.isIntegerRepetition() or line.isVariableRepetition():
-                numRepetition = line.repetitionAmountString()
-                if line.isVariableRepetition():
-                    numRepetition = "userClass." + numRepetition
-
-                self.beginBlock("try:")
-                self.beginBlock("for _index in xrange(%s):" % numRepetition)
-                # Field is an user defined class.
-                if not field.isPrimitive():
-                    self.writeLine("retObj, currentLineNumber, currentLinePos = %s( inputFile, currentLineNumber, currentLinePos )" % self.typeNameToParseFuncName[field.typeName()])
-                # Field is a non-list primitive.
-                elif field.isPrimitive() and not field.isList():
-                    self.writeLine("retObj = %s( readline(inputFile, \"%s\"), currentLineNumber )" % \
-                        (self.typeNameToParseFuncName[field.typeName()], className))
-                    self.writeLine("currentLineNumber += 1")
-                    self.writeLine("currentLinePos = inputFile.tell()")
-                # Field is a list primitive.
-                else:
-                    listType = "list(%s)" % field.listType()
-                    self.writeLine("fields = readline(inputFile, \"%s\").split(%s)" % (className, self.format.lineDelimiter()))
-                    self.writeLine("retObj = %s( fields, currentLineNumber )" % \
-                        self.typeNameToParseFuncName[listType])
-                    self.writeLine("currentLineNumber += 1")
-                self.writeLine("userClass.%s.append(retObj)" % field.name())
-                if line.isSplitByNewline():
-                    self.beginBlock("if _index + 1 < %s:" % numRepetition)
-                    handleEmptyLine()
-                    self.endBlock()
-                self.endBlock()
-                self.endBlock()
-
-                self.beginBlock("except ValueError as e:")
-                self.writeLine("raise ValueError('Parser Error on line %d: Expecting exactly %d \\\"" + \
-                    field.typeName() + "\\\" when parsing \\\"" + className + "." + field.name() + \
-                    "\\\" (%d found)' % ( currentLineNumber, " + numRepetition + ", _index ))")
-                self.endBlock()
-
-        def handleLine(line):
-            if line.isEmpty():
-                handleEmptyLine()
-            elif line.isRepeating():
-                handleRepeatingLine(line)
-            else:
-                handleSimpleLine(line)
-
-        for line in lines:
-            handleLine(line)
-            self.writeNewline()
-
-        self.writeLine("return userClass, currentLineNumber, currentLinePos")
-        self.endBlock()
-        self.writeNewline()
-
-    ################################################################################
-    # Generate Main File
-    ################################################################################
-
-    def generateMainFileHeader(self):
-        """ For generating the main file header, such as the import statements. """
-        self.writeLine("#!/usr/bin/env python")
-        self.writeNewline()
-        self.writeLine("import " + CodeGenerator.UTIL_FILE_NAME)
-        self.writeLine("import sys")
-        self.writeNewline()
-
-    def generateInputParserFunction(self):
-        """ For generating the function to parse an input file. """
-        self.beginBlock("def %s( filename ):" % CodeGenerator.PARSE_INPUT)
-
-        self.beginBlock("try:")
-        # Open file
-        self.writeLine("inputFile = open(filename, 'r')")
-        # Parse file
-        self.writeLine("body, lineNumber, linePos = %s.%s( inputFile, 1, 0 )"
-            % ( CodeGenerator.UTIL_FILE_NAME, self.typeNameToParseFuncName[self.bodyTypeName] ))
-        # Handle trailing newlines
-        self.writeLine("line = inputFile.readline()")
-        self.beginBlock("while line != '':")
-        self.beginBlock("if line.strip() != '':")
-        self.writeLine("sys.stderr.write(\"Parser Error on line %d: Finished parsing but did not reach end of file.\" % lineNumber)")
-        self.writeLine("exit(1)")
-        self.endBlock()
-        self.writeLine("lineNumber += 1")
-        self.writeLine("line = inputFile.readline()")
-        self.endBlock()
-
-        self.writeLine("return body")
-        self.endBlock()
-
-        # Catch File IO errors
-        self.beginBlock("except IOError as e:")
-        self.writeLine("sys.stderr.write('Parser Error: Problem opening file, %s' % e)" )
-        self.writeLine("exit(1)")
-        self.endBlock()
-        # Catch parser errors
-        self.beginBlock("except ValueError as e:")
-        self.writeLine("sys.stderr.write(str(e) + \"\\n\")")
-        self.writeLine("exit(1)")
-        self.endBlock()
-        # Catch all other errors
-        self.beginBlock("except Exception as e:")
-        self.writeLine("sys.stderr.write('Parser Error: %s\\n' % e)")
-        self.writeLine("import traceback")
-        self.writeLine("traceback.print_exc()")
-        self.writeLine("exit(1)")
-        self.endBlock()
-
-        self.endBlock()
-        self.writeNewline()
-
-    def generateMainFunction(self):
-        """ For generating the empty main method that the user can fill in. """
-        self.beginBlock("if __name__ == '__main__':")
-        self.currentFile.comment("Call " + CodeGenerator.PARSE_INPUT + "(filename) to parse the file of that name.")
-        self.writeLine("pass")
-        self.endBlock()
-
-
-
-def cppgenStaticHelpers():
-    helpers = """
-static const std::string ws = " \\t\\n\\r\\f\\v";
-
-inline std::string rtrim(std::string s, std::string t = ws)
-{
-\ts.erase(s.find_last_not_of(t) + 1);
-\treturn s;
-}
-
-inline std::string ltrim(std::string s, std::string t = ws)
-{
-\ts.erase(0, s.find_first_not_of(t));
-\treturn s;
-}
-
-inline std::string trim(std::string s, std::string t = ws)
-{
-\treturn ltrim(rtrim(s, t), t);
-}
-
-std::vector<std::string> copyRange(std::vector<std::string> v, int begin, int end)
-{
-\tusing namespace std;
-\tvector<string>::const_iterator first = v.begin() + begin;
-\tvector<string>::const_iterator last = v.begin() + end;
-\treturn vector<string>(first, last);
-}
-
-std::vector<std::string> split(std::string s, std::string delim) {
-\tusing namespace std;
-\tvector<string> result;
-
-\tsize_t delimLength = delim.length();
-\tsize_t start = 0, end = 0;
-\twhile ((end = s.find(delim, start)) != string::npos) {
-\t\tresult.push_back(s.substr(start, end - start));
-\t\tstart = end + delimLength;
-\t}
-\tresult.push_back(s.substr(start, s.length() - start));
-
-\treturn result;
-}
-
-std::string lowercase(std::string &s)
-{
-\tusing namespace std;
-\tchar result[s.length() + 1];
-\tfor (unsigned int i = 0; i < s.length(); i++)
-\t{
-\t\tresult[i] = tolower(s[i]);
-\t}
-\tresult[s.length()] = '\0';
-\treturn string(result);
-}
-
-int cppgenParseInt(std::string s, int& lineNumber)
-{
-\tusing namespace std;
-\tstringstream ss(s);
-\tint result;
-\tss >> result;
-\tif (!ss.eof() || ss.fail())
-\t{
-\t\tstringstream err;
-\t\terr << "Parser Error on line " << lineNumber << ": Could not parse \\"" << s << "\\" as int.";
-\t\tthrow invalid_argument(err.str());
-\t}
-\treturn result;
-}
-
-bool cppgenParseBool(std::string s, int& lineNumber)
-{
-\tusing namespace std;
-\tif (s.compare("1") == 0 || lowercase(s).compare("true") == 0)
-\t{
-\t\treturn true;
-\t}
-\telse if (s.compare("0") == 0 || lowercase(s).compare("false") == 0)
-\t{
-\t\treturn false;
-\t}
-
-\tstringstream err;
-\terr << "Parser Error on line " << lineNumber << ": Could not parse \\"" << s << "\\" as bool.";
-\tthrow invalid_argument(err.str());
-}
-
-std::string cppgenParseString(std::string s, int& lineNumber)
-{
-\treturn s;
-}
-
-float cppgenParseFloat(std::string s, int& lineNumber)
-{
-\tusing namespace std;
-\tstringstream ss(s);
-\tfloat result;
-\tss >> result;
-\tif (!ss.eof() || ss.fail())
-\t{
-\t\tstringstream err;
-\t\terr << "Parser Error on line " << lineNumber << ": Could not parse \\"" << s << "\\" as float.";
-\t\tthrow invalid_argument(err.str());
-\t}
-\treturn result;
-}
-
-std::vector<int> cppgenParseIntList(std::vector<std::string> strings, int& lineNumber)
-{
-\tusing namespace std;
-\tif (strings.size() == 0)
-\t{
-\t\tstringstream err;
-\t\terr << "Parser Error on line " << lineNumber << ": Could not parse empty string as list.";
-\t\tthrow invalid_argument(err.str());
-\t}
-\tvector<int> resval;
-\tfor (unsigned int i = 0; i < strings.size(); i++)
-\t{
-\t\tresval.push_back(cppgenParseInt(strings[i], lineNumber));
-\t}
-\treturn resval;
-}
-
-std::vector<bool> cppgenParseBoolList(std::vector<std::string> strings, int& lineNumber)
-{
-\tusing namespace std;
-\tif (strings.size() == 0)
-\t{
-\t\tstringstream err;
-\t\terr << "Parser Error on line " << lineNumber << ": Could not parse empty string as list.";
-\t\tthrow invalid_argument(err.str());
-\t}
-\tvector<bool> resval;
-\tfor (unsigned int i = 0; i < strings.size(); i++)
-\t{
-\t\tresval.push_back(cppgenParseBool(strings[i], lineNumber));
-\t}
-\treturn resval;
-}
-
-std::vector<std::string> cppgenParseStringList(std::vector<std::string> strings, int& lineNumber)
-{
-\tusing namespace std;
-\tif (strings.size() == 0)
-\t{
-\t\tstringstream err;
-\t\terr << "Parser Error on line " << lineNumber << ": Could not parse empty string as list.";
-\t\tthrow invalid_argument(err.str());
-\t}
-\tvector<string> resval;
-\tfor (unsigned int i = 0; i < strings.size(); i++)
-\t{
-\t\tresval.push_back(cppgenParseString(strings[i], lineNumber));
-\t}
-\treturn resval;
-}
-
-std::vector<float> cppgenParseFloatList(std::vector<std::string> strings, int& lineNumber)
-{
-\tusing namespace std;
-\tif (strings.size() == 0)
-\t{
-\t\tstringstream err;
-\t\terr << "Parser Error on line " << lineNumber << ": Could not parse empty string as list.";
-\t\tthrow invalid_argument(err.str());
-\t}
-\tvector<float> resval;
-\tfor (unsigned int i = 0; i < strings.size(); i++)
-\t{
-\t\tresval.push_back(cppgenParseFloat(strings[i], lineNumber));
-\t}
-\treturn resval;
-}
-
-std::string readLine(std::ifstream &f, std::string className)
-{
-\tusing namespace std;
-\tif (f.eof())
-\t{
-\t\tstringstream err;
-\t\terr << "Parser Error: Reached end of file while parsing object \\"" << className << "\\".";
-\t\tthrow runtime_error(err.str());
-\t}
-\tstring result;
-\tgetline(f, result);
-\tif (f.bad())
-\t{
-\t\tthrow runtime_error("IO Error: Unknown problem when reading input file.");
-\t}
-\treturn result;
-}
-
-void seek(std::ifstream &f, std::streampos pos)
-{
-\tusing namespace std;
-\tf.seekg(pos);
-\tif (f.bad())
-\t{
-\t\tthrow runtime_error("IO Error: Unknown problem when reading input file.");
-\t}
-}
-
-std::streampos getFilePointer(std::ifstream &f)
-{
-\tusing namespace std;
-\tstreampos pos = f.tellg();
-\tif (pos == -1)
-\t{
-\t\tthrow runtime_error("IO Error: Unknown problem when reading input file.");
-\t}
-\treturn pos;
-}
-"""
-
-    helpers = helpers.replace("cppgenParseIntList", CodeGenerator.PARSE_INT_LIST)
-    helpers = helpers.replace("cppgenParseBoolList", CodeGenerator.PARSE_BOOL_LIST)
-    helpers = helpers.replace("cppgenParseStringList", CodeGenerator.PARSE_STRING_LIST)
-    helpers = helpers.replace("cppgenParseFloatList", CodeGenerator.PARSE_FLOAT_LIST)
-    helpers = helpers.replace("cppgenParseInt", CodeGenerator.PARSE_INT)
-    helpers = helpers.replace("cppgenParseBool", CodeGenerator.PARSE_BOOL)
-    helpers = helpers.replace("cppgenParseString", CodeGenerator.PARSE_STRING)
-    helpers = helpers.replace("cppgenParseFloat", CodeGenerator.PARSE_FLOAT)
-
-    # Replace the tabs with the appropriate amount of indent spaces
-    helpers = helpers.replace( "    ", InstaParseFile.indentString )
-
-    return helpers
-
-
-
-""" Class for generating CPP code. """
-class CPPGenerator(CodeGenerator):
-
-    def initialize(self):
-        """ Perform additional initialization if required. """
-        InstaParseFile.commentString = "//"
-        self.main.setExtension("cpp")
-        self.util.setExtension("h")
-        self.data.setExtension("h")
-
-    ################################################################################
-    # Generate Data File
-    ################################################################################
-
-    def generateDataFile(self):
-        """ Generate classes in a separate data file. """
-        self.currentFile = self.data
-        self.currentFile.writeLine("#ifndef %s_H" % CodeGenerator.DATA_FILE_NAME.upper())
-        self.currentFile.writeLine("#define %s_H" % CodeGenerator.DATA_FILE_NAME.upper())
-        self.currentFile.writeNewline()
-        CodeGenerator.generateDataFile(self);
-        self.currentFile.writeLine("#endif")
-
-    def generateDataFileHeader(self):
-        """ For generating the data file header, such as the import statements. """
-        writeLine = self.currentFile.writeLine
-        writeNewline = self.currentFile.writeNewline
-        writeLine("#include <vector>")
-        writeLine("#include <string>")
-        writeNewline()
-
-    def generateClass( self, className, fields ):
-        """ Helper function for generating the code segement defining a class (or the corresponding
-        data structure). The first argument is the class name and the second argument is a list of
-        fields (in order) of that class. """
-        self.typeNameToParseFuncName[className] = "parse%s" % className
-        self._beginBlock("struct " + className )
-        for field in fields:
-            self.currentFile.writeLine(self._getTypeName(field) + " " + field.name() + ";")
-        self._endBlock(";")
-        self.currentFile.writeNewline()
-
-    ################################################################################
-    # Generate Util File
-    ################################################################################
-
-    def generateUtilFile(self):
-        self.currentFile = self.util
-        self.currentFile.writeLine("#ifndef %s_H" % CodeGenerator.UTIL_FILE_NAME.upper())
-        self.currentFile.writeLine("#define %s_H" % CodeGenerator.UTIL_FILE_NAME.upper())
-        self.generateUtilFileHeader()
-        self._beginBlock("namespace " + CodeGenerator.PARSER_NAME)
-        self.generateHelperFunctions()
-        self.generateClassParserFunctions()
-        self._endBlock()
-        self.currentFile.writeLine("#endif")
-
-    def generateUtilFileHeader(self):
-        """ For generating the util file header, such as the import statements. """
-        # Import library headers
-        self.currentFile.writeLine("#include <vector>")
-        self.currentFile.writeLine("#include <sstream>")
-        self.currentFile.writeLine("#include <string>")
-        self.currentFile.writeLine("#include <cctype>")
-        self.currentFile.writeLine("#include <stdexcept>")
-        self.currentFile.writeLine("#include <fstream>")
-        self.currentFile.writeNewline()
-
-        # Import data header
-        self.currentFile.writeLine("#include \"" + CodeGenerator.DATA_FILE_NAME + ".h" + "\"")
-
-    def generateHelperFunctions(self):
-        """ For generating the helper functions that will be useful when parsing in the util file. """
-        # Static helpers for primitives
-        helpers = cppgenStaticHelpers()
-        map(lambda s: self.currentFile.writeLine(s), helpers.splitlines())
-        self.currentFile.writeNewline()
-
-    def generateClassParserFunction( self, className, lines ):
-        """ For generating a helper functions for parsing a user defined class. The first argument
-        is the class name and the second argument is a list of FormatLine's. """
-        writeLine = self.currentFile.writeLine
-        write = self.currentFile.write
-
-        def isSimplePrimitive(field):
-            return field.isInteger() or field.isFloat() or field.isString() or field.isBool()
-
-        def generateSetup():
-            # include std in all parser functions
-            writeLine("using namespace std;")
-
-            # Helper to do some setup in every parser function
-            writeLine(className + " result;")
-            didSplit = False
-            didRepeat = False
-            didRepeatPlus = False
-
-            for line in lines:
-                didRepeat = didRepeat or line.isRepeating()
-                didRepeatPlus = didRepeatPlus or  line.isOneOrMoreRepetition()
-                didSplit = didSplit or line.numFields() > 1 or (not line.isEmpty() and line.getField(0).isList())
-
-            if didSplit:
-                writeLine("vector<string> fields;")
-            if didRepeat:
-                writeLine("streampos prevFilePos = getFilePointer(f);")
-                writeLine("int prevLineNumber = lineNumber;")
-            if didRepeatPlus:
-                writeLine("bool didRepeatOnce = false;")
-
-        def handleEmptyLine():
-            # Handle the empty line case
-            self._beginBlock("if (!(trim(readLine(f, \"" + className + "\")).compare(\"\") == 0))")
-            writeLine("stringstream err;")
-            writeLine("err << \"Parser Error on line \"  << lineNumber << " +
-                "\": Should be an empty line.\";")
-            writeLine("throw invalid_argument(err.str());")
-            self._endBlock()
-            writeLine("lineNumber += 1;")
-
-        def handleSimpleLineOneField(field):
-            # Helper for handleSimpleLine
-            if isSimplePrimitive(field):
-                # Field is simple, just parse it
-                writeLine("result." + field.name() + " = "
-                    + self.typeNameToParseFuncName[field.typeName()] + "(readLine(f, \"" + className + "\"), lineNumber);")
-                writeLine("lineNumber += 1;")
-            elif field.isPrimitive():
-                # Field is primitive list, split line
-                writeLine("fields = split(readLine(f, \"" + className + "\"), \"" + self.format.lineDelimiter() + "\");")
-                write("result." + field.name() + " = "
-                    + self.typeNameToParseFuncName["list(%s)" % field.listType()] + "(fields, lineNumber);")
-                writeLine("lineNumber += 1;")
-            else:
-                # Field is a class, recurse
-                writeLine("result." + field.name() + " = "
-                    + self.typeNameToParseFuncName[field.typeName()] + "(f, lineNumber);")
-
-        def handleSimpleLineMultipleField(index, field):
-            # Helper for handleSimpleLine
-            if isSimplePrimitive(field):
-                writeLine("result." + field.name() + " = "
-                    + self.typeNameToParseFuncName[field.typeName()]
-                    + "(fields[" + str(index) + "], lineNumber);")
-            elif field.isPrimitive():
-                # Field is primitive list, use rest of fields)
-                # FIXME WRONG
-                writeLine("result." + field.name() + " = "
-                    + self.typeNameToParseFuncName["list(%s)" % field.listType()]
-                    + "(copyRange(fields, " + str(index) + ", fields.size()), lineNumber);")
-            else:
-                # Field is a class? Cannot be!
-                raise Exception("This should never happen.")
-
-            writeLine("lineNumber += 1;")
-
-        def handleSimpleLine(line):
-            if line.numFields() == 1:
-                # Only one field, no need to split unnecessarily
-                handleSimpleLineOneField(line.getField(0))
-            else:
-                # Multiple fields, split it
-                writeLine("fields = split(readLine(f, \"" + className + "\"), \"" + self.format.lineDelimiter() + "\");")
-                if (line.getField(-1).isList()):
-                    self._beginBlock("if (fields.size() < " + str(line.numFields()) + ")")
-                else:
-                    self._beginBlock("if (fields.size() != " + str(line.numFields()) + ")")
-                writeLine("stringstream err;")
-                writeLine("err << \"Parser Error on line \" << lineNumber << " +
-                    "\": Expecting " + str(line.numFields()) + " fields (\" << fields.size() << \" found).\";")
-                writeLine("throw invalid_argument(err.str());")
-                self._endBlock()
-                for index, field in enumerate(line):
-                    handleSimpleLineMultipleField(index, field)
-
-        def handleRepeatingLineForField(field):
-            # Helper for handleRepeating
-            if isSimplePrimitive(field):
-                # Field is simple, just parse it
-                writeLine("result." + field.name() + ".push_back("
-                    + self.typeNameToParseFuncName[field.typeName()] + "(readLine(f, \"" + className + "\"), lineNumber));")
-                writeLine("lineNumber += 1;")
-            elif field.isPrimitive():
-                # Field is primitive list, split line
-                writeLine("fields = split(readLine(f, \"" + className + "\"), \"" + self.format.lineDelimiter() + "\");")
-                writeLine("result." + field.name() + ".push_back("
-                    + self.typeNameToParseFuncName["list(%s)" % field.listType()] + "(fields, lineNumber));")
-                writeLine("lineNumber += 1;")
-            else:
-                # Field is a class, recurse
-                writeLine("result." + field.name() + ".push_back("
-                    + self.typeNameToParseFuncName[field.typeName()] + "(f, lineNumber));")
-
-        def handleRepeatingLine(line):
-            # Must be a primitive or class repeated
-            if line.isIntegerRepetition() or line.isVariableRepetition():
-                # Constant repetition amount
-                field = line.getField(0)
-                # Generate the repetition string
-                repetitionString = ""
-                if line.isIntegerRepetition():
-                    repetitionString = str(line.repetitionAmountString())
-                else:
-                    repetitionString =  "result." + line.repetitionAmountString()
-                # Begin loop
-                self._beginBlock("for (int i = 0; i < " + repetitionString + "; i++)")
-                # Wrap handler with try
-                self._beginBlock("try")
-                # Main handler
-                handleRepeatingLineForField(field)
-                # Check for newline
-                if (line.isSplitByNewline()):
-                    self._beginBlock("if (i != " + repetitionString + " - 1)")
-                    handleEmptyLine()
-                    self._endBlock()
-                # End try
-                self._endBlock()
-                # Catch any error to throw appropriate error message
-                self._beginBlock("catch (...)")
-                writeLine("stringstream err;")
-                writeLine("err << \"Parser Error on line \" << lineNumber << "
-                    + "\": Expecting exactly \" << " + repetitionString + " << \" \\\"" + field.typeName()
-                    + "\\\" when parsing \\\"" + className + "." + field.name()
-                    + "\\\" (\" << i << \" found).\";")
-                writeLine("throw runtime_error(err.str());")
-                self._endBlock()
-                # End loop
-                self._endBlock()
-            elif line.isZeroOrMoreRepetition():
-                field = line.getField(0)
-                # Wrap with try block
-                self._beginBlock("try")
-                # Save initial position
-                writeLine("prevFilePos = getFilePointer(f);")
-                writeLine("prevLineNumber = lineNumber;")
-                # Begin infinite loop
-                self._beginBlock("while (true)")
-                # Main handler
-                handleRepeatingLineForField(field)
-                writeLine("prevFilePos = getFilePointer(f);")
-                writeLine("prevLineNumber = lineNumber;")
-                # Check for newline
-                if (line.isSplitByNewline()):
-                    handleEmptyLine()
-                # End infinite loop and try block
-                self._endBlock()
-                self._endBlock()
-                # Catch any errors, reset line number and continue
-                self._beginBlock("catch (...)")
-                writeLine("seek(f, prevFilePos);")
-                writeLine("lineNumber = prevLineNumber;")
-                self._endBlock()
-            elif line.isOneOrMoreRepetition:
-                field = line.getField(0)
-                # Wrap with try block
-                self._beginBlock("try")
-                # Initialize object and checker to ensure at least one repetition
-                writeLine("didRepeatOnce = false;")
-                # Begin infinite loop
-                self._beginBlock("while (true)")
-                # Main handler
-                handleRepeatingLineForField(field)
-                writeLine("prevFilePos = getFilePointer(f);")
-                writeLine("prevLineNumber = lineNumber;")
-                writeLine("didRepeatOnce = true;")
-                # Check for newline
-                if (line.isSplitByNewline()):
-                    handleEmptyLine()
-                # End infinite loop and try block
-                self._endBlock()
-                self._endBlock()
-                # Catch any errors, either (1) reset line number and continue (2) error if did not repeat once
-                self._beginBlock("catch (...)")
-                self._beginBlock("if (!didRepeatOnce)")
-                writeLine("stringstream err;")
-                writeLine("err << \"Parser Error on line \" << lineNumber << "
-                    + "\": Expecting at least 1 \\\"" + field.typeName()
-                    + "\\\" when parsing \\\"" + className + "." + field.name()
-                    + "\\\" (0 found).\";")
-                writeLine("throw invalid_argument(err.str());")
-                self._endBlock()
-                writeLine("seek(f, prevFilePos);")
-                writeLine("lineNumber = prevLineNumber;")
-                self._endBlock()
-            else:
-                raise Exception("This should never happen.")
-
-
-        self._beginBlock(className + " parse" + className + "(std::ifstream& f, int& lineNumber)")
-        generateSetup()
-
-        # Handle the three different cases, helpers are inner functions defined above
-        for line in lines:
-            if line.isEmpty():
-                handleEmptyLine()
-            elif line.isRepeating():
-                handleRepeatingLine(line)
-            else:
-                handleSimpleLine(line)
-
-        writeLine("return result;")
-        self._endBlock()
-        self.currentFile.writeNewline()
-
-    ################################################################################
-    # Generate Main File
-    ################################################################################
-
-    def generateMainFile(self):
-        """ Generate main file where the main function resides. """
-        self.currentFile = self.main
-        self.generateMainFileHeader()
-        self.generateForwardDeclarations()
-        self.generateMainFunction()
-        self.generateInputParserFunction()
-
-    def generateMainFileHeader(self):
-        """ For generating the main file header, such as the import statements. """
-        # Import library headers
-        self.currentFile.writeLine("#include <vector>")
-        self.currentFile.writeLine("#include <string>")
-        self.currentFile.writeLine("#include <stdexcept>")
-        self.currentFile.writeLine("#include <fstream>")
-        self.currentFile.writeLine("#include <iostream>")
-        self.currentFile.writeNewline()
-        # Import data and util headers
-        self.currentFile.writeLine("#include \"" + CodeGenerator.DATA_FILE_NAME + ".h" + "\"")
-        self.currentFile.writeLine("#include \"" + CodeGenerator.UTIL_FILE_NAME + ".h" + "\"")
-        self.currentFile.writeNewline()
-
-    def generateForwardDeclarations(self):
-        self.currentFile.writeLine(self.bodyTypeName + " " + CodeGenerator.PARSE_INPUT + "(const std::string &filename);")
-        self.currentFile.writeNewline()
-
-    def generateMainFunction(self):
-        """ For generating the empty main method that the user can fill in. """
-        self._beginBlock("int main(int argc, char** argv)")
-        self.currentFile.comment("Call " + CodeGenerator.PARSE_INPUT + "(filename) to parse the file of that name.")
-        self._endBlock()
-        self.currentFile.writeNewline()
-
-    def generateInputParserFunction(self):
-        """ For generating the function to parse an input file. """
-        writeLine = self.currentFile.writeLine
-        # Begin function declaration
-        self._beginBlock(self.bodyTypeName + " " + CodeGenerator.PARSE_INPUT + "(const std::string &filename)")
-        writeLine("using namespace std;")
-
-        # Open file
-        writeLine("ifstream f(filename.c_str(), ios_base::in);")
-        self._beginBlock("if (f.fail())")
-        writeLine("cerr << \"Could not open \\\"\" + filename + \"\\\".\" << endl;")
-        writeLine("exit(1);")
-        self._endBlock()
-
-        # Main try block
-        self._beginBlock("try")
-        # Initial setup
-        writeLine("int lineNumber = 1;")
-        writeLine(self.bodyTypeName + " result = "
-            + CodeGenerator.PARSER_NAME + "::" + self.typeNameToParseFuncName[self.bodyTypeName] + "(f, lineNumber);")
-        # Handle trailing newlines
-        writeLine("string line;")
-        self._beginBlock("while (getline(f, line))")
-        self._beginBlock("if (!(" + CodeGenerator.PARSER_NAME + "::trim(line).compare(\"\") == 0))")
-        writeLine("stringstream err;");
-        writeLine("err << \"Parser Error on line\" << lineNumber << \": Finished parsing but did not reach end of file.\";")
-        writeLine("throw runtime_error(err.str());")
-        self._endBlock()
-        self._endBlock()
-        writeLine("return result;")
-        self._endBlock()
-
-        # Catch parser errors
-        self._beginBlock("catch (invalid_argument& ia)")
-        writeLine("cerr << ia.what() << endl;")
-        writeLine("exit(1);")
-        self._endBlock()
-        # Catch parser errors
-        self._beginBlock("catch (runtime_error& re)")
-        writeLine("cerr << re.what() << endl;")
-        writeLine("exit(1);")
-        self._endBlock()
-        # Catch all other errors
-        self._beginBlock("catch (...)")
-        writeLine("cerr << \"Unknown error occurred.\" << endl;")
-        writeLine("exit(1);")
-        self._endBlock()
-
-        # Should never reach this line
-        writeLine("cerr << \"Unknown error occurred.\" << endl;")
-        writeLine("exit(1);")
-
-        # End function declaration
-        self._endBlock()
-
-    ################################################################################
-    # Helper Functions
-    ################################################################################
-
-    def _getBasicTypeName( self, typeName ):
-        if isInteger(typeName):
-            return "int"
-        elif isString(typeName):
-            return "std::string"
-        elif isBool(typeName):
-            return "bool"
-        elif isFloat(typeName):
-            return "float"
-        elif isList(typeName):
-            return "std::vector<" + self._getBasicTypeName(listType(typeName)) + ">"
-        else:
+        try:
+            cacheFile = open( self._path(key), "r" )
+            pairs = json.load(cacheFile)
+            cacheFile.close()
+        except ( IOError, ValueError ):
             return None
+        return OrderedDict(( name.encode("utf-8"), content.encode("utf-8") ) for name, content in pairs)
 
-
-    def _getTypeName( self, field ):
-        typeName = self._getBasicTypeName(field.typeName())
-        if typeName == None:
-            typeName = field.typeName()
-
-        if field.isRepeating():
-            space = ""
-            if isList(field.typeName()):
-                space = " "
-            return "std::vector<" + typeName + space + ">"
+    def _store( self, key, sources ):
+        import json
+        from threading import current_thread
+        if self.directory is None:
+            return
+        try:
+            if not exists(self.directory):
+                makedirs(self.directory)
+            # Write to a temporary file first so readers never see a partially written entry.
+            temporaryName = self._path(key) + ".%d.%d.tmp" % ( getpid(), current_thread().ident )
+            cacheFile = open( temporaryName, "w" )
+            json.dump(sources.items(), cacheFile)
+            cacheFile.close()
+            rename( temporaryName, self._path(key) )
+        except ( IOError, OSError ):
+            # The disk tier is best effort, the entry is still cached in memory.
+            pass
+
+def _sourcesSize(sources):
+    return sum(len(name) + len(content) for name, content in sources.items())
+
+_generatorVersion = None
+
+def cacheKey( formatText, language, mainName="Main", options=() ):
+    """ Returns the cache key for generating a parser. The generator source is part of the key, so
+    cached sources are never reused across changes to the generators. """
+    import hashlib
+    global _generatorVersion
+    if _generatorVersion is None:
+        versionHash = hashlib.sha1()
+        sourceDirectory = dirname(abspath(__file__))
+        for sourceFileName in [ join(sourceDirectory, "instaparse.py") ] + sorted(glob(join(sourceDirectory, "generators", "*.py"))):
+            sourceFile = open( sourceFileName, "r" )
+            versionHash.update(sourceFile.read())
+            sourceFile.close()
+        _generatorVersion = versionHash.hexdigest()
+    keyHash = hashlib.sha1(_generatorVersion)
+    for part in ( language, mainName, ",".join(sorted(options)), formatText ):
+        keyHash.update("\0" + part)
+    return keyHash.hexdigest()
+
+def generate( formatText, language, mainName="Main", cache=None, timer=None, options=() ):
+    """ Generates a parser in memory for the format given as a string and returns an ordered dictionary
+    of file names to contents, using the SourceCache cache if given. Raises a ValueError if the format,
+    language or options are invalid. """
+    if language not in LANGUAGE_GENERATORS:
+        raise ValueError("Language '%s' not supported." % language)
+    if timer is None:
+        timer = PhaseTimer()
+    if cache is not None:
+        with timer.phase("cache"):
+            key = cacheKey( formatText, language, mainName, options )
+            sources = cache.get(key)
+        if sources is not None:
+            return sources
+    start = time()
+    parser = InstaParseFormatFileParser(formatInput=formatText)
+    timer.add( "parse", time() - start, len(formatText) )
+    if parser.parseFailed():
+        raise ValueError(parser.failureString())
+    with timer.phase("validate"):
+        formatObject = InstaParseFormat(parser.objectModel)
+    generator = generatorClass(language)( mainName, formatObject, timer, options )
+    start = time()
+    generator.generateFiles()
+    timer.add( "generate", time() - start, sum(outputFile.size for outputFile in generator.outputFiles()) )
+    sources = OrderedDict()
+    for outputFile in generator.outputFiles():
+        sources[basename(outputFile.filename)] = outputFile.contents()
+    if cache is not None:
+        cache.put( key, sources )
+    return sources
+
+def sourcesAsBundle( sources, mainName="Main" ):
+    """ Arranges the result of `generate` in the shape the editor expects: the main, util and data
+    files plus a list of any other class files, with URL-quoted contents. """
+    from urllib import quote
+
+    def entry( name, content ):
+        return { "name": name, "content": quote(content, safe="~@#$&()*!+=:;,.?/\'") }
+
+    result = { "classes": [] }
+    for name, content in sources.items():
+        if name.startswith(mainName + "."):
+            result["main"] = entry( name, content )
+        elif name.startswith(CodeGenerator.UTIL_FILE_NAME + "."):
+            result["util"] = entry( name, content )
+        elif name.startswith(CodeGenerator.DATA_FILE_NAME + "."):
+            result["data"] = entry( name, content )
         else:
-            return typeName
-
-    def _beginBlock( self, line ):
-        self.currentFile.writeLine(line)
-        self.currentFile.writeLine("{")
-        self.currentFile.indent()
-
-    def _endBlock(self, semicolon = False):
-        self.currentFile.dedent()
-        self.currentFile.writeLine("}" + (";" if semicolon else ""))
-
-
-
-USAGE = "usage: %prog [options] format_file_name"
+            result["classes"].append(entry( name, content ))
+    return result
+
+def serve( inputStream=stdin, outputStream=stdout, cache=None ):
+    """ Answers requests like {"id", "language", "input", "mainName", "options", "profile"}, one JSON
+    line each, with a line holding the same "id" and a "result" from `sourcesAsBundle` or an "error",
+    until inputStream is closed. {"id", "stats": true} is answered with the cache statistics. """
+    import json
+    # readline is used instead of iterating the stream, which would read ahead and block.
+    for line in iter(inputStream.readline, ""):
+        if not line.strip():
+            continue
+        response = { "id": None }
+        try:
+            request = json.loads(line)
+            response["id"] = request.get("id")
+            if request.get("stats"):
+                response["result"] = cache.stats() if cache is not None else {}
+                outputStream.write(json.dumps(response) + "\n")
+                outputStream.flush()
+                continue
+            mainName = request.get("mainName", "Main").encode("utf-8")
+            timer = PhaseTimer()
+            options = [ option.encode("utf-8") for option in request.get("options", []) ]
+            sources = generate( request["input"].encode("utf-8"), request["language"], mainName, cache, timer, options )
+            response["result"] = sourcesAsBundle( sources, mainName )
+            if request.get("profile"):
+                response["profile"] = timer.asDict()
+        except KeyError as e:
+            response["error"] = "Missing request field %s." % e
+        except Exception as e:
+            response["error"] = str(e)
+        outputStream.write(json.dumps(response) + "\n")
+        outputStream.flush()
+
+
+USAGE = "usage: %prog [options] format_file_name [format_file_name ...]"
 DEFAULT_LANGUAGE = "python"
 
 if __name__ == "__main__":
+    # The generators import this module as "instaparse", make sure that name refers to the running
+    # script instead of loading the module a second time.
+    modules.setdefault( "instaparse", modules[__name__] )
+    timer = PhaseTimer()
+    timer.add( "import", time() - _moduleLoadStart )
+
     # Option parser
     optParser = OptionParser(usage = USAGE)
     optParser.add_option( "-l", "--lang", action = "store", dest = "language",
             help = "specifies the output parser language. Defaults to using the extension on the output file name or Python. \n"
-                   "Accepts 'python', 'java', or 'c++'." )
+                   "Accepts 'python', 'java', or 'c++', or several of them separated by commas." )
+    optParser.add_option( "--all", action = "store_true", dest = "allLanguages", default = False,
+            help = "generates parsers in every supported language. When generating more than one language, "
+                   "each is written to its own subdirectory of the output file's directory." )
     optParser.add_option( "-o", "--output", action = "store", dest = "outputName", default = "out",
             help = "specifies the output file name" )
+    optParser.add_option( "-O", "--option", action = "append", dest = "generatorOptions", default = [],
+            help = "enables an option of the generator changing the generated parser, e.g. 'packed-lists' for Python. "
+                   "May be given several times." )
+    optParser.add_option( "--timing", action = "store_true", dest = "timing", default = False,
+            help = "reports the time spent importing, parsing the format, validating it, generating code "
+                   "and saving it to stderr. When generating several languages, saving is part of generating." )
+    optParser.add_option( "--profile", action = "store", dest = "profileFileName",
+            help = "writes the time spent and bytes produced in each phase, and by each generated class, class "
+                   "parser function and saved file, as JSON to this file. Use '-' for stderr." )
+    optParser.add_option( "--force", action = "store_true", dest = "force", default = False,
+            help = "when given several format files, regenerates them even if they have not changed." )
+    optParser.add_option( "--json", action = "store_true", dest = "json", default = False,
+            help = "prints the generated sources to stdout as JSON instead of writing them to disk. "
+                   "A format file name of '-' reads the format from stdin." )
+    optParser.add_option( "--server", action = "store_true", dest = "server", default = False,
+            help = "runs a code generation server that reads JSON requests from stdin, one per line, "
+                   "and writes JSON responses to stdout." )
+    optParser.add_option( "--cache-size", action = "store", type = "int", dest = "cacheSize",
+            default = 64 * 1024 * 1024,
+            help = "in server mode, the maximum number of bytes of generated sources kept in memory." )
+    optParser.add_option( "--cache-dir", action = "store", dest = "cacheDirectory",
+            help = "in server mode, also caches generated sources in this directory." )
     (options, args) = optParser.parse_args()
 
+    def reportTiming():
+        if options.timing:
+            stderr.write(timer.report() + "\n")
+        if options.profileFileName:
+            import json
+            profileFile = stderr if options.profileFileName == "-" else open( options.profileFileName, "w" )
+            profileFile.write(json.dumps( timer.asDict(), indent=2 ) + "\n")
+            if profileFile is not stderr:
+                profileFile.close()
+
+    if options.server:
+        serve( cache = SourceCache( options.cacheSize, options.cacheDirectory ) )
+        exit(0)
+
     # Clean up provided flags
+    if options.allLanguages:
+        options.language = ",".join(sorted(LANGUAGE_GENERATORS))
     if options.language == None:
         periodIndex = options.outputName.find(".")
         if periodIndex == -1:
@@ -2385,30 +1540,92 @@ if __name__ == "__main__":
                 options.language = "c++"
 
     # Check that a format file is provided
-    if len(args) != 1:
+    if len(args) < 1:
         optParser.print_help()
         exit(1)
 
+    # No language is left when the output file's extension is unknown or -l is empty
+    languages = options.language.split(",") if options.language else []
+    if not languages or any( language not in LANGUAGE_GENERATORS for language in languages ):
+        print "language not supported."
+        exit(1)
+
+    # Several format files or a pattern are generated as a batch, each into its own directory
+    formatFileNames = []
+    for arg in args:
+        formatFileNames.extend(sorted(glob(arg)) if has_magic(arg) else [ arg ])
+    if len(formatFileNames) > 1 or any(has_magic(arg) for arg in args):
+        if options.json:
+            stderr.write("--json accepts a single format file.\n")
+            exit(1)
+        results = batchCodeGen( formatFileNames, languages, options.outputName, options.force,
+            options=options.generatorOptions )
+        for formatFileName, status, seconds, message in results:
+            print "%-40s %-10s %7.2fs" % ( formatFileName, status, seconds )
+            if message:
+                print "    " + message.replace("\n", "\n    ")
+        counts = [ sum(1 for result in results if result[1] == status) for status in ( "generated", "unchanged", "failed" ) ]
+        print "%d generated, %d unchanged, %d failed." % tuple(counts)
+        exit(1 if counts[2] > 0 else 0)
+
+    if options.json:
+        if len(languages) != 1:
+            stderr.write("--json accepts a single language.\n")
+            exit(1)
+        import json
+        formatText = stdin.read() if args[0] == "-" else open(args[0], "r").read()
+        try:
+            sources = generate( formatText, options.language, options.outputName, timer=timer,
+                options=options.generatorOptions )
+            print json.dumps(sourcesAsBundle( sources, options.outputName ))
+        except ValueError as e:
+            stderr.write(str(e) + "\n")
+            exit(1)
+        reportTiming()
+        exit(0)
+
     # Parser format file into a object model
+    start = time()
     parser = InstaParseFormatFileParser(args[0])
+    timer.add( "parse", time() - start, getsize(args[0]) if exists(args[0]) else 0 )
     if parser.parseFailed():
         parser.printFailures()
         exit(1)
 
     # Generate a format object from the object model
-    formatObject = InstaParseFormat(parser.objectModel)
+    with timer.phase("validate"):
+        formatObject = InstaParseFormat(parser.objectModel)
+
+    # Only the generators for the requested languages are loaded
+    with timer.phase("import"):
+        generatorClasses = [ generatorClass(language) for language in languages ]
 
     # Depending on output language, call the associated code generator
-    generator = None
-    if options.language == "python":
-        generator = PythonGenerator(options.outputName, formatObject)
-    elif options.language == "java":
-        generator = JavaGenerator(options.outputName, formatObject)
-    elif options.language == "c++":
-        generator = CPPGenerator(options.outputName, formatObject)
+    if len(languages) == 1:
+        start = time()
+        try:
+            generator = generatorClasses[0]( options.outputName, formatObject, timer, options.generatorOptions )
+        except ValueError as e:
+            stderr.write(str(e) + "\n")
+            exit(1)
+        generator.generateFiles()
+        timer.add( "generate", time() - start, sum(outputFile.size for outputFile in generator.outputFiles()) )
+        start = time()
+        generator.saveFiles()
+        timer.add( "save", time() - start, sum(outputFile.size for outputFile in generator.outputFiles()) )
     else:
-        print "language not supported."
-        exit(1)
-
-    generator.codeGen()
+        # Several languages share the parsed format and are written to their own directories
+        targets = []
+        for language in languages:
+            outputDirectory = join(dirname(options.outputName), LANGUAGE_DIRECTORIES[language])
+            if not exists(outputDirectory):
+                makedirs(outputDirectory)
+            targets.append(( language, join(outputDirectory, basename(options.outputName)) ))
+        try:
+            with timer.phase("generate"):
+                codeGenConcurrently( formatObject, targets, options.generatorOptions )
+        except Exception as e:
+            stderr.write(str(e) + "\n")
+            exit(1)
 
+    reportTiming()
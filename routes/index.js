@@ -3,9 +3,7 @@ var router = express.Router();
 
 var path = require("path");
 var fs = require("fs");
-var temp = require("temp");
-var childProcess = require("child_process");
-var rimraf = require("rimraf");
+var codegen = require("../codegen");
 
 //============================================================
 // Automatically generate webpage content
@@ -56,24 +54,6 @@ var onCodegenError = function(res, error) {
     res.send({error: error});
 };
 
-var onCodegenSuccess = function(res, outputDirectoryName) {
-    var command = "python collect_source.py " + outputDirectoryName + " input.format Main";
-
-    childProcess.exec(command, function(error, stdout, stderr) {
-        if (error) {
-            onCodegenError(res, stderr.toString());
-        } else {
-            res.send(stdout.toString());
-        }
-
-        rimraf(outputDirectoryName, function (error) {
-            if (error) {
-                console.log("Unable to clean temporary directory: " + dirPath);
-            }
-        });
-    });
-};
-
 router.get("/gencode", function(req, res) {
     var language = req.query.language;
     var isLanguageValid = false;
@@ -84,26 +64,12 @@ router.get("/gencode", function(req, res) {
     if (!isLanguageValid)
         return; // Command injections are bad.
 
-    var directoryName = "tmp";
-
-    temp.mkdir(directoryName, function(err, dirPath) {
-        var formatFile = path.join(dirPath, "input.format");
-        fs.writeFile(formatFile, req.query.input, function(err) {
-            if (err) {
-                onCodegenError("IO Error. Try again!");
-            } else {
-                var command = "python instaparse.py -l " + language + " "
-                    + formatFile  + " "
-                    + "-o " + path.join(dirPath, "Main");
-                childProcess.exec(command, function(error, stdout, stderr) {
-                    if (error) {
-                        onCodegenError(res, stderr.toString());
-                    } else {
-                        onCodegenSuccess(res, dirPath);
-                    }
-                });
-            }
-        });
+    codegen.generate(language, req.query.input || "", function(error, result) {
+        if (error) {
+            onCodegenError(res, error);
+        } else {
+            res.send(result);
+        }
     });
 });
 
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+""" Tests the lists parsed by generated Python parsers with the packed-lists option. """
+
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+from os.path import dirname, abspath, join
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from instaparse import InstaParseFormatFileParser, InstaParseFormat, generatorClass
+
+FORMAT = """<objects>
+<body>
+ints:list(int)
+floats:list(float)
+"""
+
+# Prints the lists parsed from the file named by its first argument
+PYTHON_DRIVER = "import sys; sys.path.insert(0, %r); import Main; body = Main.parse(sys.argv[1]); " \
+    "print repr(body.ints); print repr(body.floats)"
+
+class PackedListsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        parser = InstaParseFormatFileParser(formatInput=FORMAT)
+        generatorClass("python")( join(self.directory, "Main"), InstaParseFormat(parser.objectModel),
+            options=[ "packed-lists" ] ).codeGen()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def parse( self, inputData ):
+        """ Returns the exit status and the output of the parser for the input. """
+        inputFileName = join(self.directory, "input.txt")
+        inputFile = open( inputFileName, "w" )
+        inputFile.write(inputData)
+        inputFile.close()
+        process = subprocess.Popen( [ sys.executable, "-c", PYTHON_DRIVER % self.directory, inputFileName ],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT )
+        output = process.communicate()[0]
+        return process.returncode, output.splitlines()
+
+    def testPacked(self):
+        self.assertEqual( self.parse("1 -2 3\n1.5 2\n"),
+            ( 0, [ "array('l', [1, -2, 3])", "array('d', [1.5, 2.0])" ] ) )
+
+    def testIntTooLargeForPackedList(self):
+        # Ints that do not fit in a C long are parsed into a plain list instead of being rejected
+        self.assertEqual( self.parse("1 %d 3\n1.5\n" % 2 ** 70),
+            ( 0, [ "[1, %dL, 3]" % 2 ** 70, "array('d', [1.5])" ] ) )
+
+    def testIntNotParsed(self):
+        status, lines = self.parse("1 x 3\n1.5\n")
+        self.assertNotEqual( status, 0 )
+        self.assertEqual( lines, [ "Parser Error on line 1: Could not parse \"x\" as int." ] )
+
+if __name__ == "__main__":
+    unittest.main()
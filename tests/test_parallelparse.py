@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+
+""" Tests that the generated parallelparse functions parse the same instances as parse. """
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+from distutils.spawn import find_executable
+from os.path import dirname, abspath, join
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from instaparse import InstaParseFormatFileParser, InstaParseFormat, generatorClass
+
+FORMAT = """<objects>
+Pt
+    x:int y:int
+<body>
+pts:Pt:*!
+"""
+
+# The drivers print the points parsed by parseBody, and then by parallelparseBody with chunks of every
+# size up to the second argument, from the file named by the first, each followed by the position it
+# left the file at
+CPP_DRIVER = """#define main unused_main
+#include "Main.cpp"
+#undef main
+#include <cstdio>
+
+void print(const Body &body, std::ifstream &f)
+{
+    for (size_t i = 0; i < body.pts.size(); i++)
+        printf("%d,%d ", body.pts[i].x, body.pts[i].y);
+    printf("at %ld\\n", (long) InstaParse::nextLinePos(f));
+}
+
+int main(int argc, char** argv)
+{
+    std::string filename(argv[1]);
+    std::ifstream f(filename.c_str());
+    print(InstaParse::parseBody(f), f);
+    for (long chunkSize = 1; chunkSize <= atol(argv[2]); chunkSize++)
+    {
+        std::ifstream f(filename.c_str());
+        print(InstaParse::parallelparseBody(f, filename, 3, chunkSize), f);
+    }
+    return 0;
+}
+"""
+
+JAVA_DRIVER = """import java.io.RandomAccessFile;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+
+public class Driver
+{
+    static void print(Body body, RandomAccessFile f) throws Exception
+    {
+        StringBuilder line = new StringBuilder();
+        for (Pt pt : body.pts)
+            line.append(pt.x + "," + pt.y + " ");
+        System.out.println(line + "at " + f.getFilePointer());
+    }
+
+    public static void main(String[] args) throws Exception
+    {
+        RandomAccessFile f = new RandomAccessFile(args[0], "r");
+        print(InstaParseUtil.parseBody(f), f);
+        ExecutorService pool = Executors.newFixedThreadPool(3);
+        try
+        {
+            for (long chunkSize = 1; chunkSize <= Long.parseLong(args[1]); chunkSize++)
+            {
+                f = new RandomAccessFile(args[0], "r");
+                print(InstaParseUtil.parallelparseBody(f, args[0], pool, chunkSize), f);
+            }
+        }
+        finally
+        {
+            pool.shutdownNow();
+        }
+    }
+}
+"""
+
+class ParallelParseTests:
+    """ Tests run for each language, by subclasses defining `build`. """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        parser = InstaParseFormatFileParser(formatInput=FORMAT)
+        generatorClass(self.language)( join(self.directory, "Main"), InstaParseFormat(parser.objectModel) ).codeGen()
+        self.command = self.build()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def parse( self, inputData ):
+        """ Returns the lines printed by the driver for the input. """
+        inputFileName = join(self.directory, "input.txt")
+        writeFile( inputFileName, inputData )
+        return subprocess.check_output(self.command + [ inputFileName, str(len(inputData)) ]).splitlines()
+
+    def testNewlineAtEnd(self):
+        lines = self.parse("1 2\n\n3 4\n\n5 6\n")
+        self.assertEqual( lines, [ "1,2 3,4 5,6 at 14" ] * 15 )
+
+    def testNoNewlineAtEnd(self):
+        lines = self.parse("1 2\n\n3 4\n\n5 6")
+        self.assertEqual( lines, [ "1,2 3,4 5,6 at 13" ] * 14 )
+
+    def testRepetitionEndingInChunk(self):
+        # The instances after the one that cannot be parsed are not part of the repetition
+        lines = self.parse("1 2\n\n3 x\n\n5 6\n")
+        self.assertEqual( lines, [ "1,2 at 4" ] * 15 )
+
+@unittest.skipUnless(find_executable("g++"), "g++ is not installed")
+class CppParallelParseTest( ParallelParseTests, unittest.TestCase ):
+
+    language = "c++"
+
+    def build(self):
+        writeFile( join(self.directory, "driver.cpp"), CPP_DRIVER )
+        executable = join(self.directory, "driver")
+        subprocess.check_call([ "g++", "-std=c++11", "-pthread", "-w", "-o", executable,
+            join(self.directory, "driver.cpp") ])
+        return [ executable ]
+
+@unittest.skipUnless(find_executable("javac") and find_executable("java"), "javac is not installed")
+class JavaParallelParseTest( ParallelParseTests, unittest.TestCase ):
+
+    language = "java"
+
+    def build(self):
+        writeFile( join(self.directory, "Driver.java"), JAVA_DRIVER )
+        subprocess.check_call([ "javac", "-d", self.directory ] +
+            [ join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".java") ])
+        return [ "java", "-cp", self.directory, "Driver" ]
+
+def writeFile( fileName, contents ):
+    outputFile = open( fileName, "w" )
+    outputFile.write(contents)
+    outputFile.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+""" Tests where the generated Python and C++ parsers end '*' and '+' repetitions on truncated inputs. """
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+from distutils.spawn import find_executable
+from os.path import dirname, abspath, join
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from instaparse import InstaParseFormatFileParser, InstaParseFormat, generatorClass, LANGUAGE_DIRECTORIES
+
+FORMAT = """<objects>
+Q
+    v:int
+    ws:int:*
+<body>
+qs:Q:+!
+t:string
+"""
+
+PYTHON_DRIVER = "import sys; sys.path.insert(0, %r); import Main; body = Main.parse(sys.argv[1]); " \
+    "print [ ( q.v, q.ws ) for q in body.qs ], body.t"
+CPP_DRIVER = """#define main unused_main
+#include "Main.cpp"
+#undef main
+#include <cstdio>
+
+int main(int argc, char** argv)
+{
+    Body body = parse(argv[1]);
+    printf("[");
+    for (size_t i = 0; i < body.qs.size(); i++)
+    {
+        printf("%s(%d, [", i == 0 ? "" : ", ", body.qs[i].v);
+        for (size_t j = 0; j < body.qs[i].ws.size(); j++)
+            printf("%s%d", j == 0 ? "" : ", ", body.qs[i].ws[j]);
+        printf("])");
+    }
+    printf("] %s\\n", body.t.c_str());
+    return 0;
+}
+"""
+
+# Inputs and what parsing them should print
+CASES = [
+    ( "1\n2\n3\n\n4\nend\n", "[(1, [2, 3]), (4, [])] end" ),
+    ( "1\n2\n3\n\n4\nend", "[(1, [2, 3]), (4, [])] end" ),
+    ( "1\n\n4\nend", "[(1, []), (4, [])] end" ),
+    # Parsing Q up to the end of the input is not mistaken for parsing no Q
+    ( "1\n2\n", "Parser Error: Reached end of file while parsing object \"Body\"." ),
+    ( "1\n2", "Parser Error: Reached end of file while parsing object \"Body\"." ),
+    ( "1\n2\n\n4\n", "Parser Error: Reached end of file while parsing object \"Body\"." ),
+    ( "end\n", "Parser Error on line 1: Expecting at least 1 \"Q\" when parsing \"Body.qs\" (0 found)." ),
+]
+
+class TruncatedRepetitionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        parser = InstaParseFormatFileParser(formatInput=FORMAT)
+        self.formatObject = InstaParseFormat(parser.objectModel)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def build( self, language ):
+        """ Generates the parser in the language and returns the command running it on a file. """
+        outputDirectory = join(self.directory, LANGUAGE_DIRECTORIES[language])
+        generatorClass(language)( join(outputDirectory, "Main"), self.formatObject ).codeGen()
+        if language == "python":
+            return [ sys.executable, "-c", PYTHON_DRIVER % outputDirectory ]
+        writeFile( join(outputDirectory, "driver.cpp"), CPP_DRIVER )
+        subprocess.check_call([ "g++", "-w", "-o", join(outputDirectory, "driver"), join(outputDirectory, "driver.cpp") ])
+        return [ join(outputDirectory, "driver") ]
+
+    def check( self, language ):
+        os.makedirs(join(self.directory, LANGUAGE_DIRECTORIES[language]))
+        command = self.build(language)
+        inputFileName = join(self.directory, "input.txt")
+        for inputData, expected in CASES:
+            writeFile( inputFileName, inputData )
+            process = subprocess.Popen( command + [ inputFileName ], stdout=subprocess.PIPE, stderr=subprocess.STDOUT )
+            output = process.communicate()[0].strip()
+            self.assertEqual( output, expected, "%s parsed %r into %r" % ( language, inputData, output ) )
+
+    def testPython(self):
+        self.check("python")
+
+    @unittest.skipUnless(find_executable("g++"), "g++ is not installed")
+    def testCpp(self):
+        self.check("c++")
+
+def writeFile( fileName, contents ):
+    outputFile = open( fileName, "w" )
+    outputFile.write(contents)
+    outputFile.close()
+
+if __name__ == "__main__":
+    unittest.main()